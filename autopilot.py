@@ -0,0 +1,316 @@
+import argparse
+import random
+import statistics
+import time
+from array import array
+from collections import deque
+
+from snake_core import (DIRECTIONS, SAFE_ZONE_HEIGHT, GAME_DURATION, GRID_WIDTH, GRID_HEIGHT, SKULL,
+                        Game, FixedTimestep, parse_board_size)
+
+# Piloto automático: escolhe a direção da cobra a cada passo usando só o
+# estado público do jogo (cobra, comida, caveiras) e a mesma API de um
+# jogador (change_direction / Game.step). Serve para o modo demonstração e
+# como gerador de carga em testes longos.
+#
+# Para caber num orçamento fixo de tempo por passo mesmo em tabuleiros
+# grandes, nada é recalculado do zero a cada passo:
+#   - o campo de distâncias até a comida (BFS a partir dela, contornando o
+#     corpo e as caveiras) só é refeito quando a comida muda de lugar, para
+#     de crescer assim que cobre a cabeça e pode se espalhar por vários passos
+#     (até lá vale a distância Manhattan). Corpo e caveiras mudam a cada
+#     passo, então antes de seguir o campo a descida da melhor vizinha até a
+#     comida é conferida nas células livres agora; se uma caveira nova ou o
+#     corpo fechou o caminho, a BFS recomeça. Células que ficaram livres só
+#     deixam o campo pessimista até a próxima BFS;
+#   - a ocupação do corpo vem da grade que a própria cobra mantém;
+#   - o flood fill de segurança para assim que acha espaço suficiente para o
+#     corpo inteiro, então custa O(comprimento) e não O(tabuleiro);
+#   - as marcas de visita usam um número de geração, sem limpar arrays.
+
+DEFAULT_BUDGET = 0.002  # Segundos de busca por passo
+# Orçamento em células visitadas por passo, no lugar do relógio: a escolha
+# passa a depender só do estado do jogo (torneios reproduzíveis pela semente)
+DEFAULT_CELL_BUDGET = 4096
+CHECK_EVERY = 64  # Células visitadas entre consultas ao orçamento
+UNREACHABLE = 1 << 30
+
+
+class Autopilot:
+    def __init__(self, game, budget=DEFAULT_BUDGET, cell_budget=None):
+        # cell_budget: se dado, limita a busca em células por passo e ignora budget
+        self.game = game
+        self.budget = budget
+        self.cell_budget = cell_budget
+        self.cells_left = 0
+        board = game.board
+        self.width = board.width
+        self.size = board.size
+        self.first_cell = SAFE_ZONE_HEIGHT * board.width  # Primeira célula jogável
+        # Caveiras ativas (atualizado só quando o conjunto muda)
+        self.blocked = bytearray(board.size)
+        self.skulls = ()
+        # Campo de distâncias até a comida; distance[c] só vale se
+        # distance_stamp[c] == field_generation
+        self.distance = array('i', [0]) * board.size
+        self.distance_stamp = array('I', [0]) * board.size
+        self.field_generation = 0
+        self.field_key = None
+        self.frontier = deque()
+        # Marcas do flood fill de segurança
+        self.visited = array('I', [0]) * board.size
+        self.visit_generation = 0
+
+    def __call__(self, game):
+        # Política para Game.run: game.run(Autopilot(game))
+        return self.choose_direction()
+
+    def drive(self):
+        # Aplica a escolha direto na cobra, como faria o teclado
+        self.game.snake.change_direction(self.choose_direction())
+
+    def neighbor_cells(self, cell):
+        # Vizinhas de uma célula na ordem de DIRECTIONS; -1 onde há parede
+        width = self.width
+        x = cell % width
+        return (cell - width if cell - width >= self.first_cell else -1,
+                cell + width if cell + width < self.size else -1,
+                cell - 1 if x > 0 else -1,
+                cell + 1 if x < width - 1 else -1)
+
+    def _sync_skulls(self):
+        skulls = tuple(self.game.entities.cells_of(SKULL))
+        if skulls != self.skulls:
+            for cell in self.skulls:
+                self.blocked[cell] = 0
+            for cell in skulls:
+                self.blocked[cell] = 1
+            self.skulls = skulls
+
+    def _sync_field(self, food):
+        if food == self.field_key:
+            return
+        self.field_key = food
+        self.field_generation += 1
+        self.frontier.clear()
+        if food is not None:
+            self.distance[food] = 0
+            self.distance_stamp[food] = self.field_generation
+            self.frontier.append(food)
+
+    def _exhausted(self, deadline):
+        # Chamado a cada CHECK_EVERY células visitadas
+        if self.cell_budget is not None:
+            self.cells_left -= CHECK_EVERY
+            return self.cells_left <= 0
+        return time.perf_counter() > deadline
+
+    def _advance_field(self, head, deadline):
+        # Continua a BFS de onde parou até cobrir a cabeça e as vizinhas dela
+        # (as células que a escolha do passo consulta). Corpo e caveiras
+        # recebem distância, mas a busca não passa por eles
+        frontier = self.frontier
+        neighbor_cells = self.neighbor_cells
+        occupied = self.game.snake.occupied
+        blocked = self.blocked
+        distance = self.distance
+        stamp = self.distance_stamp
+        generation = self.field_generation
+        visited = 0
+        while frontier:
+            cell = frontier[0]
+            if stamp[head] == generation and distance[cell] > distance[head]:
+                return True
+            frontier.popleft()
+            next_distance = distance[cell] + 1
+            for neighbor in neighbor_cells(cell):
+                if neighbor >= 0 and stamp[neighbor] != generation:
+                    stamp[neighbor] = generation
+                    distance[neighbor] = next_distance
+                    if not occupied[neighbor] and not blocked[neighbor]:
+                        frontier.append(neighbor)
+            visited += 1
+            if visited % CHECK_EVERY == 0 and self._exhausted(deadline):
+                return False
+        return True
+
+    def path_clear(self, cell):
+        # Desce o campo de cell até a comida só por células livres agora: o
+        # campo foi montado com o corpo de quando a BFS passou por ali
+        occupied = self.game.snake.occupied
+        blocked = self.blocked
+        distance = self.distance
+        stamp = self.distance_stamp
+        generation = self.field_generation
+        while distance[cell] > 0:
+            step = distance[cell] - 1
+            for neighbor in self.neighbor_cells(cell):
+                if (neighbor >= 0 and stamp[neighbor] == generation and distance[neighbor] == step
+                        and not occupied[neighbor] and not blocked[neighbor]):
+                    cell = neighbor
+                    break
+            else:
+                return False
+        return True
+
+    def distance_to_food(self, cell, food):
+        if food is None:
+            return 0
+        if self.distance_stamp[cell] == self.field_generation:
+            return self.distance[cell]
+        if self.frontier:
+            # A BFS ainda não chegou aqui: a distância é no mínimo a da
+            # fronteira + 1, e no mínimo a Manhattan
+            width = self.width
+            return max(abs(cell % width - food % width) + abs(cell // width - food // width),
+                       self.distance[self.frontier[0]] + 1)
+        return UNREACHABLE
+
+    def free_area(self, start, limit, deadline):
+        # Células alcançáveis a partir de start sem passar pelo corpo nem por
+        # caveiras, contando só até limit
+        occupied = self.game.snake.occupied
+        blocked = self.blocked
+        neighbor_cells = self.neighbor_cells
+        self.visit_generation += 1
+        generation = self.visit_generation
+        visited = self.visited
+        visited[start] = generation
+        stack = [start]
+        count = 0
+        while stack:
+            cell = stack.pop()
+            count += 1
+            if count >= limit:
+                break
+            if count % CHECK_EVERY == 0 and self._exhausted(deadline):
+                break
+            for neighbor in neighbor_cells(cell):
+                if (neighbor >= 0 and visited[neighbor] != generation
+                        and not occupied[neighbor] and not blocked[neighbor]):
+                    visited[neighbor] = generation
+                    stack.append(neighbor)
+        return count
+
+    def choose_direction(self):
+        game = self.game
+        snake = game.snake
+        board = game.board
+        deadline = time.perf_counter() + self.budget
+        self.cells_left = self.cell_budget or 0
+        self._sync_skulls()
+        food = board.index(game.food.position) if game.food.position is not None else None
+        self._sync_field(food)
+        head_x, head_y = snake.positions[0]
+        head = head_y * board.width + head_x
+        self._advance_field(head, deadline)
+
+        # O jogo ignora a direção oposta, e entrar na cauda também é colisão
+        # (a colisão é testada antes de a cauda andar)
+        reverse = (-snake.direction[0], -snake.direction[1])
+        occupied = snake.occupied
+        cells = []
+        for direction_index, (dx, dy) in enumerate(DIRECTIONS):
+            x, y = head_x + dx, head_y + dy
+            if (dx, dy) == reverse or not (0 <= x < board.width and SAFE_ZONE_HEIGHT <= y < board.height):
+                continue
+            cell = y * board.width + x
+            if not occupied[cell] and not self.blocked[cell]:
+                cells.append((direction_index, cell))
+        if not cells:
+            return snake.direction  # Sem saída
+        candidates = sorted((self.distance_to_food(cell, food), direction_index, cell)
+                            for direction_index, cell in cells)
+        cell = candidates[0][2]
+        if self.distance_stamp[cell] == self.field_generation and not self.path_clear(cell):
+            # O corpo fechou o caminho que o campo guardava: refaz a BFS
+            self.field_key = None
+            self._sync_field(food)
+            self._advance_field(head, deadline)
+            candidates = sorted((self.distance_to_food(cell, food), direction_index, cell)
+                                for direction_index, cell in cells)
+
+        # O caminho mais curto só vale se depois dele ainda couber a cobra
+        # inteira; senão fica com a saída que deixa mais espaço livre
+        needed = snake.length + 1
+        best_direction, best_area = None, -1
+        for _, direction_index, cell in candidates:
+            area = self.free_area(cell, needed, deadline)
+            if area >= needed:
+                return DIRECTIONS[direction_index]
+            if area > best_area:
+                best_direction, best_area = DIRECTIONS[direction_index], area
+        return best_direction
+
+
+def run_headless(games, seed, budget, duration, board_size=(GRID_WIDTH, GRID_HEIGHT)):
+    # Gerador de carga: joga partidas seguidas sem janela e mede o tempo de decisão
+    rng = random.Random(seed)
+    scores, results, decisions = [], {}, []
+    ticks = 0
+    start = time.perf_counter()
+    for _ in range(games):
+        game = Game(duration=duration, seed=rng.getrandbits(63), width=board_size[0], height=board_size[1])
+        pilot = Autopilot(game, budget)
+        while not game.over:
+            decision_start = time.perf_counter()
+            direction = pilot.choose_direction()
+            decisions.append(time.perf_counter() - decision_start)
+            game.step(direction)
+        ticks += game.tick
+        scores.append(game.snake.score)
+        results[game.result] = results.get(game.result, 0) + 1
+    elapsed = time.perf_counter() - start
+    decisions.sort()
+    print(f"Partidas: {games} | Resultados: {results}")
+    print(f"Pontuação média: {statistics.mean(scores):.1f} (máx {max(scores)})")
+    print(f"Passos/s: {ticks / elapsed:.0f}")
+    print(f"Decisão: p50 {decisions[len(decisions) // 2] * 1e6:.0f} µs, "
+          f"p99 {decisions[int(len(decisions) * 0.99)] * 1e6:.0f} µs, "
+          f"máx {decisions[-1] * 1e6:.0f} µs (orçamento {budget * 1e6:.0f} µs)")
+
+
+def attract_mode(speed=1.0, budget=DEFAULT_BUDGET, board_size=(GRID_WIDTH, GRID_HEIGHT)):
+    # Modo demonstração: partidas do piloto automático em sequência até ESC
+    import pygame
+    import snake_game
+
+    snake_game.init_display()
+    screen = pygame.display.set_mode((snake_game.WIDTH, snake_game.HEIGHT))
+    pygame.display.set_caption('Jogo da Cobrinha - Demonstração')
+    clock = pygame.time.Clock()
+    while True:
+        game = snake_game.Game(width=board_size[0], height=board_size[1])
+        pilot = Autopilot(game, budget)
+        renderer = snake_game.make_renderer(screen, game)
+        timestep = FixedTimestep()
+        timestep.reset(time.perf_counter())
+        while not game.over:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return
+            timestep.advance(time.perf_counter())
+            while not game.over and timestep.consume(game.tick_duration() / speed):
+                game.step(pilot.choose_direction())
+            renderer.draw(game, game.remaining_time())
+            clock.tick(snake_game.DISPLAY_FPS)
+
+
+if __name__ == '__main__':
+    # python autopilot.py [--games N]       -> partidas sem janela (carga)
+    # python autopilot.py --screen          -> modo demonstração na tela
+    parser = argparse.ArgumentParser(description='Piloto automático do Jogo da Cobrinha')
+    parser.add_argument('--screen', action='store_true', help='mostrar as partidas na tela (modo demonstração)')
+    parser.add_argument('--games', type=int, default=100, help='partidas sem janela (padrão 100)')
+    parser.add_argument('--seed', type=int, default=0, help='semente das partidas sem janela')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET * 1000, help='orçamento por passo em ms')
+    parser.add_argument('--duration', type=float, default=GAME_DURATION,
+                        help='duração de cada partida em segundos de jogo')
+    parser.add_argument('--board', type=parse_board_size, default=(GRID_WIDTH, GRID_HEIGHT),
+                        help='tamanho do tabuleiro em células (ex.: 1000x1000)')
+    parser.add_argument('--speed', type=float, default=1.0, help='velocidade do modo demonstração')
+    args = parser.parse_args()
+    if args.screen:
+        attract_mode(args.speed, args.budget / 1000, args.board)
+    else:
+        run_headless(args.games, args.seed, args.budget / 1000, args.duration, args.board)
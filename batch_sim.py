@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+
+from snake_core import (GRID_WIDTH, GRID_HEIGHT, SAFE_ZONE_HEIGHT, DIRECTIONS, START_POSITION,
+                        BASE_FPS, GAME_DURATION, DANGER_FOOD_COUNT, DANGER_FOOD_LIFETIME,
+                        DANGER_SPAWN_DELAY, FOOD_POINTS, FOOD_SPEEDUP, SPECIAL_FOOD_CHANCE)
+
+# Motor de simulação em lote: N tabuleiros independentes guardados em arrays
+# NumPy e avançados juntos, um passo por chamada de step(). Segue as mesmas
+# regras de snake_core.Game, mas sem nenhum objeto Python por jogo.
+#
+# Células são índices planos (y * GRID_WIDTH + x) e direções são índices em
+# DIRECTIONS (0 = UP, 1 = DOWN, 2 = LEFT, 3 = RIGHT).
+
+CELL_COUNT = GRID_WIDTH * GRID_HEIGHT
+FIRST_PLAYABLE_CELL = SAFE_ZONE_HEIGHT * GRID_WIDTH
+PLAYABLE_CELLS = CELL_COUNT - FIRST_PLAYABLE_CELL
+START_CELL = START_POSITION[1] * GRID_WIDTH + START_POSITION[0]
+
+DIRECTION_X = np.array([d[0] for d in DIRECTIONS], dtype=np.int32)
+DIRECTION_Y = np.array([d[1] for d in DIRECTIONS], dtype=np.int32)
+OPPOSITE = np.array([DIRECTIONS.index((-d[0], -d[1])) for d in DIRECTIONS], dtype=np.int8)
+
+# Tentativas de sorteio antes de procurar uma célula livre varrendo o tabuleiro
+SPAWN_ATTEMPTS = 8
+
+# Códigos de resultado por tabuleiro
+RUNNING = 0
+DEATH = 1
+VICTORY = 2
+
+
+class BatchGame:
+    def __init__(self, count, seed=None, duration=GAME_DURATION):
+        self.count = count
+        self.duration = duration
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.arange(count)
+
+        # Corpo da cobra como buffer circular de células + grade de ocupação
+        self.body = np.zeros((count, CELL_COUNT), dtype=np.int16)
+        self.head = np.zeros(count, dtype=np.int32)  # Índice da cabeça no buffer
+        self.body_length = np.ones(count, dtype=np.int32)  # Segmentos presentes
+        self.length = np.ones(count, dtype=np.int32)  # Tamanho alvo da cobra
+        self.occupied = np.zeros((count, CELL_COUNT), dtype=bool)
+        # Células com comida ou caveira: ficam fora dos sorteios, como no
+        # índice de células livres de snake_core
+        self.items = np.zeros((count, CELL_COUNT), dtype=bool)
+        self.body[:, 0] = START_CELL
+        self.occupied[:, START_CELL] = True
+
+        self.direction = self.rng.integers(0, len(DIRECTIONS), count).astype(np.int8)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.lives = np.full(count, 2, dtype=np.int8)
+        self.alive = np.ones(count, dtype=bool)
+        self.speed_multiplier = np.ones(count)
+
+        # Relógio de jogo: cada passo soma 1 / (BASE_FPS * multiplicador) segundos
+        self.tick = np.zeros(count, dtype=np.int64)
+        self.elapsed = np.zeros(count)
+        self.last_danger_spawn = np.zeros(count)
+
+        self.food = np.zeros(count, dtype=np.int32)
+        self.food_special = np.zeros(count, dtype=bool)
+        self._spawn_food(self.boards)
+
+        self.danger = np.zeros((count, DANGER_FOOD_COUNT), dtype=np.int32)
+        self.danger_active = np.zeros((count, DANGER_FOOD_COUNT), dtype=bool)
+        self.danger_spawn_time = np.zeros((count, DANGER_FOOD_COUNT))
+        for slot in range(DANGER_FOOD_COUNT):
+            self._spawn_danger(self.boards, np.full(count, slot), np.zeros(count))
+
+        self.result = np.full(count, RUNNING, dtype=np.int8)
+
+    def head_cells(self):
+        return self.body[self.boards, self.head].astype(np.int32)
+
+    def remaining_time(self):
+        return np.maximum(0, self.duration - self.elapsed)
+
+    def _taken(self, boards, cells):
+        return self.occupied[boards, cells] | self.items[boards, cells]
+
+    def _random_free_cells(self, boards):
+        # Sorteia uma célula fora da cobra, da comida e das caveiras para cada
+        # tabuleiro em `boards`. Devolve -1 quando o tabuleiro está cheio.
+        cells = FIRST_PLAYABLE_CELL + self.rng.integers(0, PLAYABLE_CELLS, len(boards))
+        pending = np.flatnonzero(self._taken(boards, cells))
+        for _ in range(SPAWN_ATTEMPTS):
+            if not len(pending):
+                return cells
+            cells[pending] = FIRST_PLAYABLE_CELL + self.rng.integers(0, PLAYABLE_CELLS, len(pending))
+            pending = pending[self._taken(boards[pending], cells[pending])]
+        for i in pending:
+            board = boards[i]
+            free = np.flatnonzero(~(self.occupied[board, FIRST_PLAYABLE_CELL:] | self.items[board, FIRST_PLAYABLE_CELL:]))
+            cells[i] = FIRST_PLAYABLE_CELL + self.rng.choice(free) if len(free) else -1
+        return cells
+
+    def _spawn_food(self, boards):
+        cells = self._random_free_cells(boards)
+        self.food[boards] = cells
+        placed = cells >= 0
+        self.items[boards[placed], cells[placed]] = True
+        self.food_special[boards] = self.rng.random(len(boards)) < SPECIAL_FOOD_CHANCE
+
+    def _spawn_danger(self, boards, slots, now):
+        cells = self._random_free_cells(boards)
+        placed = cells >= 0
+        self.danger[boards, slots] = cells
+        self.danger_active[boards, slots] = placed
+        self.danger_spawn_time[boards, slots] = now
+        self.items[boards[placed], cells[placed]] = True
+
+    def _remove_danger(self, mask):
+        # mask: (tabuleiros, slots) das caveiras que saem do tabuleiro
+        boards, slots = np.nonzero(mask & self.danger_active)
+        self.items[boards, self.danger[boards, slots]] = False
+        self.danger_active[boards, slots] = False
+
+    def _lose_life(self, mask):
+        self.lives[mask] -= 1
+        self.alive[mask & (self.lives <= 0)] = False
+        # Reposicionar no centro quem ainda tem vidas
+        respawn = np.flatnonzero(mask & (self.lives > 0))
+        if len(respawn):
+            self.occupied[respawn] = False
+            self.body[respawn, self.head[respawn]] = START_CELL
+            self.occupied[respawn, START_CELL] = True
+            self.body_length[respawn] = 1
+
+    def step(self, actions=None):
+        # Avança um passo em todos os tabuleiros ainda em jogo.
+        # actions: array de índices de direção por tabuleiro (-1 mantém a direção).
+        live = self.result == RUNNING
+        now = self.elapsed.copy()
+        remaining_time = self.remaining_time()
+
+        if actions is not None:
+            actions = np.asarray(actions, dtype=np.int8)
+            turn = live & (actions >= 0) & (actions != OPPOSITE[self.direction])
+            self.direction[turn] = actions[turn]
+
+        # Movimento e colisões com paredes, área do contador e o próprio corpo
+        head = self.head_cells()
+        new_x = head % GRID_WIDTH + DIRECTION_X[self.direction]
+        new_y = head // GRID_WIDTH + DIRECTION_Y[self.direction]
+        wall = (new_x < 0) | (new_x >= GRID_WIDTH) | (new_y < SAFE_ZONE_HEIGHT) | (new_y >= GRID_HEIGHT)
+        new_cell = np.where(wall, 0, new_y * GRID_WIDTH + new_x)
+        hit = live & self.alive & (wall | self.occupied[self.boards, new_cell])
+        self._lose_life(hit)
+
+        moving = np.flatnonzero(live & self.alive & ~hit)
+        self.head[moving] = (self.head[moving] + 1) % CELL_COUNT
+        self.body[moving, self.head[moving]] = new_cell[moving]
+        self.occupied[moving, new_cell[moving]] = True
+        self.body_length[moving] += 1
+        shrink = moving[self.body_length[moving] > self.length[moving]]
+        tail = (self.head[shrink] - self.body_length[shrink] + 1) % CELL_COUNT
+        self.occupied[shrink, self.body[shrink, tail]] = False
+        self.body_length[shrink] -= 1
+
+        # Comida ou caveira na cabeça: uma consulta por tabuleiro, depois do
+        # movimento (e do renascimento), como em snake_core.Game.step
+        head = self.head_cells()
+        on_item = live & self.items[self.boards, head]
+        on_food = on_item & (head == self.food)
+        skull = on_item & ~on_food
+        eat = np.flatnonzero(on_food)
+        if len(eat):
+            special = self.food_special[eat]
+            self.length[eat] += 1
+            self.score[eat] += np.where(special, FOOD_POINTS['special'], FOOD_POINTS['normal'])
+            self.speed_multiplier[eat] *= np.where(special, FOOD_SPEEDUP['special'], FOOD_SPEEDUP['normal'])
+            self.items[eat, head[eat]] = False
+            self._spawn_food(eat)
+
+        # Itens nunca dividem célula, então é no máximo uma caveira por
+        # tabuleiro e no máximo uma vida por passo
+        touched = skull[:, None] & self.danger_active & (self.danger == head[:, None])
+        self._lose_life(skull & self.alive)
+        self._remove_danger(touched)
+
+        # Spawn de novas caveiras no primeiro espaço livre
+        due = live & (now - self.last_danger_spawn > DANGER_SPAWN_DELAY)
+        inactive = ~self.danger_active
+        spawn = np.flatnonzero(due & inactive.any(axis=1))
+        if len(spawn):
+            self._spawn_danger(spawn, inactive[spawn].argmax(axis=1), now[spawn])
+        self.last_danger_spawn[due] = now[due]
+
+        # Expirar caveiras antigas
+        self._remove_danger(live[:, None] & (now[:, None] - self.danger_spawn_time > DANGER_FOOD_LIFETIME))
+
+        # Fim de jogo (tabuleiro cheio também conta como vitória)
+        self.result[live & ~self.alive] = DEATH
+        self.result[live & self.alive & ((remaining_time <= 0) | (self.food < 0))] = VICTORY
+
+        self.tick[live] += 1
+        self.elapsed[live] += 1.0 / (BASE_FPS * self.speed_multiplier[live])
+        return live
+
+    def done(self):
+        return not (self.result == RUNNING).any()
+
+    def run(self, policy=None, max_ticks=None):
+        # policy(batch) devolve um array de ações por tabuleiro (ou None)
+        ticks = 0
+        while not self.done() and (max_ticks is None or ticks < max_ticks):
+            self.step(policy(self) if policy is not None else None)
+            ticks += 1
+        return self
+
+
+def random_policy(batch, turn_chance=0.2):
+    # Vira para uma direção aleatória em ~20% dos passos
+    actions = batch.rng.integers(0, len(DIRECTIONS), batch.count).astype(np.int8)
+    actions[batch.rng.random(batch.count) >= turn_chance] = -1
+    return actions
+
+
+if __name__ == '__main__':
+    count = 10000
+    start = time.perf_counter()
+    batch = BatchGame(count, seed=0).run(random_policy)
+    duration = time.perf_counter() - start
+    print(f"{count} jogos em {duration:.2f}s ({count / duration:.0f} jogos/s, "
+          f"{int(batch.tick.sum())} passos)")
+    print(f"Vitórias: {int((batch.result == VICTORY).sum())} | "
+          f"Pontuação média: {batch.score.mean():.2f}")
@@ -0,0 +1,569 @@
+import argparse
+import atexit
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Benchmarks dos caminhos quentes do jogo, rodando sem janela nem áudio.
+#
+#     python benchmarks.py                          # roda tudo e mostra os tempos
+#     python benchmarks.py --save base.json         # grava uma linha de base
+#     python benchmarks.py --compare base.json      # compara e acusa regressões
+#     python benchmarks.py -k snake_move            # só os que contêm o texto
+#
+# Cada resultado é o tempo por operação (mediana e mínimo de várias rodadas).
+# A operação pode ter um atributo info (dicionário) com medidas extras, como
+# tamanhos em bytes, que saem na mesma linha e vão para a linha de base.
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+DEFAULT_THRESHOLD = 0.25  # 25% mais lento que a linha de base = regressão
+REPEAT = 5
+MIN_ROUND_TIME = 0.05  # Segundos mínimos por rodada (ajusta o número de repetições)
+
+BENCHMARKS = []
+
+
+def benchmark(name):
+    # Registra uma função de preparo que devolve a operação a ser medida
+    def register(setup):
+        BENCHMARKS.append((name, setup))
+        return setup
+    return register
+
+
+def temp_dir():
+    # Diretório temporário apagado ao final da execução
+    directory = tempfile.mkdtemp(prefix='snake-bench-')
+    atexit.register(shutil.rmtree, directory, True)
+    return directory
+
+
+def measure(operation, repeat=REPEAT, min_round_time=MIN_ROUND_TIME):
+    # Calibra quantas chamadas cabem numa rodada e devolve tempos por chamada
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_time or number >= 1 << 20:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_round_time / elapsed) + 1))
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        rounds.append((time.perf_counter() - start) / number)
+    return {'median': statistics.median(rounds), 'min': min(rounds), 'number': number}
+
+
+# --- Simulação -------------------------------------------------------------
+
+def hamiltonian_directions():
+    # Ciclo que passa por todas as células jogáveis: serpentina nas colunas
+    # 1.. e volta pela coluna 0. Seguindo-o a cobra nunca bate em nada.
+    import snake_core as core
+    rows = range(core.SAFE_ZONE_HEIGHT, core.GRID_HEIGHT)
+    cycle = []
+    for i, y in enumerate(rows):
+        xs = range(1, core.GRID_WIDTH) if i % 2 == 0 else range(core.GRID_WIDTH - 1, 0, -1)
+        cycle.extend((x, y) for x in xs)
+    cycle.extend((0, y) for y in reversed(rows))
+    directions = {}
+    for i, cell in enumerate(cycle):
+        nxt = cycle[(i + 1) % len(cycle)]
+        directions[cell] = (nxt[0] - cell[0], nxt[1] - cell[1])
+    return directions
+
+
+def _snake_move(length):
+    def setup():
+        import snake_core as core
+        directions = hamiltonian_directions()
+        snake = core.Snake()
+        snake.length = length
+        for _ in range(length):
+            snake.direction = directions[snake.get_head_position()]
+            snake.move()
+
+        def operation():
+            snake.direction = directions[snake.positions[0]]
+            snake.move()
+        return operation
+    return setup
+
+
+for _length in (4, 64, 1024):
+    benchmark(f'snake_move[length={_length}]')(_snake_move(_length))
+
+
+def _food_spawn(fill):
+    def setup():
+        import snake_core as core
+        rng = random.Random(0)
+        board = core.FreeCells(rng)
+        cells = list(board.cells)
+        rng.shuffle(cells)
+        for cell in cells[:int(len(cells) * fill)]:
+            board.occupy(core.cell_position(cell))
+        food = core.Food(core.EntityStore(board))
+        return food.randomize_position
+    return setup
+
+
+for _fill in (0.0, 0.5, 0.9, 0.99):
+    benchmark(f'food_randomize_position[fill={_fill}]')(_food_spawn(_fill))
+
+
+@benchmark('game_step')
+def _game_step():
+    import snake_core as core
+    rng = random.Random(0)
+    state = {'game': core.Game(seed=0)}
+
+    def operation():
+        game = state['game']
+        if game.over:
+            game = state['game'] = core.Game(seed=rng.getrandbits(32))
+        game.step(rng.choice(core.DIRECTIONS) if rng.random() < 0.2 else None)
+    return operation
+
+
+def _entity_store(count):
+    # Store com count entidades ativas num tabuleiro 200x200
+    import snake_core as core
+    rng = random.Random(0)
+    board = core.FreeCells(rng, 200, 200)
+    store = core.EntityStore(board)
+    for i in range(count):
+        store.spawn(store.add(core.SKULL if i % 2 else core.NORMAL_FOOD, core.DANGER_FOOD_LIFETIME))
+    return core, rng, board, store
+
+
+def _entity_lookup(count):
+    def setup():
+        # Colisão da cabeça: uma consulta, qualquer que seja a quantidade
+        core, rng, board, store = _entity_store(count)
+        heads = [board.position(rng.randrange(board.size)) for _ in range(1024)]
+        state = {'i': 0}
+
+        def operation():
+            state['i'] = (state['i'] + 1) & 1023
+            store.at(heads[state['i']])
+        return operation
+    return setup
+
+
+def _entity_items(count):
+    def setup():
+        # Percorrer as entidades ativas em bloco (o que o desenho faz)
+        core, rng, board, store = _entity_store(count)
+        return store.items
+    return setup
+
+
+for _count in (4, 1000):
+    benchmark(f'entity_lookup[entities={_count}]')(_entity_lookup(_count))
+benchmark('entity_items[entities=1000]')(_entity_items(1000))
+
+
+@benchmark('batch_step[boards=1000]')
+def _batch_step():
+    import batch_sim
+    state = {'batch': batch_sim.BatchGame(1000, seed=0)}
+
+    def operation():
+        batch = state['batch']
+        if batch.done():
+            batch = state['batch'] = batch_sim.BatchGame(1000, seed=1)
+        batch.step(batch_sim.random_policy(batch))
+    return operation
+
+
+@benchmark('autopilot_step')
+def _autopilot_step():
+    import snake_core as core
+    from autopilot import Autopilot
+    rng = random.Random(0)
+
+    def new_game():
+        game = core.Game(seed=rng.getrandbits(32))
+        return game, Autopilot(game)
+    state = {'game': new_game()}
+
+    def operation():
+        game, pilot = state['game']
+        if game.over:
+            game, pilot = state['game'] = new_game()
+        game.step(pilot.choose_direction())
+    return operation
+
+
+# --- Rede ------------------------------------------------------------------
+
+def _snapshot_states(players=4, ticks=300):
+    # Estados seguidos de uma sala com cobras já compridas
+    from multiplayer import MultiGame
+    from snake_core import DIRECTIONS, SAFE_ZONE_HEIGHT
+    rng = random.Random(0)
+    game = MultiGame(seed=0, duration=ticks, width=80, height=60)
+    for player in range(players):
+        game.add_player(player + 1, f'jogador{player}').length = 30
+
+    def safe_turn(snake):
+        # Curva aleatória para uma célula livre, para as cobras durarem
+        x, y = snake.get_head_position()
+        options = [(dx, dy) for dx, dy in DIRECTIONS
+                   if game.board.width > x + dx >= 0 and game.board.height > y + dy >= SAFE_ZONE_HEIGHT
+                   and not game.occupied[game.board.index((x + dx, y + dy))]]
+        return rng.choice(options) if options else None
+    states = []
+    for _ in range(ticks):
+        game.step({player_id: safe_turn(snake) for player_id, snake in game.snakes.items()
+                   if snake.alive and rng.random() < 0.3})
+        states.append(game.snapshot())
+    return states
+
+
+def _snapshot_codec(mode, players=4):
+    import snapshot_codec as codec
+    # Ida e volta conferida antes de medir
+    codec.verify(games=3, players=players)
+    states = _snapshot_states(players)
+    encoder = codec.SnapshotEncoder(keyframe_interval=len(states) + 1)
+    keyframes, deltas = [], []
+    for state in states:
+        frame = encoder.push(state)
+        keyframes.append(codec.encode_keyframe(state, frame))
+        deltas.append(encoder.encode_for(frame - 1) if frame > 1 else keyframes[-1])
+    json_size = statistics.mean(len(json.dumps(state, separators=(',', ':'))) for state in states)
+    position = {'i': 0}
+
+    def encode_keyframe():
+        i = position['i'] = position['i'] % (len(states) - 1) + 1
+        codec.encode_keyframe(states[i], i + 1)
+
+    def encode_delta():
+        i = position['i'] = position['i'] % (len(states) - 1) + 1
+        codec.encode_delta(states[i], i + 1, states[i - 1], i)
+
+    decoder = codec.SnapshotDecoder()
+
+    def decode_delta():
+        i = position['i'] = position['i'] % (len(states) - 1) + 1
+        if i == 1:
+            decoder.decode(keyframes[0])
+        decoder.decode(deltas[i])
+
+    operation = {'encode_keyframe': encode_keyframe, 'encode_delta': encode_delta, 'decode_delta': decode_delta}[mode]
+    sizes = keyframes if mode == 'encode_keyframe' else deltas[1:]
+    operation.info = {'bytes': round(statistics.mean(len(data) for data in sizes), 1), 'json_bytes': round(json_size, 1)}
+    return operation
+
+
+@benchmark('snapshot[encode_keyframe,players=4]')
+def _snapshot_encode_keyframe():
+    return _snapshot_codec('encode_keyframe')
+
+
+@benchmark('snapshot[encode_delta,players=4]')
+def _snapshot_encode_delta():
+    return _snapshot_codec('encode_delta')
+
+
+@benchmark('snapshot[decode_delta,players=4]')
+def _snapshot_decode_delta():
+    return _snapshot_codec('decode_delta')
+
+
+# --- Desenho ---------------------------------------------------------------
+
+def _frame_setup():
+    import pygame
+    import snake_game
+    screen = pygame.display.set_mode((snake_game.WIDTH, snake_game.HEIGHT))
+    game = snake_game.Game(seed=0)
+    game.snake.length = 60
+    directions = hamiltonian_directions()
+    for _ in range(60):
+        game.snake.direction = directions[game.snake.get_head_position()]
+        game.snake.move()
+    return pygame, snake_game, screen, game, directions
+
+
+@benchmark('frame[full]')
+def _frame_full():
+    pygame, snake_game, screen, game, _ = _frame_setup()
+    renderer = snake_game.BoardRenderer(screen, dirty=False)
+    return lambda: renderer.draw(game, game.remaining_time())
+
+
+@benchmark('frame[dirty]')
+def _frame_dirty():
+    pygame, snake_game, screen, game, directions = _frame_setup()
+    renderer = snake_game.BoardRenderer(screen, dirty=True)
+    renderer.draw(game, game.remaining_time())
+
+    def operation():
+        # Um passo da cobra por quadro, como no jogo a 10 passos/s
+        game.snake.direction = directions[game.snake.get_head_position()]
+        game.snake.move()
+        renderer.draw(game, game.remaining_time())
+    return operation
+
+
+def _frame_viewport(size, length):
+    def setup():
+        import pygame
+        import snake_core as core
+        import snake_game
+        screen = pygame.display.set_mode((snake_game.WIDTH, snake_game.HEIGHT))
+        game = snake_game.Game(seed=0, width=size, height=size)
+        snake = game.snake
+        snake.length = length
+        # Serpentina nas primeiras 200 colunas: a janela em volta da cabeça
+        # fica cheia de corpo, o pior caso para o desenho
+        while len(snake.positions) < length:
+            x, y = snake.get_head_position()
+            row = y - core.SAFE_ZONE_HEIGHT
+            if (row % 2 == 0 and x < 199) or (row % 2 == 1 and x > 0):
+                snake.direction = (1, 0) if row % 2 == 0 else (-1, 0)
+            else:
+                snake.direction = (0, 1)
+            snake.move()
+        renderer = snake_game.ViewportRenderer(screen)
+
+        def operation():
+            renderer.invalidate()
+            renderer.draw(game, game.remaining_time())
+        return operation
+    return setup
+
+
+for _size, _length in ((40, 1), (1000, 1), (1000, 20000)):
+    benchmark(f'frame[viewport,board={_size},length={_length}]')(_frame_viewport(_size, _length))
+
+
+@benchmark('capture[cells]')
+def _capture_cells():
+    # Um passo, o desenho fora da tela e a observação em grade (view NumPy)
+    import snake_core as core
+    import snake_game
+    from frame_capture import FrameCapture
+    rng = random.Random(0)
+    state = {'game': snake_game.Game(seed=0)}
+    state['capture'] = FrameCapture(state['game'])
+
+    def operation():
+        game = state['game']
+        if game.over:
+            game = state['game'] = snake_game.Game(seed=rng.getrandbits(32))
+            state['capture'] = FrameCapture(game)
+        game.step(rng.choice(core.DIRECTIONS) if rng.random() < 0.2 else None)
+        state['capture'].render()
+        cells = state['capture'].cells()
+        del cells
+    return operation
+
+
+@benchmark('draw_text[cold]')
+def _draw_text_cold():
+    pygame, snake_game, screen, _, _ = _frame_setup()
+
+    def operation():
+        snake_game._fonts.clear()
+        snake_game._text_cache.clear()
+        snake_game.draw_text(screen, 'Pontuação: 123 | Vidas: 2', 20, 400, 10)
+    return operation
+
+
+@benchmark('draw_text[warm]')
+def _draw_text_warm():
+    pygame, snake_game, screen, _, _ = _frame_setup()
+    return lambda: snake_game.draw_text(screen, 'Pontuação: 123 | Vidas: 2', 20, 400, 10)
+
+
+# --- Ranking e sons --------------------------------------------------------
+
+def _save_score(rows):
+    def setup():
+        import snake_game
+        from leaderboard import Leaderboard
+        directory = temp_dir()
+        leaderboard = Leaderboard(os.path.join(directory, 'ranking.db'), legacy_json_path=None)
+        rng = random.Random(0)
+        with leaderboard._write():
+            leaderboard.connection.executemany(
+                'INSERT INTO scores (name, code, score, created_at) VALUES (?, ?, ?, ?)',
+                ((f'jogador{i % 500}', str(i % 97), rng.randint(0, 300), float(i)) for i in range(rows)))
+        snake_game._leaderboard = leaderboard
+        counter = iter(range(10 ** 9))
+        return lambda: snake_game.save_score('bench', '0000', next(counter) % 300)
+    return setup
+
+
+for _rows in (1000, 100000):
+    benchmark(f'save_score[rows={_rows}]')(_save_score(_rows))
+
+
+def _load_sounds(cold):
+    def setup():
+        import snake_game
+        cache_dir = os.path.join(temp_dir(), 'sound_cache')
+
+        def operation():
+            if cold:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+            # load_sounds anuncia cada arquivo; não poluir a saída
+            with contextlib.redirect_stdout(io.StringIO()):
+                snake_game.load_sounds(cache_dir)
+        operation()  # Aquece o cache
+        return operation
+    return setup
+
+
+benchmark('load_sounds[cold]')(_load_sounds(True))
+benchmark('load_sounds[warm]')(_load_sounds(False))
+
+
+@benchmark('sound_events[ticks/frame=8]')
+def _sound_events():
+    # Um quadro com o multiplicador de velocidade alto: vários passos e uma
+    # comida disparando efeitos no mesmo instante (backend mudo, só as contas)
+    from sound_engine import SoundEngine
+    engine = SoundEngine({})
+    frame = iter(range(10 ** 9))
+    events = ['move'] * 8 + ['eat']
+
+    def operation():
+        now = next(frame) / 60
+        for name in events:
+            engine.play(name, now)
+    return operation
+
+
+# --- Inicialização ---------------------------------------------------------
+# Cada medida é um processo Python novo (os imports ficam em cache no atual).
+# first_frame vai até o primeiro pygame.display.update() da tela de nome.
+
+STARTUP_SCRIPTS = {
+    'import': 'import snake_game',
+    'first_frame': (
+        'import sys, pygame, snake_game\n'
+        'def first_frame(*args):\n'
+        '    sys.exit(0)\n'
+        'pygame.display.update = first_frame\n'
+        'snake_game.main()\n'
+    )
+}
+
+
+def _startup(script):
+    def setup():
+        root = os.path.dirname(os.path.abspath(__file__))
+        sound_cache = temp_dir()
+        code = f'import sound_synth\nsound_synth.CACHE_DIR = {sound_cache!r}\n{script}'
+
+        def operation():
+            subprocess.run([sys.executable, '-c', code], cwd=root, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return operation
+    return setup
+
+
+for _name, _script in STARTUP_SCRIPTS.items():
+    benchmark(f'startup[{_name}]')(_startup(_script))
+
+
+# --- Execução e comparação -------------------------------------------------
+
+def run(selected=None):
+    results = {}
+    for name, setup in BENCHMARKS:
+        if selected and not any(text in name for text in selected):
+            continue
+        operation = setup()
+        results[name] = measure(operation)
+        info = getattr(operation, 'info', {})
+        results[name].update(info)
+        extra = ''.join(f', {key} {value}' for key, value in info.items())
+        print(f"{name:40s} {format_time(results[name]['median']):>12s}  "
+              f"(mín {format_time(results[name]['min'])}, {results[name]['number']}x{extra})")
+    return results
+
+
+def format_time(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.2f} {unit}'
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def metadata():
+    import pygame
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'machine': platform.machine(),
+        'platform': platform.platform()
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Devolve a lista de (nome, razão) que ficaram mais lentos que o limite
+    regressions = []
+    print(f"\n{'benchmark':40s} {'base':>12s} {'atual':>12s} {'razão':>8s}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['median'] / baseline[name]['median']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  REGRESSÃO'
+            regressions.append((name, ratio))
+        print(f"{name:40s} {format_time(baseline[name]['median']):>12s} "
+              f"{format_time(result['median']):>12s} {ratio:7.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks do Jogo da Cobrinha')
+    parser.add_argument('-k', dest='selected', action='append', help='rodar só benchmarks com este texto no nome')
+    parser.add_argument('--save', metavar='ARQUIVO', help='gravar os resultados como linha de base (JSON)')
+    parser.add_argument('--compare', metavar='ARQUIVO', help='comparar com uma linha de base gravada')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='fração de lentidão tolerada antes de acusar regressão (padrão 0.25)')
+    args = parser.parse_args(argv)
+
+    results = run(args.selected)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+        print(f"\nLinha de base gravada em {args.save}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%}")
+            return 1
+        print('\nNenhuma regressão')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,508 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Clipes das partidas: GIF animado, sequência de PNGs ou vídeo (ffmpeg).
+#
+# Quem produz os quadros (a reprodução de um replay desenhada fora da tela,
+# ou quadros capturados de outro lugar) manda cada um, como bytes RGB e a
+# duração em segundos, por uma fila de tamanho fixo para um processo
+# encoder. A fila limita a memória: um clipe de 10 s ou de 10 min usa o
+# mesmo tanto, só demora mais. put() espera vaga na fila (exportação sem
+# janela); offer() nunca espera e descarta o quadro se o encoder estiver
+# atrasado (para capturar de um laço interativo).
+#
+# Dentro do jogo, start_export() roda a reprodução e o desenho em outro
+# processo também, então a tela de resultado só consulta o andamento.
+#
+#     python clip_export.py replays/ARQUIVO.snkr -o clipe.gif
+#     python clip_export.py --top 5 -o destaques.gif --speed 2   # melhores do ranking
+#     python clip_export.py replays/ARQUIVO.snkr -o quadros/      # PNGs + frames.txt
+#     python clip_export.py replays/ARQUIVO.snkr -o clipe.mp4     # precisa do ffmpeg
+
+CLIP_DIR = 'clips'
+EXPORT_QUEUE_SIZE = 8  # Quadros em trânsito entre o desenho e o encoder
+PUT_TIMEOUT = 0.5  # Segundos entre conferências de que o encoder ainda está vivo
+CLIP_END_HOLD = 2.0  # Segundos parado no último quadro de cada partida
+GIF_SCALE = 0.5  # GIFs saem com metade do tamanho da janela
+GIF_MIN_DELAY = 0.02  # Players de GIF tratam quadros mais curtos como 0,1 s
+VIDEO_FPS = 30
+VIDEO_EXTENSIONS = ('.mp4', '.webm', '.mkv', '.mov')
+
+# Paleta dos GIFs: cubo 6x6x6, rampa de cinzas (texto com antialiasing) e as
+# cores exatas do jogo que não caem em nenhum dos dois; o índice 255 é o
+# transparente, usado nos pixels que não mudaram desde o quadro anterior
+GIF_CUBE = 6
+GIF_GRAYS = 32
+GIF_EXACT_FIRST = GIF_CUBE ** 3 + GIF_GRAYS
+GIF_TRANSPARENT = 255
+GIF_MIN_CODE_SIZE = 8
+GIF_MAX_CODES = 4096
+
+
+class ExportError(Exception):
+    pass
+
+
+def clip_format(path):
+    # 'gif', 'video' ou 'png' (diretório com um PNG por quadro), pela extensão
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.gif':
+        return 'gif'
+    if extension in VIDEO_EXTENSIONS:
+        if shutil.which('ffmpeg') is None:
+            raise ExportError(f'ffmpeg não encontrado: exporte como .gif ou PNGs ({path})')
+        return 'video'
+    if extension:
+        raise ExportError(f'formato de clipe desconhecido: {extension}')
+    return 'png'
+
+
+def lzw_encode(data, min_code_size=GIF_MIN_CODE_SIZE):
+    # Compressão LZW do GIF (códigos de tamanho variável, LSB primeiro); a
+    # tabela é reiniciada com um código clear quando chega a 4096 entradas
+    clear = 1 << min_code_size
+    initial_size = min_code_size + 1
+    out = bytearray()
+    accumulator = clear
+    bits = code_size = initial_size
+    max_code = (1 << code_size) - 1
+    next_code = clear + 2
+    table = {}
+    codes = iter(data)
+    prefix = next(codes)
+    for value in codes:
+        key = prefix << 8 | value
+        code = table.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        accumulator |= prefix << bits
+        bits += code_size
+        while bits >= 8:
+            out.append(accumulator & 0xFF)
+            accumulator >>= 8
+            bits -= 8
+        if next_code > max_code:
+            code_size += 1
+            max_code = GIF_MAX_CODES if code_size == 12 else (1 << code_size) - 1
+        if next_code < GIF_MAX_CODES:
+            table[key] = next_code
+            next_code += 1
+        else:
+            accumulator |= clear << bits
+            bits += code_size
+            table.clear()
+            next_code = clear + 2
+            code_size = initial_size
+            max_code = (1 << code_size) - 1
+        prefix = value
+    for code in (prefix, clear + 1):
+        accumulator |= code << bits
+        bits += code_size
+        if next_code > max_code:
+            code_size += 1
+            max_code = GIF_MAX_CODES if code_size == 12 else (1 << code_size) - 1
+    while bits > 0:
+        out.append(accumulator & 0xFF)
+        accumulator >>= 8
+        bits -= 8
+    return out
+
+
+def gif_palette(colors=()):
+    levels = [round(i * 255 / (GIF_CUBE - 1)) for i in range(GIF_CUBE)]
+    palette = [(r, g, b) for r in levels for g in levels for b in levels]
+    palette += [(v, v, v) for v in (round(i * 255 / (GIF_GRAYS - 1)) for i in range(GIF_GRAYS))]
+    exact = [color for color in dict.fromkeys(tuple(color) for color in colors) if color not in palette]
+    exact = exact[:GIF_TRANSPARENT - GIF_EXACT_FIRST]
+    palette += exact
+    palette += [(0, 0, 0)] * (256 - len(palette))
+    return palette, exact
+
+
+class GifWriter:
+    # GIF animado gravado quadro a quadro: cada quadro guarda só o retângulo
+    # que mudou (o resto fica transparente) e quadros iguais seguidos viram
+    # um só, mais longo. Em memória ficam só o último quadro gravado e o
+    # pendente (que ainda pode ganhar tempo).
+    def __init__(self, path, size, colors=()):
+        self.width, self.height = size
+        palette, self.exact = gif_palette(colors)
+        self.exact_keys = [r << 16 | g << 8 | b for r, g, b in self.exact]
+        self.file = open(path, 'wb')
+        self.file.write(b'GIF89a' + struct.pack('<HHBBB', self.width, self.height, 0xF7, 0, 0))
+        self.file.write(bytes(value for color in palette for value in color))
+        # Repetir para sempre (extensão NETSCAPE2.0)
+        self.file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+        self.shown = None  # Índices do último quadro gravado
+        self.pending = None
+        self.pending_start = 0.0
+        self.time = 0.0  # Fim do quadro pendente, em segundos
+        self.written_cs = 0  # Tempo já gravado, em centésimos
+
+    def quantize(self, data):
+        rgb = np.frombuffer(data, dtype=np.uint8).reshape(self.height, self.width, 3)
+        levels = (rgb.astype(np.uint16) * (GIF_CUBE - 1) + 127) // 255
+        index = (levels[..., 0] * GIF_CUBE ** 2 + levels[..., 1] * GIF_CUBE + levels[..., 2]).astype(np.uint8)
+        r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+        gray = (r == g) & (g == b)
+        index[gray] = GIF_CUBE ** 3 + (r[gray].astype(np.uint16) * (GIF_GRAYS - 1) + 127) // 255
+        if self.exact_keys:
+            keys = r.astype(np.uint32) << 16 | g.astype(np.uint32) << 8 | b
+            for i, key in enumerate(self.exact_keys):
+                index[keys == key] = GIF_EXACT_FIRST + i
+        return index
+
+    def write(self, data, delay):
+        index = self.quantize(data)
+        if self.pending is not None and np.array_equal(index, self.pending):
+            self.time += delay
+            return
+        if self.pending is not None and self.time - self.pending_start >= GIF_MIN_DELAY:
+            self._write_pending()
+            self.pending_start = self.time
+        # Um pendente curto demais é trocado pelo quadro novo, que herda o tempo dele
+        self.pending = index
+        self.time += delay
+
+    def _write_pending(self):
+        index = self.pending
+        end_cs = round(self.time * 100)
+        delay_cs = max(end_cs - self.written_cs, 1)
+        self.written_cs += delay_cs
+        left = top = 0
+        if self.shown is None:
+            image = index
+        else:
+            changed = index != self.shown
+            rows = np.flatnonzero(changed.any(axis=1))
+            columns = np.flatnonzero(changed.any(axis=0))
+            if len(rows):
+                top, left = rows[0], columns[0]
+                box = (slice(top, rows[-1] + 1), slice(left, columns[-1] + 1))
+                image = np.where(changed[box], index[box], GIF_TRANSPARENT).astype(np.uint8)
+            else:
+                image = np.full((1, 1), GIF_TRANSPARENT, dtype=np.uint8)
+        height, width = image.shape
+        out = bytearray(b'\x21\xf9\x04')
+        # Descarte 1 (o quadro fica na tela) e transparência a partir do segundo quadro
+        out += struct.pack('<BHBB', 1 << 2 | (self.shown is not None), delay_cs, GIF_TRANSPARENT, 0)
+        out += b'\x2c' + struct.pack('<HHHHB', left, top, width, height, 0)
+        out.append(GIF_MIN_CODE_SIZE)
+        compressed = lzw_encode(image.tobytes())
+        for start in range(0, len(compressed), 255):
+            block = compressed[start:start + 255]
+            out.append(len(block))
+            out += block
+        out.append(0)
+        self.file.write(out)
+        self.shown = index
+
+    def close(self):
+        if self.pending is not None:
+            self._write_pending()
+        self.file.write(b'\x3b')
+        self.file.close()
+
+
+class PngSequenceWriter:
+    # Um PNG por quadro num diretório, mais frames.txt com a duração de cada
+    # um (no formato do concat do ffmpeg, para virar vídeo depois)
+    def __init__(self, path, size):
+        import pygame
+        self.pygame = pygame
+        self.path = path
+        self.size = size
+        self.frames = 0
+        os.makedirs(path, exist_ok=True)
+        self.list = open(os.path.join(path, 'frames.txt'), 'w')
+
+    def write(self, data, delay):
+        name = f'frame_{self.frames:06d}.png'
+        surface = self.pygame.image.frombuffer(data, self.size, 'RGB')
+        self.pygame.image.save(surface, os.path.join(self.path, name))
+        self.list.write(f"file '{name}'\nduration {delay:.4f}\n")
+        self.frames += 1
+
+    def close(self):
+        self.list.close()
+
+
+class FfmpegWriter:
+    # Quadros crus pelo stdin do ffmpeg; a taxa do vídeo é fixa, então cada
+    # quadro é repetido (ou pulado) conforme a duração dele
+    def __init__(self, path, size, fps=VIDEO_FPS):
+        self.fps = fps
+        self.time = 0.0
+        self.frames = 0
+        self.process = subprocess.Popen(
+            ['ffmpeg', '-loglevel', 'error', '-y', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{size[0]}x{size[1]}', '-r', str(fps), '-i', '-',
+             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', path],
+            stdin=subprocess.PIPE)
+
+    def write(self, data, delay):
+        self.time += delay
+        count = round(self.time * self.fps) - self.frames
+        for _ in range(count):
+            self.process.stdin.write(data)
+        self.frames += count
+
+    def close(self):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise ExportError(f'ffmpeg terminou com código {self.process.returncode}')
+
+
+def open_writer(path, size, colors=()):
+    kind = clip_format(path)
+    if kind == 'gif':
+        return GifWriter(path, size, colors)
+    if kind == 'video':
+        return FfmpegWriter(path, size)
+    return PngSequenceWriter(path, size)
+
+
+def encoder_worker(frames, results, path, size, colors):
+    # Processo encoder: consome (bytes RGB, duração) até receber None
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        writer = open_writer(path, size, colors)
+        count = 0
+        while True:
+            item = frames.get()
+            if item is None:
+                break
+            writer.write(*item)
+            count += 1
+        writer.close()
+        results.put(('done', path, count))
+    except Exception as e:
+        results.put(('error', f'{type(e).__name__}: {e}'))
+
+
+class ClipExporter:
+    # Lado de quem produz os quadros: a fila e o processo encoder
+    def __init__(self, path, size, colors=()):
+        clip_format(path)  # Formato inválido ou sem ffmpeg: erro já aqui
+        self.path = path
+        self.size = size
+        self.frames = multiprocessing.Queue(EXPORT_QUEUE_SIZE)
+        self.results = multiprocessing.Queue(1)
+        self.process = multiprocessing.Process(target=encoder_worker,
+                                               args=(self.frames, self.results, path, size, list(colors)),
+                                               daemon=True)
+        self.process.start()
+        self.sent = 0
+        self.dropped = 0
+        self.result = None
+
+    def put(self, data, delay):
+        # Espera vaga na fila; ExportError se o encoder morreu
+        while True:
+            try:
+                self.frames.put((data, delay), timeout=PUT_TIMEOUT)
+                self.sent += 1
+                return
+            except queue.Full:
+                if not self.process.is_alive():
+                    raise ExportError(self._failure())
+
+    def offer(self, data, delay):
+        # Nunca espera: com a fila cheia o quadro é descartado (False)
+        try:
+            self.frames.put_nowait((data, delay))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.sent += 1
+        return True
+
+    def poll(self):
+        # Resultado do encoder ('done', caminho, quadros) ou ('error', mensagem); None enquanto roda
+        if self.result is None:
+            try:
+                self.result = self.results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive() and self.process.exitcode is not None:
+                    self.result = ('error', self._failure())
+        return self.result
+
+    def _failure(self):
+        try:
+            return self.results.get_nowait()[-1]
+        except queue.Empty:
+            return f'encoder terminou com código {self.process.exitcode}'
+
+    def finish(self):
+        # Fecha o clipe e espera o encoder terminar
+        while self.result is None:
+            try:
+                self.frames.put(None, timeout=PUT_TIMEOUT)
+                break
+            except queue.Full:
+                self.poll()
+        if self.result is None:
+            self.result = self.results.get()
+        self.process.join()
+        if self.result[0] == 'error':
+            raise ExportError(self.result[1])
+        return self.result
+
+
+def clip_colors():
+    # Cores do jogo que a paleta do GIF deve ter exatas
+    import snake_game
+    return [snake_game.BACKGROUND_COLOR, snake_game.SNAKE_COLOR, snake_game.FOOD_COLOR,
+            snake_game.SPECIAL_FOOD_COLOR, snake_game.DANGER_FOOD_COLOR, snake_game.HUD_COLOR,
+            snake_game.HUD_LINE_COLOR, snake_game.HEART_COLOR, snake_game.TEXT_COLOR]
+
+
+def clip_size(scale):
+    import snake_game
+    return max(1, round(snake_game.WIDTH * scale)), max(1, round(snake_game.HEIGHT * scale))
+
+
+def replay_frames(replay, scale=1.0, speed=1.0):
+    # Reproduz o replay desenhando fora da tela; gera (bytes RGB, duração)
+    # de cada passo, e o último quadro fica CLIP_END_HOLD segundos
+    import pygame
+    import snake_game
+    from frame_capture import FrameCapture
+
+    game = snake_game.Game(duration=replay.duration, seed=replay.seed, width=replay.width, height=replay.height)
+    capture = FrameCapture(game)
+    size = clip_size(scale)
+    scaled = pygame.Surface(size, depth=32) if size != capture.surface.get_size() else None
+
+    def frame():
+        if scaled is None:
+            return pygame.image.tobytes(capture.surface, 'RGB')
+        # Vizinho mais próximo: mantém as cores exatas (e o GIF menor)
+        pygame.transform.scale(capture.surface, size, scaled)
+        return pygame.image.tobytes(scaled, 'RGB')
+
+    capture.render()
+    data = frame()
+    for direction in replay.inputs():
+        if game.over:
+            break
+        yield data, game.tick_duration() / speed
+        game.step(direction)
+        capture.render()
+        data = frame()
+    yield data, CLIP_END_HOLD
+
+
+def export_replays(replays, path, scale=None, speed=1.0):
+    # Um clipe com os replays em sequência (um só = o clipe da partida)
+    from frame_capture import init_headless
+    init_headless()
+    if scale is None:
+        scale = GIF_SCALE if clip_format(path) == 'gif' else 1.0
+    exporter = ClipExporter(path, clip_size(scale), clip_colors())
+    try:
+        for replay in replays:
+            for data, delay in replay_frames(replay, scale, speed):
+                exporter.put(data, delay)
+    except BaseException:
+        exporter.process.terminate()
+        raise
+    return exporter.finish()
+
+
+def clip_path_for(replay_path, extension='.gif'):
+    name = os.path.splitext(os.path.basename(replay_path))[0]
+    return os.path.join(CLIP_DIR, name + extension)
+
+
+def _export_job(replay_paths, path, scale, speed, results):
+    from replay import Replay
+    try:
+        result = export_replays([Replay.load(replay_path) for replay_path in replay_paths], path, scale, speed)
+    except Exception as e:
+        result = ('error', f'{type(e).__name__}: {e}')
+    results.put(result)
+
+
+class ExportJob:
+    # Exportação inteira (reprodução, desenho e encoder) fora do processo do
+    # jogo; o laço interativo só chama poll() de vez em quando
+    def __init__(self, replay_paths, path, scale=None, speed=1.0):
+        # spawn: o processo novo não herda a janela nem o estado do SDL do jogo
+        context = multiprocessing.get_context('spawn')
+        self.path = path
+        self.results = context.Queue(1)
+        self.process = context.Process(target=_export_job,
+                                       args=(list(replay_paths), path, scale, speed, self.results))
+        self.process.start()
+        self.result = None
+
+    def poll(self):
+        if self.result is None:
+            try:
+                self.result = self.results.get_nowait()
+            except queue.Empty:
+                if not self.process.is_alive() and self.process.exitcode is not None:
+                    self.result = ('error', f'exportação terminou com código {self.process.exitcode}')
+        return self.result
+
+
+def start_export(replay_path, path=None, scale=None, speed=1.0):
+    # Clipe GIF de uma partida gravada, em segundo plano
+    return ExportJob([replay_path], path or clip_path_for(replay_path), scale, speed)
+
+
+def best_replays(count):
+    # Replays das melhores partidas do ranking que ainda existem no disco
+    from leaderboard import Leaderboard
+    paths = []
+    offset = 0
+    leaderboard = Leaderboard()
+    try:
+        while len(paths) < count:
+            entries = leaderboard.top(count, offset)
+            if not entries:
+                break
+            offset += len(entries)
+            paths.extend(entry['replay'] for entry in entries
+                         if entry['replay'] and os.path.exists(entry['replay']))
+    finally:
+        leaderboard.close()
+    return paths[:count]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta replays como GIF, PNGs ou vídeo')
+    parser.add_argument('replays', nargs='*', help='arquivos .snkr (em sequência no mesmo clipe)')
+    parser.add_argument('-o', '--output', required=True,
+                        help='clipe.gif, clipe.mp4 (com ffmpeg) ou um diretório para PNGs')
+    parser.add_argument('--top', type=int, default=0, metavar='N',
+                        help='incluir os replays das N melhores partidas do ranking')
+    parser.add_argument('--speed', type=float, default=1.0, help='velocidade da reprodução')
+    parser.add_argument('--scale', type=float, default=None,
+                        help=f'escala dos quadros (padrão: {GIF_SCALE} em GIFs, 1 nos outros)')
+    args = parser.parse_args()
+    paths = args.replays + best_replays(args.top)
+    if not paths:
+        parser.error('nenhum replay para exportar')
+    from replay import Replay
+    start = time.perf_counter()
+    try:
+        _, path, frames = export_replays([Replay.load(path) for path in paths], args.output, args.scale, args.speed)
+    except ExportError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    size = os.path.getsize(path) if os.path.isfile(path) else sum(
+        os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    print(f"{path}: {frames} quadros de {len(paths)} partida(s), {size / 1024:.0f} KiB "
+          f"em {time.perf_counter() - start:.1f} s")
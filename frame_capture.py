@@ -0,0 +1,148 @@
+import argparse
+import os
+import random
+import time
+
+import numpy as np
+import pygame
+
+import snake_game
+from snake_core import DIRECTIONS, ENTITY_NAMES, GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, SAFE_ZONE_HEIGHT
+
+# Captura dos quadros do jogo sem janela, para treinar bots e para
+# conferências visuais automáticas.
+#
+# FrameCapture desenha um Game com o mesmo renderer da partida (make_renderer)
+# numa Surface fora da tela, sob o driver de vídeo dummy do SDL. Os pixels
+# saem como arrays NumPy que apontam para a memória da própria Surface
+# (pygame.surfarray.pixels3d), sem cópia por quadro; cells() é uma fatia
+# desse array com um pixel por célula da grade, também sem cópia.
+#
+# Enquanto uma view existe, o SDL mantém a Surface travada e não deixa
+# desenhar nela: solte a view (del) antes do próximo render(). Para guardar
+# um quadro, copie (pixels.copy()).
+#
+#     capture = FrameCapture(game)
+#     while not game.over:
+#         game.step(bot(game))
+#         capture.render()
+#         pixels = capture.pixels()   # (largura, altura, 3), uint8, RGB
+#         ...
+#         del pixels
+
+# Ponto amostrado dentro de cada célula em cells(): acima do centro, onde
+# todos os sprites (cabeça, corpo, comidas e caveira) têm a cor principal
+CELL_SAMPLE = (GRID_SIZE // 2, GRID_SIZE // 4)
+
+
+def init_headless():
+    # Driver dummy, a não ser que quem chamou já tenha escolhido outro (ou
+    # aberto a janela do jogo); Surfaces e fontes funcionam do mesmo jeito
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    snake_game.init_display()
+
+
+class FrameCapture:
+    def __init__(self, game, dirty=True):
+        # dirty: redesenhar só as células que mudaram (como no jogo)
+        init_headless()
+        self.game = game
+        self.surface = pygame.Surface((snake_game.WIDTH, snake_game.HEIGHT), depth=32)
+        self.renderer = snake_game.make_renderer(self.surface, game, present=False)
+        self.renderer.dirty = dirty
+        self.frames = 0
+
+    def render(self, show_start_message=False):
+        if self.surface.get_locked():
+            raise RuntimeError('a view do quadro anterior ainda existe: solte-a (del) antes de desenhar')
+        self.renderer.draw(self.game, self.game.remaining_time(), show_start_message)
+        self.frames += 1
+
+    def pixels(self):
+        # View (largura, altura, 3) dos pixels da Surface, em RGB; indexada
+        # por [x, y] como o surfarray (.transpose(1, 0, 2) dá [y, x], ainda
+        # sem cópia)
+        return pygame.surfarray.pixels3d(self.surface)
+
+    def cells(self):
+        # Observação em grade: (colunas, linhas, 3), um pixel por célula da
+        # janela (no tabuleiro grande, as células mostradas pela câmera)
+        x, y = CELL_SAMPLE
+        return self.pixels()[x::GRID_SIZE, y::GRID_SIZE]
+
+
+def expected_cells(game):
+    # O que cells() deve mostrar no tabuleiro padrão, montado a partir do
+    # estado do jogo (para conferir a captura)
+    atlas = snake_game.get_atlas()
+
+    def color(name):
+        return tuple(atlas[name].get_at(CELL_SAMPLE))[:3]
+    expected = np.empty((GRID_WIDTH, GRID_HEIGHT, 3), dtype=np.uint8)
+    expected[:] = snake_game.BACKGROUND_COLOR
+    for cell, kind in game.entities.items():
+        expected[game.board.position(cell)] = color(ENTITY_NAMES[kind])
+    for position in game.snake.positions:
+        expected[position] = color('body')
+    expected[game.snake.get_head_position()] = color('head')
+    return expected
+
+
+def check(games, seed):
+    # Joga partidas aleatórias capturando cada passo e confere, célula a
+    # célula, que a observação em grade bate com o estado do jogo
+    # No ponto amostrado, cada tipo de célula precisa ter uma cor própria
+    # (cabeça e corpo são do mesmo verde)
+    atlas = snake_game.get_atlas()
+    colors = {tuple(atlas[name].get_at(CELL_SAMPLE))[:3] for name in ('body', 'normal', 'special', 'skull')}
+    colors.add(tuple(snake_game.BACKGROUND_COLOR))
+    assert len(colors) == 5, f'CELL_SAMPLE {CELL_SAMPLE} não distingue os sprites'
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(games):
+        game = snake_game.Game(seed=rng.getrandbits(32))
+        capture = FrameCapture(game)
+        while not game.over:
+            game.step(rng.choice(DIRECTIONS) if rng.random() < 0.3 else None)
+            capture.render()
+            cells = capture.cells()
+            # As linhas do HUD têm texto; só o tabuleiro é conferido
+            wrong = np.argwhere((cells != expected_cells(game))[:, SAFE_ZONE_HEIGHT:].any(axis=2))
+            assert not len(wrong), (game.seed, game.tick, tuple(wrong[0] + (0, SAFE_ZONE_HEIGHT)))
+            del cells
+            checked += 1
+    return checked
+
+
+def measure(frames, seed, board_size=None):
+    # Capturas por segundo: passo do jogo + desenho + view dos pixels
+    rng = random.Random(seed)
+    width, height = board_size or (GRID_WIDTH, GRID_HEIGHT)
+    game = snake_game.Game(seed=seed, width=width, height=height)
+    capture = FrameCapture(game)
+    start = time.perf_counter()
+    for _ in range(frames):
+        if game.over:
+            game = snake_game.Game(seed=rng.getrandbits(32), width=width, height=height)
+            capture = FrameCapture(game)
+        game.step(rng.choice(DIRECTIONS) if rng.random() < 0.3 else None)
+        capture.render()
+        cells = capture.cells()
+        del cells
+    return frames / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    # python frame_capture.py [--frames N] [--check N] [--board LxA]
+    parser = argparse.ArgumentParser(description='Captura de quadros sem janela (NumPy)')
+    parser.add_argument('--frames', type=int, default=5000, help='capturas na medição de velocidade')
+    parser.add_argument('--check', type=int, default=5, metavar='N',
+                        help='partidas conferidas célula a célula (0 = pular)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--board', type=snake_game.snake_core.parse_board_size, default=None,
+                        help='tabuleiro grande para a medição, ex.: 1000x1000')
+    args = parser.parse_args()
+    init_headless()
+    if args.check:
+        print(f"Quadros conferidos: {check(args.check, args.seed)}")
+    print(f"Capturas por segundo: {measure(args.frames, args.seed, args.board):.0f}")
@@ -0,0 +1,119 @@
+import json
+import time
+from array import array
+
+# Medição de tempo por fase de cada quadro do jogo. Cada quadro chama
+# begin_frame(), depois mark(fase) ao fim de cada trecho (o tempo desde a
+# marca anterior vai para aquela fase) e end_frame(). Os valores ficam num
+# buffer circular de tamanho fixo, de onde saem média, p50/p99 e passos/s.
+#
+# Desligado, begin_frame/mark/end_frame são funções vazias e Game.step nem
+# chama o profiler, então o custo no jogo normal é praticamente zero.
+
+PHASES = ('events', 'move', 'collisions', 'audio', 'draw', 'display', 'wait')
+HISTORY_SIZE = 240  # Quadros guardados (4 s a 60 fps)
+EXPORT_FLUSH_FRAMES = 120  # Quadros acumulados antes de gravar no JSONL
+
+
+def _noop(*args):
+    pass
+
+
+class FrameProfiler:
+    def __init__(self, history_size=HISTORY_SIZE, export_path=None):
+        self.history_size = history_size
+        self.frame_times = array('d', [0.0] * history_size)
+        self.frame_ends = array('d', [0.0] * history_size)
+        self.tick_counts = array('l', [0] * history_size)
+        self.phase_times = {phase: array('d', [0.0] * history_size) for phase in PHASES}
+        self.index = 0
+        self.count = 0
+        self.export_path = export_path
+        self.export_buffer = []
+        self.cached_stats = None
+        self.cached_at = 0.0
+        self.enabled = False
+        self.set_enabled(export_path is not None)
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+        if enabled:
+            self.begin_frame = self._begin_frame
+            self.mark = self._mark
+            self.end_frame = self._end_frame
+        else:
+            self.begin_frame = self.mark = self.end_frame = _noop
+            self.flush()
+
+    def _begin_frame(self):
+        now = time.perf_counter()
+        self.frame_start = self.last_mark = now
+        self.current = dict.fromkeys(PHASES, 0.0)
+        self.current_ticks = 0
+
+    def _mark(self, phase):
+        now = time.perf_counter()
+        self.current[phase] += now - self.last_mark
+        self.last_mark = now
+
+    def add_ticks(self, ticks):
+        if self.enabled:
+            self.current_ticks += ticks
+
+    def _end_frame(self):
+        now = time.perf_counter()
+        i = self.index
+        self.frame_times[i] = now - self.frame_start
+        self.frame_ends[i] = now
+        self.tick_counts[i] = self.current_ticks
+        for phase, value in self.current.items():
+            self.phase_times[phase][i] = value
+        self.index = (i + 1) % self.history_size
+        self.count = min(self.count + 1, self.history_size)
+        if self.export_path is not None:
+            record = {'t': round(now, 6), 'frame': round(self.frame_times[i] * 1000, 4),
+                      'ticks': self.current_ticks}
+            record.update((phase, round(value * 1000, 4)) for phase, value in self.current.items())
+            self.export_buffer.append(record)
+            if len(self.export_buffer) >= EXPORT_FLUSH_FRAMES:
+                self.flush()
+
+    def flush(self):
+        # Grava os quadros pendentes no JSONL (um objeto por quadro, tempos em ms)
+        if not self.export_path or not self.export_buffer:
+            return
+        with open(self.export_path, 'a', encoding='utf-8') as f:
+            for record in self.export_buffer:
+                f.write(json.dumps(record) + '\n')
+        self.export_buffer.clear()
+
+    def _recent(self, values):
+        if self.count < self.history_size:
+            return values[:self.count]
+        return values
+
+    def summary(self, max_age=0.25):
+        # stats() recalculado no máximo a cada max_age segundos (para o overlay)
+        now = time.perf_counter()
+        if self.cached_stats is None or now - self.cached_at > max_age:
+            self.cached_stats = self.stats()
+            self.cached_at = now
+        return self.cached_stats
+
+    def stats(self):
+        # Resumo dos quadros no buffer (tempos em segundos)
+        if not self.count:
+            return None
+        frames = sorted(self._recent(self.frame_times))
+        n = len(frames)
+        ends = self._recent(self.frame_ends)
+        span = max(ends) - min(ends)
+        ticks = sum(self._recent(self.tick_counts))
+        return {
+            'frame': sum(frames) / n,
+            'p50': frames[n // 2],
+            'p99': frames[min(n - 1, int(n * 0.99))],
+            'fps': (n - 1) / span if span > 0 else 0.0,
+            'ticks_per_second': ticks / span if span > 0 else 0.0,
+            'phases': {phase: sum(self._recent(values)) / n for phase, values in self.phase_times.items()}
+        }
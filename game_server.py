@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import json
+import struct
+import time
+from collections import deque
+
+from multiplayer import MultiGame, MAX_PLAYERS, parse_direction
+from snapshot_codec import SnapshotEncoder
+
+# Servidor multijogador (asyncio). O servidor é a autoridade: cada sala tem
+# o seu MultiGame e uma tarefa que avança a simulação num ritmo fixo, junta
+# a entrada de cada jogador para aquele passo e envia o estado resultante a
+# todos. Os clientes só mandam setas e desenham o que recebem.
+#
+# Protocolo: TCP.
+#   cliente -> servidor  uma mensagem JSON por linha:
+#                        {"type": "join", "room": "sala", "name": "...", "code": "...", "spectate": false}
+#                        {"type": "input", "direction": [dx, dy]}
+#                        {"type": "ack", "frame": n}  (último snapshot recebido)
+#   servidor -> cliente  quadros com u32 de tamanho + conteúdo; o primeiro
+#                        byte do conteúdo diz o tipo:
+#                        0 = mensagem JSON de controle:
+#                            {"type": "welcome", "player": id, "room": ..., "width": ..., "height": ..., "tick_rate": ...}
+#                            {"type": "round_over", "result": ..., "scores": [[pontos, nome], ...]}
+#                            {"type": "error", "message": ...}
+#                        1, 2 = snapshot do estado (keyframe ou delta, ver snapshot_codec.py)
+#
+# Cada passo vira um delta contra o último snapshot que o cliente confirmou,
+# com keyframes periódicos. Um processo aguenta centenas de salas: cada
+# passo é codificado uma vez por base confirmada (quase sempre uma por sala)
+# e escrito sem esperar os clientes (quem acumula dados demais sem ler é
+# desconectado, em vez de atrasar a sala inteira). Espectadores recebem os
+# mesmos snapshots sem entrar no jogo.
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8765
+MAX_PENDING_INPUTS = 3  # Setas guardadas por jogador entre dois passos
+MAX_WRITE_BUFFER = 256 * 1024  # Bytes pendentes antes de desconectar um cliente lento
+MAX_TICK_LAG = 1.0  # Atraso (s) a partir do qual a sala desiste de recuperar passos
+ROUND_BREAK = 3.0  # Segundos entre uma rodada e a próxima
+STATS_INTERVAL = 5.0
+MAX_SPECTATORS = 32  # Por sala
+CONTROL = 0  # Tipo de quadro das mensagens JSON do servidor
+FRAME_HEADER = struct.Struct('<I')
+
+
+def encode(message):
+    # Linha JSON (cliente -> servidor)
+    return (json.dumps(message, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+def frame(payload):
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def control(message):
+    # Mensagem JSON de controle (servidor -> cliente)
+    return frame(bytes([CONTROL]) + json.dumps(message, separators=(',', ':')).encode('utf-8'))
+
+
+class Connection:
+    def __init__(self, player_id, name, code, writer, spectator=False):
+        self.player_id = player_id
+        self.name = name
+        self.code = code
+        self.writer = writer
+        self.spectator = spectator
+        self.inputs = deque(maxlen=MAX_PENDING_INPUTS)
+        self.acked = None  # Último quadro de snapshot confirmado
+
+    def send(self, data):
+        # Não espera o envio; cliente que não lê é derrubado
+        if self.writer.is_closing():
+            return False
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.writer.close()
+            return False
+        self.writer.write(data)
+        return True
+
+    def next_input(self):
+        return self.inputs.popleft() if self.inputs else None
+
+
+class Room:
+    def __init__(self, name, server):
+        self.name = name
+        self.server = server
+        self.connections = {}  # id do jogador (ou espectador) -> Connection
+        self.players = 0
+        self.game = MultiGame()
+        # Quadros numerados por sala, contínuos entre rodadas
+        self.encoder = SnapshotEncoder()
+        self.task = None
+        self.ticks = 0
+        self.max_lag = 0.0
+
+    def is_full(self, spectator=False):
+        if spectator:
+            return len(self.connections) - self.players >= MAX_SPECTATORS
+        return self.players >= MAX_PLAYERS
+
+    def join(self, connection):
+        self.connections[connection.player_id] = connection
+        if not connection.spectator:
+            self.players += 1
+            self.game.add_player(connection.player_id, connection.name)
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def leave(self, player_id):
+        connection = self.connections.pop(player_id, None)
+        if connection is not None and not connection.spectator:
+            self.players -= 1
+            self.game.remove_player(player_id)
+
+    def broadcast(self, data):
+        for connection in list(self.connections.values()):
+            connection.send(data)
+
+    def broadcast_snapshot(self):
+        self.encoder.push(self.game.snapshot())
+        for connection in list(self.connections.values()):
+            connection.send(frame(self.encoder.encode_for(connection.acked)))
+
+    def new_round(self):
+        game = MultiGame()
+        for connection in self.connections.values():
+            if not connection.spectator:
+                game.add_player(connection.player_id, connection.name)
+        self.game = game
+
+    async def run(self):
+        # Passos em horários fixos (relógio do loop), não "dormir um passo":
+        # assim o ritmo não escorrega com o custo de cada passo
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        try:
+            while self.connections:
+                next_tick += self.game.tick_duration()
+                delay = next_tick - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+                    if -delay > MAX_TICK_LAG:
+                        next_tick = loop.time()
+                game = self.game
+                game.step({player_id: connection.next_input()
+                           for player_id, connection in self.connections.items()})
+                self.ticks += 1
+                self.broadcast_snapshot()
+                if game.over:
+                    self.broadcast(control({'type': 'round_over', 'result': game.result,
+                                            'scores': game.scores()}))
+                    await asyncio.sleep(ROUND_BREAK)
+                    self.new_round()
+                    next_tick = loop.time()
+        finally:
+            self.task = None
+            self.server.close_room(self)
+
+
+class GameServer:
+    def __init__(self):
+        self.rooms = {}
+        self.next_player_id = 1
+
+    def close_room(self, room):
+        if self.rooms.get(room.name) is room and not room.connections:
+            del self.rooms[room.name]
+
+    async def handle_client(self, reader, writer):
+        room = connection = None
+        try:
+            message = json.loads(await reader.readline() or 'null')
+            if not isinstance(message, dict) or message.get('type') != 'join':
+                writer.write(control({'type': 'error', 'message': 'esperava join'}))
+                return
+            room_name = str(message.get('room') or 'principal')[:32]
+            spectator = bool(message.get('spectate'))
+            room = self.rooms.get(room_name)
+            if room is None:
+                room = self.rooms[room_name] = Room(room_name, self)
+            if room.is_full(spectator):
+                writer.write(control({'type': 'error', 'message': 'sala cheia'}))
+                return
+            connection = Connection(self.next_player_id, str(message.get('name', ''))[:15],
+                                    str(message.get('code', ''))[:10], writer, spectator)
+            self.next_player_id += 1
+            writer.write(control({'type': 'welcome', 'player': None if spectator else connection.player_id,
+                                  'room': room.name, 'width': room.game.board.width,
+                                  'height': room.game.board.height,
+                                  'tick_rate': 1.0 / room.game.tick_duration()}))
+            room.join(connection)
+
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(message, dict):
+                    continue
+                kind = message.get('type')
+                if kind == 'ack':
+                    acked = message.get('frame')
+                    connection.acked = acked if isinstance(acked, int) else None
+                elif kind == 'input' and not spectator:
+                    direction = parse_direction(message.get('direction'))
+                    if direction is not None:
+                        connection.inputs.append(direction)
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if room is not None and connection is not None:
+                room.leave(connection.player_id)
+                self.close_room(room)
+            writer.close()
+
+    async def report(self, interval=STATS_INTERVAL):
+        # Linha periódica de estatísticas: salas, jogadores, passos/s e pior atraso
+        last_ticks = 0
+        last_time = time.perf_counter()
+        while True:
+            await asyncio.sleep(interval)
+            rooms = list(self.rooms.values())
+            ticks = sum(room.ticks for room in rooms)
+            now = time.perf_counter()
+            max_lag = max((room.max_lag for room in rooms), default=0.0)
+            for room in rooms:
+                room.max_lag = 0.0
+            print(f"Salas: {len(rooms)} | Jogadores: {sum(room.players for room in rooms)} | "
+                  f"Passos/s: {max(ticks - last_ticks, 0) / (now - last_time):.0f} | "
+                  f"Pior atraso: {max_lag * 1000:.1f} ms", flush=True)
+            last_ticks, last_time = ticks, now
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, stats=True):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Servidor ouvindo em {', '.join(str(s.getsockname()[:2]) for s in server.sockets)}", flush=True)
+        if stats:
+            asyncio.create_task(self.report())
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == '__main__':
+    # python game_server.py [--host 0.0.0.0] [--port 8765]
+    parser = argparse.ArgumentParser(description='Servidor multijogador do Jogo da Cobrinha')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--quiet', action='store_true', help='não mostrar estatísticas periódicas')
+    args = parser.parse_args()
+    try:
+        asyncio.run(GameServer().serve(args.host, args.port, not args.quiet))
+    except KeyboardInterrupt:
+        pass
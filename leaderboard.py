@@ -0,0 +1,191 @@
+import json
+import os
+import sqlite3
+import sys
+import time
+
+# Ranking guardado em SQLite (modo WAL). Cada partida vira uma linha com o
+# histórico completo; o índice por pontuação permite ler o top-K paginado, o
+# índice por jogador dá o recorde de cada um e a árvore de contagens dá a
+# posição de uma pontuação sem percorrer a tabela.
+# Várias instâncias do jogo na mesma máquina podem gravar ao mesmo tempo.
+
+DB_PATH = 'ranking.db'
+LEGACY_JSON_PATH = 'ranking.json'
+TXT_PATH = 'ranking.txt'
+BUSY_TIMEOUT = 5.0  # Segundos esperando outra instância liberar a escrita
+SCORE_BITS = 32  # Pontuações de 0 a 2**32 - 1 cabem na árvore de contagens
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    code TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    replay TEXT  -- Caminho do replay da partida (auditoria), se houver
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id);
+CREATE INDEX IF NOT EXISTS scores_by_player ON scores (name, code, score DESC);
+
+-- Árvore de contagens para a posição de uma pontuação: o nó (level, prefix)
+-- conta as partidas com score >> level = prefix. Cada partida soma 1 em um
+-- nó por nível e a posição lê um nó por nível, então as duas custam
+-- O(SCORE_BITS) consultas pela chave, seja qual for o tamanho do histórico.
+CREATE TABLE IF NOT EXISTS score_levels (
+    level INTEGER PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS score_tree (
+    level INTEGER NOT NULL,
+    prefix INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (level, prefix)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS score_tree_insert AFTER INSERT ON scores
+BEGIN
+    INSERT INTO score_tree (level, prefix, count)
+    SELECT level, NEW.score >> level, 1 FROM score_levels WHERE true
+    ON CONFLICT (level, prefix) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS score_tree_delete AFTER DELETE ON scores
+BEGIN
+    UPDATE score_tree SET count = count - 1
+    WHERE level IN (SELECT level FROM score_levels) AND prefix = OLD.score >> level;
+END;
+'''
+
+
+class Leaderboard:
+    def __init__(self, path=DB_PATH, legacy_json_path=LEGACY_JSON_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+        if legacy_json_path:
+            self._import_legacy_json(legacy_json_path)
+
+    def close(self):
+        self.connection.close()
+
+    def _migrate(self):
+        # Níveis da árvore (só na criação do banco: abrir um banco pronto não
+        # escreve nada)
+        if self.connection.execute('SELECT COUNT(*) FROM score_levels').fetchone()[0] != SCORE_BITS + 1:
+            self.connection.execute('INSERT OR IGNORE INTO score_levels (level) VALUES ' +
+                                    ', '.join(f'({level})' for level in range(SCORE_BITS + 1)))
+        # Bancos criados antes da coluna de replay
+        columns = [row['name'] for row in self.connection.execute('PRAGMA table_info(scores)')]
+        if 'replay' not in columns:
+            self.connection.execute('ALTER TABLE scores ADD COLUMN replay TEXT')
+        # Bancos com a tabela de contagens por pontuação: a árvore é montada
+        # uma vez a partir do histórico
+        legacy = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'score_counts'").fetchone()
+        if legacy or (not self.connection.execute('SELECT 1 FROM score_tree LIMIT 1').fetchone()
+                      and self.connection.execute('SELECT 1 FROM scores LIMIT 1').fetchone()):
+            with self._write():
+                self.connection.execute('DROP TRIGGER IF EXISTS scores_count_insert')
+                self.connection.execute('DROP TRIGGER IF EXISTS scores_count_delete')
+                self.connection.execute('DROP TABLE IF EXISTS score_counts')
+                self.connection.execute('DELETE FROM score_tree')
+                self.connection.execute(
+                    'INSERT INTO score_tree (level, prefix, count) '
+                    'SELECT level, score >> level, COUNT(*) FROM scores, score_levels GROUP BY level, score >> level')
+
+    def _import_legacy_json(self, json_path):
+        # Trazer o ranking antigo (ranking.json) na primeira vez que o banco é
+        # criado; com o banco já preenchido, nem lê o JSON nem pega o lock de escrita
+        if not os.path.exists(json_path) or self.connection.execute('SELECT 1 FROM scores LIMIT 1').fetchone():
+            return
+        try:
+            with open(json_path, 'r') as f:
+                ranking = json.load(f)
+        except (OSError, ValueError):
+            return
+        with self._write():
+            if self.connection.execute('SELECT 1 FROM scores LIMIT 1').fetchone():
+                return
+            now = time.time()
+            self.connection.executemany(
+                'INSERT INTO scores (name, code, score, created_at) VALUES (?, ?, ?, ?)',
+                [(entry['name'], entry.get('code', '0000'), int(entry['score']), now) for entry in ranking])
+
+    def _write(self):
+        return _Transaction(self.connection)
+
+    def add_score(self, name, code, score, replay=None):
+        # Grava a partida e devolve a posição dela no ranking (empates ficam
+        # atrás de quem fez a pontuação primeiro, como no ranking antigo)
+        with self._write():
+            self.connection.execute(
+                'INSERT INTO scores (name, code, score, created_at, replay) VALUES (?, ?, ?, ?, ?)',
+                (name, code, score, time.time(), replay))
+            return self.position_of(score)
+
+    def position_of(self, score):
+        # Posição da última partida registrada com essa pontuação: quantas têm
+        # score >= score, ou seja, score > score - 1. Para cada nível em que
+        # esse limite tem o bit 0, o nó irmão com o bit 1 só tem pontuações
+        # maiores; somando esses nós (e a raiz, para score <= 0) sai a contagem
+        if score <= 0:
+            row = self.connection.execute(
+                'SELECT count FROM score_tree WHERE level = ? AND prefix = 0', (SCORE_BITS,)).fetchone()
+            return row[0] if row else 0
+        bound = score - 1
+        row = self.connection.execute(
+            # CROSS JOIN: para cada nível, uma consulta pela chave (level, prefix)
+            'SELECT COALESCE(SUM(count), 0) FROM score_levels CROSS JOIN score_tree USING (level) '
+            'WHERE level < ? AND (? >> level) & 1 = 0 AND prefix = (? >> level) | 1',
+            (SCORE_BITS, bound, bound)).fetchone()
+        return row[0]
+
+    def top(self, limit=10, offset=0):
+        rows = self.connection.execute(
+            'SELECT name, code, score, replay FROM scores ORDER BY score DESC, id LIMIT ? OFFSET ?',
+            (limit, offset))
+        return [dict(row) for row in rows]
+
+    def count(self):
+        return self.connection.execute('SELECT COUNT(*) FROM scores').fetchone()[0]
+
+    def best_for(self, name, code):
+        # Recorde do jogador (None se ainda não jogou): a primeira linha dele
+        # no índice por jogador
+        row = self.connection.execute(
+            'SELECT score FROM scores WHERE name = ? AND code = ? ORDER BY score DESC LIMIT 1',
+            (name, code)).fetchone()
+        return row[0] if row else None
+
+    def export_txt(self, path=TXT_PATH, limit=10):
+        # Visão derivada no formato do antigo ranking.txt
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('=== RANKING DO JOGO DA COBRINHA ===\n\n')
+            for i, entry in enumerate(self.top(limit), 1):
+                f.write(f"{i}. {entry['name']} ({entry['code']}): {entry['score']} pontos\n")
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE pega o lock de escrita logo no início, então duas
+    # instâncias gravando juntas esperam a vez (até BUSY_TIMEOUT) em vez de
+    # falhar no meio da transação
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.connection.execute('COMMIT' if exc_type is None else 'ROLLBACK')
+        return False
+
+
+if __name__ == '__main__':
+    # python leaderboard.py [arquivo.txt] -> exporta o top 10 em texto
+    leaderboard = Leaderboard()
+    path = sys.argv[1] if len(sys.argv) > 1 else TXT_PATH
+    leaderboard.export_txt(path)
+    print(f"Ranking exportado para {path}")
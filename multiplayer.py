@@ -0,0 +1,170 @@
+import random
+
+from snake_core import (GRID_WIDTH, GRID_HEIGHT, BASE_FPS, DANGER_FOOD_COUNT, FOOD_POINTS, DIRECTIONS,
+                        NO_SLOT, SKULL, Snake, Food, DangerFood, EntityStore, FreeCells, TimedRules, new_seed)
+
+# Regras do modo multijogador: várias cobras no mesmo tabuleiro, com a mesma
+# comida e as mesmas caveiras. Como em snake_core, nada aqui depende de
+# rede nem de Pygame; o servidor (game_server.py) só chama step() no ritmo
+# fixo da sala e envia o estado para os clientes.
+#
+# Diferenças em relação ao jogo sozinho:
+#   - a sala anda num ritmo fixo (BASE_FPS passos/s); comer não acelera, já
+#     que todas as cobras dividem o mesmo relógio;
+#   - bater em outra cobra custa uma vida, como bater em si mesma;
+#   - cada jogador renasce numa célula livre sorteada, virado para o centro;
+#   - quem perde a última vida sai do tabuleiro e espera a próxima rodada.
+
+ROUND_DURATION = 120  # Segundos de jogo por rodada
+MAX_PLAYERS = 8
+
+
+class PlayerSnake(Snake):
+    def __init__(self, board, occupied, player_id, name=''):
+        self.player_id = player_id
+        self.name = name
+        super().__init__(board, occupied)
+
+    def spawn_position(self):
+        position = self.board.choice()
+        return position if position is not None else self.board.start_position
+
+    def reset(self):
+        super().reset()
+        self.face_center()
+
+    def respawn(self):
+        super().respawn()
+        self.face_center()
+
+    def face_center(self):
+        # Virar para o lado com mais espaço, para não nascer olhando a parede
+        x, y = self.positions[0]
+        dx = self.board.width // 2 - x
+        dy = self.board.height // 2 - y
+        if abs(dx) >= abs(dy):
+            self.direction = (1, 0) if dx >= 0 else (-1, 0)
+        else:
+            self.direction = (0, 1) if dy >= 0 else (0, -1)
+
+
+class MultiGame(TimedRules):
+    def __init__(self, duration=ROUND_DURATION, seed=None, width=GRID_WIDTH, height=GRID_HEIGHT,
+                 skulls=DANGER_FOOD_COUNT):
+        self.duration = duration
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        self.board = FreeCells(self.rng, width, height)
+        # Grade de ocupação compartilhada por todas as cobras
+        self.occupied = bytearray(self.board.size)
+        self.snakes = {}  # id do jogador -> PlayerSnake, na ordem de entrada
+        self.entities = EntityStore(self.board)
+        self.food = Food(self.entities)
+        self.danger_foods = [DangerFood(self.entities) for _ in range(skulls)]
+        self.skull_slots = range(self.food.slot + 1, len(self.entities))
+        self.tick = 0
+        self.elapsed = 0.0
+        self.last_danger_spawn = 0.0
+        self.over = False
+        self.result = None  # 'time_up', 'all_dead' ou 'board_full'
+        self.init_timers()
+
+    def add_player(self, player_id, name=''):
+        snake = PlayerSnake(self.board, self.occupied, player_id, name)
+        self.snakes[player_id] = snake
+        return snake
+
+    def remove_player(self, player_id):
+        snake = self.snakes.pop(player_id, None)
+        if snake is not None:
+            snake.clear()
+
+    def remaining_time(self):
+        return max(0, self.duration - self.elapsed)
+
+    def tick_duration(self):
+        return 1.0 / BASE_FPS
+
+    def step(self, inputs=None):
+        # inputs: id do jogador -> direção (ou None) para este passo.
+        # Devolve id -> lista de eventos ('move', 'eat', 'special_eat',
+        # 'lose_life', 'death'). As cobras andam na ordem de entrada; se duas
+        # disputam a mesma célula, a primeira fica com ela.
+        events = {}
+        if self.over:
+            return events
+        inputs = inputs or {}
+
+        for player_id, snake in self.snakes.items():
+            if not snake.alive:
+                continue
+            player_events = events[player_id] = []
+            direction = inputs.get(player_id)
+            if direction is not None:
+                snake.change_direction(direction)
+            prev_lives = snake.lives
+            snake.move()
+            if snake.lives == prev_lives:
+                player_events.append('move')
+
+            slot = self.entities.at(snake.get_head_position())
+            if slot == self.food.slot:
+                snake.length += 1
+                snake.score += FOOD_POINTS[self.food.type]
+                player_events.append('eat' if self.food.type == 'normal' else 'special_eat')
+                self.food.randomize_position()
+            elif slot != NO_SLOT:
+                snake.lose_life('skull')
+                self.entities.remove(slot)
+
+            if snake.lives < prev_lives:
+                player_events.append('lose_life' if snake.alive else 'death')
+            if not snake.alive:
+                snake.clear()
+
+        # Caveiras e relógio: os mesmos timers do jogo sozinho
+        self.timers.advance(self.tick)
+
+        if self.time_up:
+            self.over = True
+            self.result = 'time_up'
+        elif self.snakes and not any(snake.alive for snake in self.snakes.values()):
+            self.over = True
+            self.result = 'all_dead'
+        elif self.food.position is None:
+            self.over = True
+            self.result = 'board_full'
+
+        self.tick += 1
+        self.elapsed += self.tick_duration()
+        return events
+
+    def snapshot(self):
+        # Estado completo da sala em tipos simples (o servidor o codifica com
+        # snapshot_codec; posições são tuplas, como no resto do jogo)
+        return {
+            'tick': self.tick,
+            'remaining': self.remaining_time(),
+            'food': (*self.food.position, self.food.type) if self.food.position is not None else None,
+            'skulls': [self.board.position(cell) for cell in self.entities.cells_of(SKULL)],
+            'snakes': [{
+                'id': snake.player_id,
+                'name': snake.name,
+                'lives': snake.lives,
+                'score': snake.score,
+                'alive': snake.alive,
+                'body': list(snake.positions)
+            } for snake in self.snakes.values()]
+        }
+
+    def scores(self):
+        return sorted(((snake.score, snake.name) for snake in self.snakes.values()), reverse=True)
+
+
+def parse_direction(value):
+    # [dx, dy] vindo da rede -> uma das DIRECTIONS, ou None se inválido
+    try:
+        direction = (int(value[0]), int(value[1]))
+    except (TypeError, ValueError, IndexError):
+        return None
+    return direction if direction in DIRECTIONS else None
@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import time
+
+from snake_core import DIRECTIONS, BASE_FPS
+from game_server import DEFAULT_PORT, ROUND_BREAK, CONTROL, FRAME_HEADER, encode
+from snapshot_codec import SnapshotDecoder, SnapshotError, peek_frame
+
+# Clientes do modo multijogador.
+#
+# play() é o cliente do jogo: manda as setas e desenha o estado que o
+# servidor envia, sem simular nada localmente. O socket não bloqueia e é
+# lido uma vez por quadro, então a janela nunca fica esperando a rede. Os
+# estados chegam como snapshots binários (snapshot_codec.py); o cliente
+# confirma o último que recebeu para o servidor mandar deltas contra ele.
+#
+# load_test() abre muitas conexões sem janela (uma por jogador falso, com
+# setas aleatórias) para medir quantas salas um servidor aguenta:
+#
+#     python game_server.py
+#     python net_client.py --load-test --rooms 200 --players 4 --seconds 20
+
+RECV_SIZE = 65536
+OTHER_SNAKE_COLORS = [(0, 160, 255), (255, 80, 200), (230, 50, 50), (160, 100, 255),
+                      (0, 255, 200), (255, 120, 60), (200, 200, 200)]
+LOAD_TEST_INPUT_CHANCE = 0.2  # Chance de um jogador falso mandar uma seta a cada passo
+
+
+def parse_address(text):
+    # 'host' ou 'host:porta'
+    host, _, port = text.partition(':')
+    return host or 'localhost', int(port) if port else DEFAULT_PORT
+
+
+class ServerConnection:
+    def __init__(self, host, port, room, name, code, spectate=False):
+        self.socket = socket.create_connection((host, port), timeout=5)
+        self.socket.setblocking(False)
+        self.buffer = bytearray()
+        self.closed = False
+        self.decoder = SnapshotDecoder()
+        self.send({'type': 'join', 'room': room, 'name': name, 'code': code, 'spectate': spectate})
+
+    def send(self, message):
+        try:
+            self.socket.sendall(encode(message))
+        except OSError:
+            self.closed = True
+
+    def receive(self):
+        # Mensagens completas que chegaram desde a última chamada; snapshots
+        # viram {'type': 'state', ...estado...}
+        while not self.closed:
+            try:
+                data = self.socket.recv(RECV_SIZE)
+            except BlockingIOError:
+                break
+            except OSError:
+                self.closed = True
+                break
+            if not data:
+                self.closed = True
+                break
+            self.buffer += data
+        messages = []
+        pos = 0
+        buffer = self.buffer
+        while len(buffer) - pos >= FRAME_HEADER.size:
+            size, = FRAME_HEADER.unpack_from(buffer, pos)
+            end = pos + FRAME_HEADER.size + size
+            if end > len(buffer):
+                break
+            payload = bytes(buffer[pos + FRAME_HEADER.size:end])
+            pos = end
+            if payload and payload[0] == CONTROL:
+                messages.append(json.loads(payload[1:]))
+                continue
+            try:
+                messages.append(dict(self.decoder.decode(payload), type='state'))
+            except SnapshotError:
+                # Base perdida: pedir um keyframe
+                self.decoder = SnapshotDecoder()
+        del buffer[:pos]
+        if pos and not self.closed:
+            # Um ack por leitura basta: os deltas seguintes partem do último quadro
+            self.send({'type': 'ack', 'frame': self.decoder.frame})
+        return messages
+
+    def close(self):
+        self.closed = True
+        self.socket.close()
+
+
+def draw_state(surface, state, player_id, background, round_over=None):
+    import pygame
+    import snake_game
+    from snake_game import GRID_SIZE
+
+    atlas = snake_game.get_atlas()
+    surface.blit(background, (0, 0))
+    if state['food'] is not None:
+        x, y, kind = state['food']
+        surface.blit(atlas[kind], (x * GRID_SIZE, y * GRID_SIZE))
+    for x, y in state['skulls']:
+        surface.blit(atlas['skull'], (x * GRID_SIZE, y * GRID_SIZE))
+
+    me = None
+    for snake in state['snakes']:
+        body = snake['body']
+        if not body:
+            continue
+        if snake['id'] == player_id:
+            me = snake
+            surface.blits([(atlas['body'], (x * GRID_SIZE, y * GRID_SIZE)) for x, y in body[1:]], False)
+            surface.blit(atlas['head'], (body[0][0] * GRID_SIZE, body[0][1] * GRID_SIZE))
+            continue
+        # Outros jogadores: uma cor por jogador e o nome acima da cabeça
+        color = OTHER_SNAKE_COLORS[snake['id'] % len(OTHER_SNAKE_COLORS)]
+        for x, y in body[1:]:
+            surface.fill(color, (x * GRID_SIZE, y * GRID_SIZE, GRID_SIZE, GRID_SIZE))
+        head_x, head_y = body[0]
+        center = (head_x * GRID_SIZE + GRID_SIZE // 2, head_y * GRID_SIZE + GRID_SIZE // 2)
+        pygame.draw.circle(surface, color, center, GRID_SIZE // 2)
+        label = snake_game.render_text(snake['name'], 14, color)
+        surface.blit(label, label.get_rect(midbottom=(center[0], center[1] - GRID_SIZE // 2)))
+
+    if me is None:
+        me = next((snake for snake in state['snakes'] if snake['id'] == player_id), None)
+    snake_game.draw_hud(surface, me['lives'] if me else 0, me['score'] if me else 0, state['remaining'])
+
+    if round_over is not None:
+        snake_game.draw_text(surface, 'Fim da rodada', 50, snake_game.WIDTH // 2, snake_game.HEIGHT // 4)
+        for i, (score, name) in enumerate(round_over['scores'][:8]):
+            snake_game.draw_text(surface, f'{i + 1}. {name}: {score} pontos', 25,
+                                 snake_game.WIDTH // 2, snake_game.HEIGHT // 4 + 60 + i * 30)
+    elif me is not None and not me['alive']:
+        snake_game.draw_text(surface, 'Sem vidas: aguarde a próxima rodada', 30,
+                             snake_game.WIDTH // 2, snake_game.HEIGHT // 2)
+
+
+def play(surface, host, port, room, name, code, spectate=False):
+    # Cliente fino: setas vão para o servidor, o estado recebido vai para a tela.
+    # Volta quando o jogador aperta ESC ou o servidor fecha a conexão.
+    # Como espectador só assiste a sala.
+    import pygame
+    import snake_game
+
+    try:
+        connection = ServerConnection(host, port, room, name, code, spectate)
+    except OSError as e:
+        print(f"Não foi possível conectar a {host}:{port}: {e}")
+        return
+    background = snake_game.build_background()
+    clock = pygame.time.Clock()
+    player_id = None
+    state = None
+    round_over = None
+    changed = False
+    while not connection.closed:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                connection.close()
+                pygame.quit()
+                sys.exit()
+            elif event.type == pygame.KEYDOWN:
+                if event.key in snake_game.ARROW_DIRECTIONS and not spectate:
+                    connection.send({'type': 'input', 'direction': snake_game.ARROW_DIRECTIONS[event.key]})
+                elif event.key == pygame.K_ESCAPE:
+                    connection.close()
+                    return
+
+        for message in connection.receive():
+            kind = message.get('type')
+            if kind == 'welcome':
+                player_id = message['player']
+            elif kind == 'state':
+                state = message
+                round_over = None
+                changed = True
+            elif kind == 'round_over':
+                round_over = message
+                changed = True
+            elif kind == 'error':
+                print(f"Servidor recusou a conexão: {message.get('message')}")
+                connection.close()
+
+        # O estado muda no ritmo da sala (10 passos/s); entre um e outro não há o que desenhar
+        if changed and state is not None:
+            draw_state(surface, state, player_id, background, round_over)
+            pygame.display.update()
+            changed = False
+        clock.tick(snake_game.DISPLAY_FPS)
+
+
+async def _load_test_player(host, port, room, index, seconds, stats):
+    loop = asyncio.get_running_loop()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        stats['errors'] += 1
+        return
+    writer.write(encode({'type': 'join', 'room': room, 'name': f'bot{index}', 'code': '0000'}))
+    rng = random.Random(index)
+    deadline = loop.time() + seconds
+    try:
+        # O servidor manda um estado por passo, então o prazo é conferido a
+        # cada quadro (load_test cancela quem ficar preso numa sala parada)
+        while loop.time() < deadline:
+            header = await reader.readexactly(FRAME_HEADER.size)
+            payload = await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+            stats['bytes'] += len(header) + len(payload)
+            # Só o cabeçalho interessa; decodificar cada estado custaria mais
+            # que o próprio servidor. O ack é o mesmo de um cliente de verdade
+            if payload[0] != CONTROL:
+                stats['states'] += 1
+                writer.write(encode({'type': 'ack', 'frame': peek_frame(payload)}))
+                if rng.random() < LOAD_TEST_INPUT_CHANCE:
+                    writer.write(encode({'type': 'input', 'direction': rng.choice(DIRECTIONS)}))
+            elif payload.startswith(b'\x00{"type":"round_over"'):
+                stats['rounds'] += 1
+            elif payload.startswith(b'\x00{"type":"error"'):
+                stats['errors'] += 1
+                break
+    except asyncio.IncompleteReadError:
+        stats['dropped'] += 1
+    except ConnectionError:
+        stats['dropped'] += 1
+    finally:
+        writer.close()
+
+
+async def load_test(host, port, rooms, players, seconds):
+    stats = dict.fromkeys(('states', 'rounds', 'bytes', 'errors', 'dropped'), 0)
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(_load_test_player(host, port, f'carga{room}', room * players + i, seconds, stats))
+             for room in range(rooms) for i in range(players)]
+    _, stuck = await asyncio.wait(tasks, timeout=seconds + ROUND_BREAK + 2)
+    for task in stuck:
+        task.cancel()
+    elapsed = time.perf_counter() - start
+    # Cada fim de rodada (visto por cada jogador) pausa a sala por ROUND_BREAK
+    expected = rooms * players * seconds * BASE_FPS - stats['rounds'] * ROUND_BREAK * BASE_FPS
+    print(f"Salas: {rooms} | Jogadores: {rooms * players} | Duração: {elapsed:.1f} s")
+    print(f"Estados recebidos: {stats['states']} de ~{expected:.0f} esperados "
+          f"({stats['states'] / expected:.1%}) | Fins de rodada: {stats['rounds'] // players} | "
+          f"{stats['bytes'] / elapsed / 1e6:.2f} MB/s")
+    print(f"Erros: {stats['errors']} | Conexões derrubadas: {stats['dropped']}")
+    return stats
+
+
+if __name__ == '__main__':
+    # python net_client.py --load-test [--server host:porta] [--rooms N] [--players N] [--seconds N]
+    # (para jogar: python snake_game.py --server host:porta)
+    parser = argparse.ArgumentParser(description='Cliente de carga do servidor multijogador')
+    parser.add_argument('--load-test', action='store_true', required=True)
+    parser.add_argument('--server', type=parse_address, default=('localhost', DEFAULT_PORT))
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--players', type=int, default=4, help='jogadores por sala')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(load_test(*args.server, args.rooms, args.players, args.seconds))
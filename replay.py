@@ -0,0 +1,228 @@
+import itertools
+import os
+import struct
+import sys
+import time
+from datetime import datetime
+
+from snake_core import DIRECTIONS, GRID_WIDTH, GRID_HEIGHT, Game, FixedTimestep
+
+# Replays compactos: como o jogo é determinístico (semente + direção por
+# passo), basta gravar a semente e as entradas para reproduzir uma partida
+# inteira, seja sem janela a milhares de passos por segundo (auditoria do
+# ranking), seja na tela em qualquer velocidade.
+#
+# Formato (little-endian):
+#   cabeçalho  '<4sBQdII'  magic, versão, semente, duração, passos, pontuação
+#   tabuleiro  '<HH'       largura, altura em células (só a partir da versão 2)
+#   nome, código           u8 tamanho + UTF-8
+#   entradas               varints (tamanho da sequência << 3 | código)
+# Código 0 = nenhuma tecla no passo, 1..4 = índice em DIRECTIONS + 1.
+
+REPLAY_MAGIC = b'SNKR'
+REPLAY_VERSION = 2
+REPLAY_DIR = 'replays'
+HEADER = struct.Struct('<4sBQdII')
+BOARD = struct.Struct('<HH')
+
+
+class ReplayError(Exception):
+    pass
+
+
+def direction_code(direction):
+    return 0 if direction is None else DIRECTIONS.index(direction) + 1
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError('replay truncado')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class Replay:
+    def __init__(self, seed, duration, runs=None, ticks=0, score=0, player_name='', player_code='',
+                 width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.seed = seed
+        self.duration = duration
+        self.width = width
+        self.height = height
+        self.runs = runs if runs is not None else []  # [código, repetições]
+        self.ticks = ticks
+        self.score = score
+        self.player_name = player_name
+        self.player_code = player_code
+
+    def record(self, direction):
+        # Chamado uma vez por passo de simulação com a direção aplicada nele
+        code = direction_code(direction)
+        if self.runs and self.runs[-1][0] == code:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([code, 1])
+        self.ticks += 1
+
+    def inputs(self):
+        # Direção (ou None) de cada passo, na ordem
+        for code, count in self.runs:
+            direction = None if code == 0 else DIRECTIONS[code - 1]
+            for _ in range(count):
+                yield direction
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.duration,
+                                    self.ticks, self.score))
+        out.extend(BOARD.pack(self.width, self.height))
+        for text in (self.player_name, self.player_code):
+            encoded = text.encode('utf-8')[:255]
+            out.append(len(encoded))
+            out.extend(encoded)
+        for code, count in self.runs:
+            _write_varint(out, count << 3 | code)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError('replay truncado')
+        magic, version, seed, duration, ticks, score = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ReplayError('arquivo não é um replay')
+        if version not in (1, REPLAY_VERSION):
+            raise ReplayError(f'versão de replay não suportada: {version}')
+        pos = HEADER.size
+        width, height = GRID_WIDTH, GRID_HEIGHT
+        if version >= 2:
+            if len(data) < pos + BOARD.size:
+                raise ReplayError('replay truncado')
+            width, height = BOARD.unpack_from(data, pos)
+            pos += BOARD.size
+        texts = []
+        for _ in range(2):
+            if pos >= len(data):
+                raise ReplayError('replay truncado')
+            size = data[pos]
+            texts.append(data[pos + 1:pos + 1 + size].decode('utf-8'))
+            pos += 1 + size
+        runs = []
+        while pos < len(data):
+            value, pos = _read_varint(data, pos)
+            code = value & 0x7
+            if code > len(DIRECTIONS):
+                raise ReplayError('entrada inválida no replay')
+            runs.append([code, value >> 3])
+        replay = cls(seed, duration, runs, ticks, score, *texts, width=width, height=height)
+        if sum(count for _, count in runs) != ticks:
+            raise ReplayError('número de passos não confere com o cabeçalho')
+        return replay
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+        return path
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def replay_for(game, player_name='', player_code=''):
+    # Replay vazio pronto para gravar a partida `game`
+    return Replay(game.seed, game.duration, player_name=player_name, player_code=player_code,
+                  width=game.board.width, height=game.board.height)
+
+
+def save_replay(replay, game, directory=REPLAY_DIR):
+    replay.score = game.snake.score
+    stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    name = ''.join(c for c in replay.player_name if c.isalnum()) or 'jogador'
+    base = os.path.join(directory, f'{stamp}-{name}-{game.snake.score}')
+    os.makedirs(directory, exist_ok=True)
+    data = replay.to_bytes()
+    # Duas partidas iguais no mesmo segundo (ou outra instância do jogo) não
+    # sobrescrevem uma à outra: 'xb' falha se o arquivo existe, e aí vai um sufixo
+    for attempt in itertools.count():
+        path = f'{base}-{attempt}.snkr' if attempt else f'{base}.snkr'
+        try:
+            with open(path, 'xb') as f:
+                f.write(data)
+            return path
+        except FileExistsError:
+            continue
+
+
+def simulate(replay, game_class=Game):
+    # Reproduz o replay sem janela e devolve o jogo no estado final
+    game = game_class(duration=replay.duration, seed=replay.seed, width=replay.width, height=replay.height)
+    for direction in replay.inputs():
+        if game.over:
+            break
+        game.step(direction)
+    return game
+
+
+def verify(replay):
+    # Confere se as entradas gravadas realmente levam à pontuação declarada
+    game = simulate(replay)
+    return game.snake.score == replay.score and game.tick == replay.ticks, game
+
+
+def play_on_screen(replay, speed=1.0):
+    # Mostra o replay na tela; speed multiplica a velocidade normal do jogo
+    import pygame
+    import snake_game
+
+    screen = pygame.display.set_mode((snake_game.WIDTH, snake_game.HEIGHT))
+    pygame.display.set_caption(f'Replay - {replay.player_name}')
+    clock = pygame.time.Clock()
+    game = snake_game.Game(duration=replay.duration, seed=replay.seed, width=replay.width, height=replay.height)
+    renderer = snake_game.make_renderer(screen, game)
+    inputs = replay.inputs()
+    timestep = FixedTimestep()
+    timestep.reset(time.perf_counter())
+    while not game.over:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                return game
+        timestep.advance(time.perf_counter())
+        while not game.over and timestep.consume(game.tick_duration() / speed):
+            direction = next(inputs, None)
+            if direction is None and game.tick >= replay.ticks:
+                return game  # Fim das entradas gravadas
+            game.step(direction)
+        renderer.draw(game, game.remaining_time())
+        clock.tick(snake_game.DISPLAY_FPS)
+    return game
+
+
+if __name__ == '__main__':
+    # python replay.py verify|play ARQUIVO [velocidade]
+    if len(sys.argv) < 3 or sys.argv[1] not in ('verify', 'play'):
+        print('Uso: python replay.py verify|play ARQUIVO [velocidade]')
+        sys.exit(2)
+    replay = Replay.load(sys.argv[2])
+    print(f"Jogador: {replay.player_name} ({replay.player_code}) | Pontuação declarada: {replay.score} | Passos: {replay.ticks}")
+    if sys.argv[1] == 'verify':
+        start = time.perf_counter()
+        ok, game = verify(replay)
+        duration = time.perf_counter() - start
+        print(f"Pontuação reproduzida: {game.snake.score} ({game.tick / duration:.0f} passos/s)")
+        print('OK' if ok else 'DIVERGENTE')
+        sys.exit(0 if ok else 1)
+    play_on_screen(replay, float(sys.argv[3]) if len(sys.argv) > 3 else 1.0)
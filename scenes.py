@@ -0,0 +1,159 @@
+import sys
+import time
+
+import pygame
+
+# Máquina de cenas: um único laço para menus, jogo e telas de resultado.
+#
+# As cenas ficam numa pilha (o ranking abre por cima do fim de jogo ou da
+# partida e, ao sair, a cena de baixo volta). O laço pergunta à cena do topo
+# quanto tempo pode dormir: telas paradas bloqueiam em pygame.event.wait até
+# chegar um evento ou até o próximo passo de animação (cursor piscando, por
+# exemplo) e só redesenham quando algo mudou; cenas em tempo real (a partida)
+# desenham a cada quadro, limitadas por clock.tick.
+#
+# Com a janela minimizada, escondida ou sem foco nada é desenhado: o laço
+# só espera eventos e avisa a cena (pause/resume), e a partida não anda.
+
+HIDE_EVENTS = (pygame.WINDOWMINIMIZED, pygame.WINDOWHIDDEN, pygame.WINDOWFOCUSLOST)
+SHOW_EVENTS = (pygame.WINDOWRESTORED, pygame.WINDOWSHOWN, pygame.WINDOWFOCUSGAINED, pygame.WINDOWMAXIMIZED)
+
+
+class Scene:
+    realtime = False  # True: desenha todo quadro (no ritmo do frame_rate)
+    frame_rate = 60
+
+    def __init__(self):
+        self.manager = None
+        self.dirty = True
+
+    def close(self, result=None):
+        self.manager.pop(result)
+
+    def enter(self):
+        pass
+
+    def pause(self):
+        pass
+
+    def resume(self):
+        # A cena voltou ao topo ou a janela voltou a aparecer
+        self.dirty = True
+
+    def timeout(self, now):
+        # Segundos até a cena precisar acordar sem eventos (None = só eventos)
+        return None
+
+    def begin_frame(self):
+        pass
+
+    def handle(self, event):
+        pass
+
+    def update(self, now):
+        pass
+
+    def draw(self, surface):
+        # Desenha e devolve os retângulos alterados (None = tela inteira)
+        return None
+
+    def end_frame(self):
+        pass
+
+
+class SceneManager:
+    def __init__(self, surface, clock=None):
+        self.surface = surface
+        self.clock = clock or pygame.time.Clock()
+        self.stack = []
+        self.visible = True
+        self.result = None
+
+    def push(self, scene):
+        if self.stack:
+            self.stack[-1].pause()
+        scene.manager = self
+        self.stack.append(scene)
+        scene.enter()
+        if not self.visible:
+            scene.pause()
+
+    def pop(self, result=None):
+        scene = self.stack.pop()
+        scene.pause()
+        self.result = result
+        if self.stack and self.visible:
+            self.stack[-1].resume()
+        return scene
+
+    def replace(self, scene):
+        if self.stack:
+            old = self.stack.pop()
+            old.pause()
+        self.push(scene)
+
+    def _events(self, scene):
+        if scene.realtime and self.visible:
+            return pygame.event.get()
+        timeout = scene.timeout(time.perf_counter()) if self.visible else None
+        if timeout is None:
+            event = pygame.event.wait()
+        else:
+            # wait(0) esperaria para sempre: no mínimo 1 ms
+            event = pygame.event.wait(max(1, int(timeout * 1000)))
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
+    def _set_visible(self, visible):
+        if visible == self.visible:
+            return
+        self.visible = visible
+        if self.stack:
+            if visible:
+                self.stack[-1].resume()
+            else:
+                self.stack[-1].pause()
+
+    def run(self, scene):
+        # Roda até a pilha esvaziar e devolve o resultado da última cena fechada
+        self.push(scene)
+        while self.stack:
+            scene = self.stack[-1]
+            scene.begin_frame()
+            for event in self._events(scene):
+                if event.type == pygame.QUIT:
+                    pygame.quit()
+                    sys.exit()
+                elif event.type in HIDE_EVENTS:
+                    self._set_visible(False)
+                elif event.type in SHOW_EVENTS:
+                    self._set_visible(True)
+                elif event.type == pygame.WINDOWEXPOSED:
+                    if self.stack:
+                        self.stack[-1].dirty = True
+                elif self.stack:
+                    # Se a cena mudar no meio, os próximos eventos já vão para a nova
+                    self.stack[-1].handle(event)
+            # Escondida, a cena não anda nem desenha
+            if not self.stack or self.stack[-1] is not scene or not self.visible:
+                continue
+
+            scene.update(time.perf_counter())
+            if not self.stack or self.stack[-1] is not scene:
+                continue
+            if scene.realtime or scene.dirty:
+                scene.dirty = False
+                rects = scene.draw(self.surface)
+                if rects is None:
+                    pygame.display.update()
+                elif rects:
+                    pygame.display.update(rects)
+            if scene.realtime:
+                self.clock.tick(scene.frame_rate)
+                scene.end_frame()
+        return self.result
+
+
+def run_scene(surface, scene, clock=None):
+    return SceneManager(surface, clock).run(scene)
@@ -0,0 +1,211 @@
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+# Envio das pontuações para a API em segundo plano. As telas de fim de jogo
+# só gravam a pontuação numa fila persistente (score_outbox.jsonl); uma thread
+# separada envia reaproveitando a mesma conexão HTTP, tenta de novo com espera
+# exponencial quando a rede ou a API falham e registra cada resultado em
+# api_log.txt. A biblioteca requests só é importada pela thread de envio,
+# então importar este módulo não atrasa a abertura do jogo.
+#
+# Se a API tem rota de lote (SNAKE_API_BATCH_URL), as entradas pendentes vão
+# juntas num POST só, uma lista de {id, data}; sem ela, um POST por entrada.
+# Nos dois casos o id da entrada é a chave de idempotência dos reenvios.
+
+API_URL = os.environ.get('SNAKE_API_URL', 'https://aula-h986.onrender.com/scores')
+API_BATCH_URL = os.environ.get('SNAKE_API_BATCH_URL')  # A API pública não tem rota de lote
+OUTBOX_PATH = 'score_outbox.jsonl'
+API_LOG_PATH = 'api_log.txt'
+
+REQUEST_TIMEOUT = 5  # Segundos por requisição
+BATCH_SIZE = 10  # Entradas por rodada de envio (um POST só na rota de lote)
+MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 1.0  # Espera após a primeira falha; dobra a cada tentativa
+RETRY_MAX_DELAY = 300.0
+
+
+def log_api_result(player_name, player_code, pontos, is_victory, status_code, response_text, sucesso):
+    with open(API_LOG_PATH, 'a', encoding='utf-8') as log_file:
+        data_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        status = 'SUCESSO' if sucesso else 'FALHA'
+        log_file.write(f"[{data_hora}] {status} | Jogador: {player_name} | Código: {player_code} | Pontos: {pontos} | Vitória: {is_victory} | Status HTTP: {status_code} | Resposta: {response_text}\n")
+
+
+def score_payload(player_name, player_code, is_victory):
+    # A API recebe 10 pontos por vitória e 5 por derrota
+    return {
+        "jogador": player_name,
+        "jogo": "jogo da cobra",
+        "ponto": 10 if is_victory else 5,
+        "codigo": player_code
+    }
+
+
+def retry_delay(attempts):
+    # Espera exponencial com um pouco de aleatoriedade para várias instâncias
+    # não tentarem todas no mesmo instante
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class ScoreSubmitter:
+    def __init__(self, api_url=API_URL, outbox_path=OUTBOX_PATH, log=log_api_result, batch_url=API_BATCH_URL):
+        self.api_url = api_url
+        self.batch_url = batch_url
+        self.outbox_path = outbox_path
+        self.log = log
+        self.session = None
+        self.condition = threading.Condition()
+        self.pending = OrderedDict()  # id -> entrada, na ordem de chegada
+        self.in_flight = set()
+        self.stopping = False
+        self.thread = None
+        self._load_outbox()
+
+    def _load_outbox(self):
+        # Entradas que não foram enviadas em execuções anteriores
+        if not os.path.exists(self.outbox_path):
+            return
+        with open(self.outbox_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Linha cortada por um encerramento no meio da escrita
+                entry['next_attempt'] = 0
+                self.pending[entry['id']] = entry
+
+    def _save_outbox(self):
+        # Regrava a fila só com o que ainda falta enviar (troca atômica)
+        temp_path = self.outbox_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for entry in self.pending.values():
+                f.write(json.dumps(entry) + '\n')
+        os.replace(temp_path, self.outbox_path)
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='score-submitter', daemon=True)
+            self.thread.start()
+        return self
+
+    def submit(self, player_name, player_code, score, is_victory):
+        # Chamado pela interface: só grava na fila e acorda a thread de envio
+        entry = {
+            'id': uuid.uuid4().hex,
+            'player_name': player_name,
+            'player_code': player_code,
+            'score': score,
+            'is_victory': is_victory,
+            'data': score_payload(player_name, player_code, is_victory),
+            'attempts': 0,
+            'next_attempt': 0
+        }
+        with self.condition:
+            self.pending[entry['id']] = entry
+            with open(self.outbox_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.condition.notify()
+        return entry['id']
+
+    def flush(self, timeout=None):
+        # Espera a fila esvaziar (ou o tempo acabar); devolve True se esvaziou
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.condition:
+            while self.pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.condition.wait(remaining)
+        return True
+
+    def stop(self, timeout=None):
+        with self.condition:
+            self.stopping = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _next_batch(self):
+        # Bloqueia até haver entradas vencidas; devolve None ao parar
+        with self.condition:
+            while not self.stopping:
+                now = time.monotonic()
+                due = [entry for entry_id, entry in self.pending.items()
+                       if entry['next_attempt'] <= now and entry_id not in self.in_flight]
+                if due:
+                    batch = due[:BATCH_SIZE]
+                    self.in_flight.update(entry['id'] for entry in batch)
+                    return batch
+                waits = [entry['next_attempt'] - now for entry in self.pending.values()]
+                self.condition.wait(min(waits) if waits else None)
+            return None
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            results = zip(batch, self._send(batch))
+            with self.condition:
+                for entry, done in results:
+                    self.in_flight.discard(entry['id'])
+                    if done:
+                        self.pending.pop(entry['id'], None)
+                    else:
+                        entry['next_attempt'] = time.monotonic() + retry_delay(entry['attempts'])
+                self._save_outbox()
+                self.condition.notify_all()
+
+    def _get_session(self):
+        if self.session is None:
+            try:
+                import requests
+                from requests.adapters import HTTPAdapter
+            except ImportError:  # O jogo continua funcionando; os envios ficam na fila
+                raise RuntimeError('biblioteca requests não instalada')
+            self.session = requests.Session()
+            # Uma conexão keep-alive reaproveitada por todos os envios
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self.session.mount('http://', adapter)
+            self.session.mount('https://', adapter)
+        return self.session
+
+    def _send(self, batch):
+        # Um POST para o lote inteiro na rota de lote, senão um por entrada
+        if self.batch_url is not None:
+            payload = [{'id': entry['id'], 'data': entry['data']} for entry in batch]
+            return self._post(self.batch_url, payload, batch)
+        results = []
+        for entry in batch:
+            # Permite que a API descarte reenvios da mesma partida
+            results += self._post(self.api_url, entry['data'], [entry], {'Idempotency-Key': entry['id']})
+        return results
+
+    def _post(self, url, payload, entries, headers=None):
+        # Devolve, para cada entrada, True quando ela sai da fila (sucesso ou
+        # erro definitivo)
+        for entry in entries:
+            entry['attempts'] += 1
+        try:
+            response = self._get_session().post(url, json=payload, timeout=REQUEST_TIMEOUT, headers=headers)
+        except Exception as e:
+            status_code, text, success, retryable = 'ERRO', str(e), False, True
+        else:
+            status_code, text = response.status_code, response.text
+            # Considerar sucesso se status for 200 ou 201
+            success = status_code in (200, 201)
+            # Erros do cliente (exceto 408/429) não melhoram com nova tentativa
+            retryable = status_code >= 500 or status_code in (408, 429)
+        results = []
+        for entry in entries:
+            self.log(entry['player_name'], entry['player_code'], entry['data']['ponto'], entry['is_victory'],
+                     status_code, text, success)
+            results.append(success or not retryable or entry['attempts'] >= MAX_ATTEMPTS)
+        return results
@@ -0,0 +1,669 @@
+import math
+import random
+from array import array
+from collections import deque
+from itertools import compress
+
+# Regras do Jogo da Cobrinha sem dependência do Pygame.
+# Este módulo pode ser importado por ferramentas headless (bots, simulações
+# em lote, testes de balanceamento) sem abrir janela nenhuma.
+
+# Constantes
+WIDTH, HEIGHT = 800, 600
+GRID_SIZE = 20
+GRID_WIDTH = WIDTH // GRID_SIZE
+GRID_HEIGHT = HEIGHT // GRID_SIZE
+
+# Área segura para o contador de pontuação (em número de células da grade)
+SAFE_ZONE_HEIGHT = 2
+
+# Direções
+UP = (0, -1)
+DOWN = (0, 1)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+DIRECTIONS = [UP, DOWN, LEFT, RIGHT]
+
+# Posição onde a cobra nasce e renasce (abaixo da área segura)
+START_POSITION = (GRID_WIDTH // 2, GRID_HEIGHT // 2 + SAFE_ZONE_HEIGHT)
+
+# Regras de tempo (em segundos de jogo)
+BASE_FPS = 10  # Passos por segundo com multiplicador 1.0
+GAME_DURATION = 45
+DANGER_FOOD_COUNT = 3
+DANGER_FOOD_LIFETIME = 2
+DANGER_SPAWN_DELAY = 1.0  # Spawn uma nova caveira a cada segundo
+
+# Pontuação e aceleração por tipo de comida
+FOOD_POINTS = {'normal': 1, 'special': 50}
+FOOD_SPEEDUP = {'normal': 1.02, 'special': 1.05}
+SPECIAL_FOOD_CHANCE = 0.1
+
+
+CELL_COUNT = GRID_WIDTH * GRID_HEIGHT
+
+
+def cell_index(position):
+    return position[1] * GRID_WIDTH + position[0]
+
+
+def cell_position(index):
+    return (index % GRID_WIDTH, index // GRID_WIDTH)
+
+
+class FreeCells:
+    # Índice das células jogáveis livres. Cobra, comida e caveiras marcam as
+    # células que ocupam; as livres ficam num array compacto com remoção por
+    # troca (swap-remove), então ocupar, liberar e sortear são O(1) mesmo com
+    # o tabuleiro quase cheio. O gerador aleatório do jogo fica aqui, já que
+    # todos os sorteios passam pelo tabuleiro.
+    #
+    # O tamanho do tabuleiro (em células) também mora aqui. O padrão é a
+    # grade da janela, mas o modo tabuleiro grande usa grades bem maiores que
+    # a tela (ex.: 1000x1000), vistas por uma câmera.
+    def __init__(self, rng=None, width=GRID_WIDTH, height=GRID_HEIGHT):
+        # rng: random.Random com semente (jogos reproduzíveis) ou o módulo random
+        self.rng = rng if rng is not None else random
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.start_position = (width // 2, min(height // 2 + SAFE_ZONE_HEIGHT, height - 1))
+        first_cell = SAFE_ZONE_HEIGHT * width
+        self.cells = list(range(first_cell, self.size))
+        self.slots = [-1] * first_cell + list(range(self.size - first_cell))
+        # Quantas entidades estão em cada célula (comida e cobra podem se sobrepor)
+        self.counts = bytearray(self.size)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def index(self, position):
+        return position[1] * self.width + position[0]
+
+    def position(self, cell):
+        return (cell % self.width, cell // self.width)
+
+    def is_free(self, position):
+        return self.slots[position[1] * self.width + position[0]] >= 0
+
+    def occupy(self, position):
+        self.occupy_cell(position[1] * self.width + position[0])
+
+    def occupy_cell(self, cell):
+        self.counts[cell] += 1
+        slot = self.slots[cell]
+        if slot >= 0:
+            last = self.cells.pop()
+            if last != cell:
+                self.cells[slot] = last
+                self.slots[last] = slot
+            self.slots[cell] = -1
+
+    def release(self, position):
+        self.release_cell(position[1] * self.width + position[0])
+
+    def release_cell(self, cell):
+        self.counts[cell] -= 1
+        if self.counts[cell] == 0:
+            self.slots[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def random_cell(self):
+        # Índice de uma célula livre aleatória, ou None se o tabuleiro está cheio
+        if not self.cells:
+            return None
+        return self.cells[self.rng.randrange(len(self.cells))]
+
+    def choice(self):
+        # Devolve uma célula livre aleatória, ou None se o tabuleiro está cheio
+        cell = self.random_cell()
+        return self.position(cell) if cell is not None else None
+
+
+# Tipos de entidade do EntityStore; os nomes também são as chaves do atlas
+NORMAL_FOOD = 1
+SPECIAL_FOOD = 2
+SKULL = 3
+ENTITY_NAMES = (None, 'normal', 'special', 'skull')
+NO_CELL = -1
+NO_SLOT = -1
+
+
+class EntityStore:
+    # Comida, caveiras e futuros itens em arrays paralelos (structure of
+    # arrays): o slot i é a entidade i, com tipo, célula, momento em que
+    # nasceu, tempo de vida e se está ativa. Uma grade célula -> slot
+    # responde "o que tem aqui?" numa consulta só, então a colisão da cabeça
+    # não depende de quantas entidades existem, e nascer, expirar e desenhar
+    # percorrem os arrays em bloco. Cada célula tem no máximo uma entidade
+    # ativa, já que todas nascem em células livres do tabuleiro.
+    #
+    # Os prazos são em segundos de jogo, como o resto das regras (a duração
+    # do passo muda com a velocidade).
+    def __init__(self, board):
+        self.board = board
+        self.kinds = bytearray()
+        self.active = bytearray()
+        self.cells = array('i')
+        self.spawn_times = array('d')
+        self.lifetimes = array('d')
+        self.slot_at = array('i', [NO_SLOT]) * board.size
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add(self, kind, lifetime=0.0):
+        # Reserva um slot (ainda inativo) e devolve o número dele
+        self.kinds.append(kind)
+        self.active.append(0)
+        self.cells.append(NO_CELL)
+        self.spawn_times.append(0.0)
+        self.lifetimes.append(lifetime)
+        return len(self.kinds) - 1
+
+    def at(self, position):
+        # Slot da entidade ativa na célula, ou NO_SLOT
+        return self.slot_at[position[1] * self.board.width + position[0]]
+
+    def position(self, slot):
+        cell = self.cells[slot]
+        return self.board.position(cell) if cell != NO_CELL else None
+
+    def spawn(self, slot, now=0.0):
+        # Ativa o slot numa célula livre sorteada; False se o tabuleiro está cheio
+        self.remove(slot)
+        cell = self.board.random_cell()
+        if cell is None:
+            self.cells[slot] = NO_CELL
+            return False
+        self.board.occupy_cell(cell)
+        self.slot_at[cell] = slot
+        self.cells[slot] = cell
+        self.spawn_times[slot] = now
+        self.active[slot] = 1
+        return True
+
+    def remove(self, slot):
+        if self.active[slot]:
+            cell = self.cells[slot]
+            self.board.release_cell(cell)
+            self.slot_at[cell] = NO_SLOT
+            self.active[slot] = 0
+
+    def free_slot(self, slots):
+        # Primeiro slot inativo do intervalo slots (range), ou NO_SLOT
+        return self.active.find(0, slots.start, slots.stop)
+
+    def expired(self, slot, now):
+        # Inativa (já saiu do tabuleiro) ou viva há mais que o tempo de vida
+        return not self.active[slot] or now - self.spawn_times[slot] > self.lifetimes[slot]
+
+    def items(self):
+        # (célula, tipo) das entidades ativas, na ordem dos slots
+        return list(compress(zip(self.cells, self.kinds), self.active))
+
+    def cells_of(self, kind):
+        return [cell for cell, entity_kind in self.items() if entity_kind == kind]
+
+
+class Snake:
+    def __init__(self, board=None, occupied=None):
+        self.board = board if board is not None else FreeCells()
+        # Corpo como deque (cabeça à esquerda) sincronizado com uma grade de
+        # ocupação, para que mover, crescer e testar colisão sejam O(1).
+        # Várias cobras no mesmo tabuleiro compartilham a mesma grade, e aí
+        # bater em outra cobra é o mesmo teste que bater em si mesma.
+        self.positions = deque()
+        self.occupied = occupied if occupied is not None else bytearray(self.board.size)
+        self.reset()
+
+    def reset(self):
+        self.length = 1
+        # Garantir que a cobra comece abaixo da área segura
+        self.respawn()
+        self.direction = self.board.rng.choice(DIRECTIONS)
+        self.score = 0
+        self.lives = 2  # Agora a cobra tem 2 vidas
+        self.alive = True
+        self.last_cause = None  # 'wall', 'body' ou 'skull': o que tirou a última vida
+        self.speed_multiplier = 1.0  # Multiplicador de velocidade inicial
+
+    def get_head_position(self):
+        return self.positions[0]
+
+    def occupies(self, position):
+        return self.occupied[position[1] * self.board.width + position[0]] != 0
+
+    def spawn_position(self):
+        return self.board.start_position
+
+    def clear(self):
+        # Tira o corpo do tabuleiro
+        board = self.board
+        for position in self.positions:
+            self.occupied[board.index(position)] = 0
+            board.release(position)
+        self.positions.clear()
+
+    def respawn(self):
+        self.clear()
+        position = self.spawn_position()
+        self.positions.append(position)
+        self.occupied[self.board.index(position)] = 1
+        self.board.occupy(position)
+
+    def change_direction(self, direction):
+        if (direction[0] * -1, direction[1] * -1) != self.direction:
+            self.direction = direction
+
+    def lose_life(self, cause=None):
+        self.last_cause = cause
+        self.lives -= 1
+        if self.lives <= 0:
+            self.alive = False
+        else:
+            # Reposicionar a cobra no centro após perder uma vida
+            self.respawn()
+
+    def move(self):
+        if not self.alive:
+            return
+
+        board = self.board
+        head = self.get_head_position()
+        x, y = self.direction
+        new_x = head[0] + x
+        new_y = head[1] + y
+        new_position = (new_x, new_y)
+
+        # Verificar colisão com as paredes ou área do contador
+        if new_x < 0 or new_x >= board.width or new_y < 0 or new_y >= board.height or new_y < SAFE_ZONE_HEIGHT:
+            self.lose_life('wall')
+            return
+
+        # Verificar colisão com o próprio corpo (a cabeça nunca é o destino,
+        # então basta consultar a grade)
+        new_cell = new_y * board.width + new_x
+        if self.occupied[new_cell]:
+            self.lose_life('body')
+            return
+
+        self.positions.appendleft(new_position)
+        self.occupied[new_cell] = 1
+        board.occupy(new_position)
+        if len(self.positions) > self.length:
+            tail = self.positions.pop()
+            self.occupied[tail[1] * board.width + tail[0]] = 0
+            board.release(tail)
+
+
+class Entity:
+    # Uma entidade do EntityStore vista como objeto, para quem lida com uma
+    # de cada vez (bots, snapshots); as regras usam o store direto
+    def __init__(self, store, kind, lifetime=0.0):
+        self.store = store
+        self.slot = store.add(kind, lifetime)
+
+    @property
+    def position(self):
+        return self.store.position(self.slot)
+
+    @property
+    def active(self):
+        return self.store.active[self.slot] != 0
+
+    def deactivate(self):
+        self.store.remove(self.slot)
+
+
+class DangerFood(Entity):
+    def __init__(self, store):
+        super().__init__(store, SKULL, DANGER_FOOD_LIFETIME)
+        self.randomize_position()
+
+    @property
+    def spawn_time(self):
+        return self.store.spawn_times[self.slot]
+
+    def randomize_position(self, snake_positions=None, now=0):
+        # snake_positions fica por compatibilidade: as células da cobra já
+        # estão fora do índice de células livres
+        return self.store.spawn(self.slot, now)
+
+
+class Food(Entity):
+    def __init__(self, store):
+        super().__init__(store, NORMAL_FOOD)
+        self.randomize_position()
+
+    @property
+    def type(self):
+        # 'normal' ou 'special'
+        return ENTITY_NAMES[self.store.kinds[self.slot]]
+
+    def randomize_position(self, snake_positions=None):
+        # snake_positions fica por compatibilidade: as células da cobra já
+        # estão fora do índice de células livres
+        if not self.store.spawn(self.slot):
+            # Tabuleiro cheio: não há onde colocar a comida
+            return False
+
+        # Chance de 10% para comida especial
+        if self.store.board.rng.random() < SPECIAL_FOOD_CHANCE:
+            self.store.kinds[self.slot] = SPECIAL_FOOD
+        else:
+            self.store.kinds[self.slot] = NORMAL_FOOD
+        return True
+
+
+MAX_BOARD_SIDE = 65535  # Limite dos replays (u16 por dimensão)
+
+
+def parse_board_size(text):
+    # '1000x1000' -> (1000, 1000); ValueError se inválido
+    width, height = (int(value) for value in text.lower().split('x'))
+    if not (1 <= width <= MAX_BOARD_SIDE and SAFE_ZONE_HEIGHT < height <= MAX_BOARD_SIDE):
+        raise ValueError(f'tamanho de tabuleiro fora dos limites: {text}')
+    return width, height
+
+
+def new_seed():
+    return random.SystemRandom().getrandbits(63)
+
+
+TIMER_WHEEL_SIZE = 256  # Baldes da roda de timers (passos por volta)
+TIMER_SLACK = 1e-6  # Folga relativa na previsão do passo, contra arredondamentos do elapsed
+
+# Prioridades dos timers num mesmo passo: a ordem em que as regras sempre
+# rodaram (nascer caveira, expirar caveiras, fim do tempo)
+SPAWN_PRIORITY = 0
+EXPIRY_PRIORITY = 1
+CLOCK_PRIORITY = 2
+
+
+class Timer:
+    __slots__ = ('tick', 'priority', 'sequence', 'callback', 'active')
+
+    def __init__(self, tick, priority, sequence, callback):
+        self.tick = tick
+        self.priority = priority
+        self.sequence = sequence
+        self.callback = callback
+        self.active = True
+
+
+class TimerWheel:
+    # Agenda por passo de simulação (roda de timers com hash): cada balde
+    # guarda os timers dos passos com o mesmo resto por size, e avançar um
+    # passo só olha o balde dele. Timers mais distantes que uma volta ficam
+    # no balde e são revistos a cada volta; cancelar só marca o timer e
+    # reagendar deixa para trás uma entrada velha, descartada quando o balde
+    # dela for visitado.
+    def __init__(self, size=TIMER_WHEEL_SIZE):
+        self.size = size
+        self.buckets = {}  # Resto por size -> timers (só baldes em uso)
+        self.next_tick = 0  # Primeiro passo ainda não processado
+        self.sequence = 0
+
+    def schedule(self, tick, callback, priority=0):
+        timer = Timer(tick, priority, self.sequence, callback)
+        self.sequence += 1
+        self.reschedule(timer, tick)
+        return timer
+
+    def reschedule(self, timer, tick):
+        if tick < self.next_tick:
+            raise ValueError(f'passo {tick} já foi processado')
+        timer.tick = tick
+        timer.active = True
+        bucket = self.buckets.get(tick % self.size)
+        if bucket is None:
+            self.buckets[tick % self.size] = [timer]
+        else:
+            bucket.append(timer)
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer.active = False
+
+    def advance(self, tick):
+        # Roda os timers do passo tick, por prioridade e ordem de agendamento.
+        # Callbacks podem agendar timers a partir do passo seguinte.
+        self.next_tick = tick + 1
+        index = tick % self.size
+        bucket = self.buckets.pop(index, None)
+        if bucket is None:
+            return
+        due = []
+        later = []
+        for timer in bucket:
+            if not timer.active or timer.tick % self.size != index:
+                continue
+            if timer.tick == tick:
+                due.append(timer)
+            else:
+                later.append(timer)
+        if later:
+            self.buckets[index] = later
+        if len(due) > 1:
+            due.sort(key=lambda timer: (timer.priority, timer.sequence))
+        for timer in due:
+            if timer.active and timer.tick == tick:
+                timer.active = False
+                timer.callback()
+
+
+class TimedRules:
+    # Regras com prazo em segundos de jogo (caveiras, relógio da partida,
+    # futuros power-ups) sobre a roda de timers. Os prazos são em segundos,
+    # mas a duração do passo muda com a velocidade, então cada timer é
+    # agendado para o passo previsto (arredondado para antes) e, quando
+    # dispara, confere a condição exata com o elapsed do passo; se ainda é
+    # cedo, se reagenda. Assim o resultado é igual ao de conferir tudo a cada
+    # passo (replays antigos continuam valendo), mas o custo por passo não
+    # depende de quantas entidades com prazo existem. Quem usa precisa ter
+    # tick, elapsed, tick_duration(), duration, entities, skull_slots (os
+    # slots de caveira no store) e last_danger_spawn.
+    def init_timers(self):
+        self.timers = TimerWheel()
+        self.time_up = False
+        self.deadlines = {}  # Timer -> prazo em segundos, para reprever se o jogo ficar mais lento
+        self.expiry_timers = {}  # Slot -> timer de expiração
+        active = self.entities.active
+        for slot in self.skull_slots:
+            if active[slot]:
+                self.schedule_expiry(slot)
+        self.call_when(lambda now: now - self.last_danger_spawn > DANGER_SPAWN_DELAY,
+                       self.last_danger_spawn + DANGER_SPAWN_DELAY, self.spawn_danger_food, SPAWN_PRIORITY)
+        self.call_when(lambda now: self.duration - now <= 0, self.duration, self.end_clock, CLOCK_PRIORITY)
+
+    def predict_tick(self, deadline):
+        # Passo em que elapsed passa de deadline na velocidade atual; a folga
+        # faz a previsão errar sempre para antes (aí o timer só se reagenda)
+        ticks = (deadline - self.elapsed) / self.tick_duration()
+        ticks = math.ceil(ticks * (1 - TIMER_SLACK) - TIMER_SLACK)
+        return max(self.timers.next_tick, self.tick + ticks)
+
+    def call_when(self, due, deadline, callback, priority=0):
+        # callback(now) no primeiro passo em que due(now) for verdadeiro;
+        # deadline (segundos de jogo) é só a previsão de quando isso acontece
+        def fire():
+            now = self.elapsed
+            if due(now):
+                del self.deadlines[timer]
+                callback(now)
+            else:
+                self.timers.reschedule(timer, self.predict_tick(deadline))
+        timer = self.timers.schedule(self.predict_tick(deadline), fire, priority)
+        self.deadlines[timer] = deadline
+        return timer
+
+    def cancel_timer(self, timer):
+        if timer is not None:
+            self.timers.cancel(timer)
+            self.deadlines.pop(timer, None)
+
+    def slowed_down(self):
+        # Mais rápido, as previsões continuam adiantadas (seguras); mais lento,
+        # um prazo pode chegar antes do passo previsto, então tudo é reprevisto
+        for timer, deadline in self.deadlines.items():
+            self.timers.reschedule(timer, self.predict_tick(deadline))
+
+    def schedule_expiry(self, slot):
+        # A entidade do slot some depois do tempo de vida dela (caveiras:
+        # DANGER_FOOD_LIFETIME segundos)
+        entities = self.entities
+        def expire(now):
+            del self.expiry_timers[slot]
+            entities.remove(slot)
+        self.cancel_timer(self.expiry_timers.get(slot))
+        # Caveira já desativada (a cobra bateu nela) só libera o timer
+        self.expiry_timers[slot] = self.call_when(
+            lambda now: entities.expired(slot, now),
+            entities.spawn_times[slot] + entities.lifetimes[slot], expire, EXPIRY_PRIORITY)
+
+    def spawn_danger_food(self, now):
+        # Uma caveira nova a cada DANGER_SPAWN_DELAY segundos, se houver vaga
+        slot = self.entities.free_slot(self.skull_slots)
+        if slot != NO_SLOT and self.entities.spawn(slot, now):
+            self.schedule_expiry(slot)
+        self.last_danger_spawn = now
+        self.call_when(lambda now: now - self.last_danger_spawn > DANGER_SPAWN_DELAY,
+                       now + DANGER_SPAWN_DELAY, self.spawn_danger_food, SPAWN_PRIORITY)
+
+    def end_clock(self, now):
+        self.time_up = True
+
+
+class FixedTimestep:
+    # Acumulador de passo fixo: o tempo real entra em advance() e cada
+    # consume() libera um passo da simulação quando há tempo acumulado
+    # suficiente. Assim a velocidade do jogo não depende do custo de desenhar.
+    def __init__(self, max_frame_time=0.25):
+        # Limite de tempo real absorvido por quadro, para um quadro muito lento
+        # (ou uma pausa) não virar uma rajada enorme de passos
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.last_time = None
+
+    def reset(self, now):
+        self.accumulator = 0.0
+        self.last_time = now
+
+    def advance(self, now):
+        if self.last_time is not None:
+            self.accumulator += min(now - self.last_time, self.max_frame_time)
+        self.last_time = now
+
+    def consume(self, tick_duration):
+        if self.accumulator >= tick_duration:
+            self.accumulator -= tick_duration
+            return True
+        return False
+
+
+class Game(TimedRules):
+    # Classes usadas para criar as entidades; a versão com Pygame
+    # substitui a cobra por uma subclasse que sabe se desenhar (comida e
+    # caveiras são desenhadas direto do EntityStore).
+    snake_class = Snake
+    food_class = Food
+    danger_food_class = DangerFood
+
+    def __init__(self, duration=GAME_DURATION, seed=None, width=GRID_WIDTH, height=GRID_HEIGHT,
+                 skulls=DANGER_FOOD_COUNT):
+        self.duration = duration
+        # Cada jogo tem seu próprio gerador com semente: a mesma semente e as
+        # mesmas direções por passo reproduzem a partida inteira
+        self.seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.seed)
+        # Índice de células livres compartilhado por todas as entidades
+        self.board = FreeCells(self.rng, width, height)
+        self.snake = self.snake_class(self.board)
+        # Comida e caveiras moram no store; food e danger_foods são vistas dos slots
+        self.entities = EntityStore(self.board)
+        self.food = self.food_class(self.entities)
+        self.danger_foods = [self.danger_food_class(self.entities) for _ in range(skulls)]
+        self.skull_slots = range(self.food.slot + 1, len(self.entities))
+        self.tick = 0
+        self.elapsed = 0.0  # Tempo de jogo em segundos, somado a cada passo
+        self.last_danger_spawn = 0.0
+        self.over = False
+        self.result = None  # 'death', 'victory' ou 'board_full' quando o jogo acaba
+        self.profiler = None  # FrameProfiler opcional (tempo de movimento e colisões)
+        # Caveiras (nascer e expirar) e o relógio da partida andam por timers
+        self.init_timers()
+
+    def remaining_time(self):
+        return max(0, self.duration - self.elapsed)
+
+    def tick_duration(self):
+        # Cada passo dura 1 / (BASE_FPS * multiplicador) segundos de jogo
+        return 1.0 / (BASE_FPS * self.snake.speed_multiplier)
+
+    def step(self, direction=None):
+        # Avança um passo da simulação e devolve a lista de eventos
+        # ('move', 'eat', 'special_eat', 'lose_life', 'death') para quem
+        # quiser tocar sons ou coletar estatísticas.
+        events = []
+        if self.over:
+            return events
+
+        snake = self.snake
+
+        if direction is not None:
+            snake.change_direction(direction)
+
+        prev_head = snake.get_head_position()
+        prev_lives = snake.lives
+        snake.move()
+        if self.profiler is not None:
+            self.profiler.mark('move')
+        if prev_head != snake.get_head_position() and snake.alive and snake.lives == prev_lives:
+            events.append('move')
+
+        # Colisão com comida ou caveira: uma consulta na grade do store
+        slot = self.entities.at(snake.get_head_position())
+        if slot == self.food.slot:
+            food_type = self.food.type
+            snake.length += 1
+            snake.score += FOOD_POINTS[food_type]
+            snake.speed_multiplier *= FOOD_SPEEDUP[food_type]
+            if FOOD_SPEEDUP[food_type] < 1:
+                self.slowed_down()
+            events.append('eat' if food_type == 'normal' else 'special_eat')
+            self.food.randomize_position()
+        elif slot != NO_SLOT:
+            snake.lose_life('skull')
+            self.entities.remove(slot)
+
+        if snake.lives < prev_lives:
+            events.append('lose_life' if snake.alive else 'death')
+
+        # Spawn de novas caveiras, caveiras antigas e fim do tempo (timers
+        # deste passo, nessa ordem)
+        self.timers.advance(self.tick)
+
+        # Verificar se o jogo acabou
+        if not snake.alive:
+            self.over = True
+            self.result = 'death'
+        elif self.time_up:
+            self.over = True
+            self.result = 'victory'
+        elif self.food.position is None:
+            # A cobra encheu o tabuleiro: não sobra lugar para comida
+            self.over = True
+            self.result = 'board_full'
+
+        self.tick += 1
+        self.elapsed += self.tick_duration()
+        if self.profiler is not None:
+            self.profiler.mark('collisions')
+        return events
+
+    def run(self, policy=None, max_ticks=None):
+        # Roda o jogo até o fim sem janela; policy(game) devolve uma direção ou None
+        while not self.over and (max_ticks is None or self.tick < max_ticks):
+            self.step(policy(self) if policy is not None else None)
+        return self
@@ -1,21 +1,44 @@
 import pygame
-import sys
-import random
+import argparse
 import time
 import math
-import json
 import os
-# import requests  # Comentado temporariamente
+import threading
+from collections import OrderedDict, deque
+from itertools import islice
+from snake_core import (WIDTH, HEIGHT, GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, SAFE_ZONE_HEIGHT,
+                        UP, DOWN, LEFT, RIGHT, ENTITY_NAMES, NO_SLOT, FixedTimestep)
+import snake_core
+from leaderboard import Leaderboard
+from score_submitter import ScoreSubmitter
+from sound_synth import SAMPLE_RATE, SOUND_EFFECTS, CACHE_DIR as SOUND_CACHE_DIR, ensure_sound
+from sound_engine import SoundEngine
+from replay import replay_for, save_replay
+from frame_profiler import FrameProfiler
+from scenes import Scene, SceneManager, run_scene
 
-# Inicialização do Pygame
-pygame.init()
-pygame.mixer.init()  # Inicialização do mixer para sons
+# Inicialização do Pygame: só os subsistemas usados e só quando o jogo abre.
+# Importar este módulo não abre janela nem áudio, então ferramentas sem tela
+# (benchmarks, replays, simulação) usam as regras e o desenho em superfícies.
+def init_display():
+    pygame.display.init()
+    pygame.font.init()
 
-# Constantes
-WIDTH, HEIGHT = 800, 600
-GRID_SIZE = 20
-GRID_WIDTH = WIDTH // GRID_SIZE
-GRID_HEIGHT = HEIGHT // GRID_SIZE
+def init_mixer():
+    # Mixer no formato dos efeitos sintetizados
+    if not pygame.mixer.get_init():
+        pygame.mixer.init(frequency=SAMPLE_RATE, size=-16, channels=1)
+
+# Taxa máxima de desenho (a simulação tem sua própria taxa, ver FixedTimestep)
+DISPLAY_FPS = 60
+MAX_PENDING_DIRECTIONS = 3
+
+ARROW_DIRECTIONS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT
+}
 
 # Cores
 BACKGROUND_COLOR = (0, 0, 0)
@@ -30,340 +53,541 @@ BUTTON_COLOR = (0, 100, 0)  # Verde escuro para botões
 BUTTON_HOVER_COLOR = (0, 150, 0)  # Verde mais claro para hover
 BORDER_COLOR = (255, 255, 255)  # Branco para as bordas (alterado para branco)
 
-# Área segura para o contador de pontuação (em número de células da grade)
-SAFE_ZONE_HEIGHT = 2
+# As regras (movimento, colisões, spawn) ficam em snake_core; aqui as
+# entidades só ganham o desenho com Pygame.
 
-# Direções
-UP = (0, -1)
-DOWN = (0, 1)
-LEFT = (-1, 0)
-RIGHT = (1, 0)
-
-class Snake:
-    def __init__(self):
-        self.reset()
-    
-    def reset(self):
-        self.length = 1
-        # Garantir que a cobra comece abaixo da área segura
-        self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2 + SAFE_ZONE_HEIGHT)]
-        self.direction = random.choice([UP, DOWN, LEFT, RIGHT])
-        self.score = 0
-        self.lives = 2  # Agora a cobra tem 2 vidas
-        self.alive = True
-        self.speed_multiplier = 1.0  # Multiplicador de velocidade inicial
-    
-    def get_head_position(self):
-        return self.positions[0]
-    
-    def change_direction(self, direction):
-        if (direction[0] * -1, direction[1] * -1) != self.direction:
-            self.direction = direction
-    
-    def move(self):
-        if not self.alive:
-            return
-            
-        head = self.get_head_position()
-        x, y = self.direction
-        new_x = head[0] + x
-        new_y = head[1] + y
-        new_position = (new_x, new_y)
-        
-        # Verificar colisão com as paredes ou área do contador
-        if new_x < 0 or new_x >= GRID_WIDTH or new_y < 0 or new_y >= GRID_HEIGHT or new_y < SAFE_ZONE_HEIGHT:
-            self.lives -= 1
-            if self.lives <= 0:
-                self.alive = False
-                # Som de morte será tocado na função principal
-            else:
-                # Reposicionar a cobra no centro após perder uma vida
-                self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2 + SAFE_ZONE_HEIGHT)]
-                # Som de perda de vida será tocado na função principal
-            return
-        
-        # Verificar colisão com o próprio corpo
-        if new_position in self.positions[1:]:
-            self.lives -= 1
-            if self.lives <= 0:
-                self.alive = False
-                # Som de morte será tocado na função principal
-            else:
-                # Reposicionar a cobra no centro após perder uma vida
-                self.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2 + SAFE_ZONE_HEIGHT)]
-                # Som de perda de vida será tocado na função principal
-            return
-        
-        # Som de movimento será tocado na função principal
-        
-        self.positions.insert(0, new_position)
-        if len(self.positions) > self.length:
-            self.positions.pop()
+def bake_skull(surface, center_x, center_y, radius):
+    # Cabeça da caveira (círculo)
+    pygame.draw.circle(surface, DANGER_FOOD_COLOR, (center_x, center_y), radius)
     
-    def draw(self, surface):
-        for i, p in enumerate(self.positions):
-            if i == 0:  # Cabeça da cobra (arredondada)
-                pygame.draw.circle(surface, SNAKE_COLOR, 
-                                  (p[0] * GRID_SIZE + GRID_SIZE // 2, 
-                                   p[1] * GRID_SIZE + GRID_SIZE // 2), 
-                                  GRID_SIZE // 2)
-            else:  # Corpo da cobra
-                rect = pygame.Rect((p[0] * GRID_SIZE, p[1] * GRID_SIZE), 
-                                  (GRID_SIZE, GRID_SIZE))
-                pygame.draw.rect(surface, SNAKE_COLOR, rect)
-
-class DangerFood:
-    def __init__(self):
-        self.position = (0, 0)
-        self.color = DANGER_FOOD_COLOR
-        self.spawn_time = 0
-        self.active = False
-        self.randomize_position([])
-    
-    def randomize_position(self, snake_positions):
-        self.position = (random.randint(0, GRID_WIDTH - 1), 
-                        random.randint(SAFE_ZONE_HEIGHT, GRID_HEIGHT - 1))
-        # Evitar que a comida apareça onde a cobra está
-        while self.position in snake_positions:
-            self.position = (random.randint(0, GRID_WIDTH - 1), 
-                            random.randint(SAFE_ZONE_HEIGHT, GRID_HEIGHT - 1))
-        self.spawn_time = time.time()
-        self.active = True
+    # Olhos
+    eye_radius = radius // 3
+    pygame.draw.circle(surface, BACKGROUND_COLOR, (center_x - radius//2, center_y - radius//4), eye_radius)
+    pygame.draw.circle(surface, BACKGROUND_COLOR, (center_x + radius//2, center_y - radius//4), eye_radius)
     
-    def draw(self, surface):
-        if not self.active:
-            return False
-            
-        if time.time() - self.spawn_time > 2:
-            self.active = False
-            return False
-            
-        # Desenhar caveira
-        center_x = self.position[0] * GRID_SIZE + GRID_SIZE // 2
-        center_y = self.position[1] * GRID_SIZE + GRID_SIZE // 2
-        radius = GRID_SIZE // 2
-        
-        # Cabeça da caveira (círculo)
-        pygame.draw.circle(surface, DANGER_FOOD_COLOR, (center_x, center_y), radius)
-        
-        # Olhos
-        eye_radius = radius // 3
-        pygame.draw.circle(surface, BACKGROUND_COLOR, (center_x - radius//2, center_y - radius//4), eye_radius)
-        pygame.draw.circle(surface, BACKGROUND_COLOR, (center_x + radius//2, center_y - radius//4), eye_radius)
-        
-        # Nariz (triângulo)
-        nose_points = [
-            (center_x, center_y),
-            (center_x - radius//3, center_y + radius//3),
-            (center_x + radius//3, center_y + radius//3)
-        ]
-        pygame.draw.polygon(surface, BACKGROUND_COLOR, nose_points)
-        
-        # Boca (linha curva)
-        mouth_rect = pygame.Rect(center_x - radius//2, center_y + radius//4, radius, radius//2)
-        pygame.draw.arc(surface, BACKGROUND_COLOR, mouth_rect, 0, math.pi, 2)
-        
-        # Dentes
-        tooth_width = radius // 4
-        for i in range(3):
-            x = center_x - radius//2 + i * tooth_width
-            pygame.draw.rect(surface, BACKGROUND_COLOR, 
-                           (x, center_y + radius//2, tooth_width//2, radius//4))
-        
-        return True
-
-class Food:
-    def __init__(self):
-        self.position = (0, 0)
-        self.color = FOOD_COLOR
-        self.type = 'normal'  # normal, special
-        self.randomize_position([])
-    
-    def randomize_position(self, snake_positions):
-        self.position = (random.randint(0, GRID_WIDTH - 1), 
-                        random.randint(SAFE_ZONE_HEIGHT, GRID_HEIGHT - 1))
-        # Evitar que a comida apareça onde a cobra está
-        while self.position in snake_positions:
-            self.position = (random.randint(0, GRID_WIDTH - 1), 
-                            random.randint(SAFE_ZONE_HEIGHT, GRID_HEIGHT - 1))
-        
-        # Chance de 10% para comida especial
-        if random.random() < 0.1:
-            self.type = 'special'
-            self.color = SPECIAL_FOOD_COLOR
-        else:
-            self.type = 'normal'
-            self.color = FOOD_COLOR
+    # Nariz (triângulo)
+    nose_points = [
+        (center_x, center_y),
+        (center_x - radius//3, center_y + radius//3),
+        (center_x + radius//3, center_y + radius//3)
+    ]
+    pygame.draw.polygon(surface, BACKGROUND_COLOR, nose_points)
+    
+    # Boca (linha curva)
+    mouth_rect = pygame.Rect(center_x - radius//2, center_y + radius//4, radius, radius//2)
+    pygame.draw.arc(surface, BACKGROUND_COLOR, mouth_rect, 0, math.pi, 2)
+    
+    # Dentes
+    tooth_width = radius // 4
+    for i in range(3):
+        x = center_x - radius//2 + i * tooth_width
+        pygame.draw.rect(surface, BACKGROUND_COLOR, 
+                       (x, center_y + radius//2, tooth_width//2, radius//4))
+
+def bake_star(surface, center, radius):
+    points = []
+    for i in range(5):
+        # Pontos externos da estrela
+        x = center[0] + radius * math.cos(math.pi/2 + i * 2*math.pi/5)
+        y = center[1] - radius * math.sin(math.pi/2 + i * 2*math.pi/5)
+        points.append((x, y))
+        # Pontos internos da estrela
+        x = center[0] + radius/2 * math.cos(math.pi/2 + (i+0.5) * 2*math.pi/5)
+        y = center[1] - radius/2 * math.sin(math.pi/2 + (i+0.5) * 2*math.pi/5)
+        points.append((x, y))
+    pygame.draw.polygon(surface, SPECIAL_FOOD_COLOR, points)
+
+def bake_heart(surface, heart_x, heart_y, heart_size):
+    # Parte superior do coração (dois círculos)
+    pygame.draw.circle(surface, HEART_COLOR, (heart_x + heart_size//4, heart_y + heart_size//4), heart_size//4)
+    pygame.draw.circle(surface, HEART_COLOR, (heart_x + heart_size*3//4, heart_y + heart_size//4), heart_size//4)
+    # Parte inferior do coração (triângulo)
+    points = [
+        (heart_x + heart_size//4 - heart_size//4, heart_y + heart_size//4),
+        (heart_x + heart_size//2, heart_y + heart_size),
+        (heart_x + heart_size*3//4 + heart_size//4, heart_y + heart_size//4)
+    ]
+    pygame.draw.polygon(surface, HEART_COLOR, points)
+    # Preenchimento adicional para um coração mais suave
+    pygame.draw.circle(surface, HEART_COLOR, (heart_x + heart_size//2, heart_y + heart_size//2), heart_size//3)
+
+# Atlas de sprites: cada símbolo é desenhado uma única vez por tamanho de
+# célula e depois só copiado (blit) para a tela
+HEART_SIZE = 20
+_atlases = {}
+
+def build_atlas(size):
+    def sprite(width, height):
+        return pygame.Surface((width, height), pygame.SRCALPHA)
+    
+    center = size // 2
+    atlas = {}
+    atlas['head'] = sprite(size, size)
+    pygame.draw.circle(atlas['head'], SNAKE_COLOR, (center, center), size // 2)
+    atlas['body'] = sprite(size, size)
+    atlas['body'].fill(SNAKE_COLOR)
+    atlas['normal'] = sprite(size, size)
+    atlas['normal'].fill(FOOD_COLOR)
+    atlas['special'] = sprite(size, size)
+    bake_star(atlas['special'], (center, center), size // 2)
+    atlas['skull'] = sprite(size, size)
+    bake_skull(atlas['skull'], center, center, size // 2)
+    atlas['heart'] = sprite(HEART_SIZE + 1, HEART_SIZE + 1)
+    bake_heart(atlas['heart'], 0, 0, HEART_SIZE)
     
+    # Converter para o formato da tela acelera os blits
+    if pygame.display.get_surface() is not None:
+        for name, surface in atlas.items():
+            atlas[name] = surface.convert_alpha()
+    return atlas
+
+def get_atlas(size=GRID_SIZE):
+    atlas = _atlases.get(size)
+    if atlas is None:
+        atlas = build_atlas(size)
+        _atlases[size] = atlas
+    return atlas
+
+def draw_snake_segment(surface, p, head=False):
+    sprite = get_atlas()['head' if head else 'body']
+    surface.blit(sprite, (p[0] * GRID_SIZE, p[1] * GRID_SIZE))
+
+class Snake(snake_core.Snake):
     def draw(self, surface):
-        rect = pygame.Rect((self.position[0] * GRID_SIZE, self.position[1] * GRID_SIZE), 
-                      (GRID_SIZE, GRID_SIZE))
-        
-        if self.type == 'special':
-            # Desenha um símbolo especial (estrela)
-            center = (self.position[0] * GRID_SIZE + GRID_SIZE // 2, 
-                     self.position[1] * GRID_SIZE + GRID_SIZE // 2)
-            radius = GRID_SIZE // 2
-            points = []
-            for i in range(5):
-                # Pontos externos da estrela
-                x = center[0] + radius * math.cos(math.pi/2 + i * 2*math.pi/5)
-                y = center[1] - radius * math.sin(math.pi/2 + i * 2*math.pi/5)
-                points.append((x, y))
-                # Pontos internos da estrela
-                x = center[0] + radius/2 * math.cos(math.pi/2 + (i+0.5) * 2*math.pi/5)
-                y = center[1] - radius/2 * math.sin(math.pi/2 + (i+0.5) * 2*math.pi/5)
-                points.append((x, y))
-            pygame.draw.polygon(surface, self.color, points)
-        else:
-            pygame.draw.rect(surface, self.color, rect)
-        
-        return True
+        atlas = get_atlas()
+        body = atlas['body']
+        # Um único blits para o corpo inteiro
+        surface.blits([(body, (p[0] * GRID_SIZE, p[1] * GRID_SIZE))
+                       for p in islice(self.positions, 1, None)], False)
+        head = self.get_head_position()
+        surface.blit(atlas['head'], (head[0] * GRID_SIZE, head[1] * GRID_SIZE))
+
+def entity_sprites():
+    # Sprite de cada tipo do EntityStore, indexado pelo tipo: quadrado
+    # laranja (normal), estrela dourada (especial) e caveira
+    atlas = get_atlas()
+    return [atlas.get(name) for name in ENTITY_NAMES]
+
+class Game(snake_core.Game):
+    # Comida e caveiras são desenhadas direto dos arrays do EntityStore
+    snake_class = Snake
+
+# Cache de fontes e de textos renderizados
+FONT_FAMILY = 'arial'
+TEXT_CACHE_SIZE = 256  # Máximo de superfícies de texto guardadas
+
+_fonts = {}
+_text_cache = OrderedDict()
+
+def get_font(size, family=FONT_FAMILY):
+    # SysFont procura a fonte no sistema a cada chamada; guardar por (família, tamanho)
+    key = (family, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = pygame.font.SysFont(family, size)
+        _fonts[key] = font
+    return font
+
+def render_text(text, size, color=TEXT_COLOR, family=FONT_FAMILY):
+    # Textos repetidos (HUD, menus) reaproveitam a superfície já rasterizada (LRU)
+    key = (text, size, color, family)
+    text_surface = _text_cache.get(key)
+    if text_surface is not None:
+        _text_cache.move_to_end(key)
+        return text_surface
+    text_surface = get_font(size, family).render(text, True, color)
+    _text_cache[key] = text_surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return text_surface
 
 def draw_text(surface, text, size, x, y):
-    font = pygame.font.SysFont('arial', size)
-    text_surface = font.render(text, True, TEXT_COLOR)
+    text_surface = render_text(text, size)
     text_rect = text_surface.get_rect()
     text_rect.midtop = (x, y)
     surface.blit(text_surface, text_rect)
 
-def save_score(name, code, score):
-    # Carregar ranking existente
-    ranking = []
-    if os.path.exists('ranking.json'):
-        try:
-            with open('ranking.json', 'r') as f:
-                ranking = json.load(f)
-                # Adicionar código padrão para entradas antigas
-                for entry in ranking:
-                    if 'code' not in entry:
-                        entry['code'] = '0000'
-        except:
-            ranking = []
+# Renderização do tabuleiro
+HUD_HEIGHT = 40
+HUD_COLOR = (50, 50, 50)
+HUD_LINE_COLOR = (100, 100, 100)
+HEART_COLOR = (255, 0, 0)
+HUD_RECT = pygame.Rect(0, 0, WIDTH, HUD_HEIGHT)
+START_MESSAGE = 'Pressione qualquer seta para começar'
+
+# Com True, só as células que mudaram são redesenhadas e enviadas para a tela
+DIRTY_RENDERING = True
+
+def draw_heart(surface, heart_x, heart_y):
+    surface.blit(get_atlas()['heart'], (heart_x, heart_y))
+
+def draw_hud(surface, lives, score, remaining_time):
+    # Desenhar vidas como corações no lado esquerdo
+    heart_spacing = 25
+    for i in range(lives):
+        draw_heart(surface, 10 + (i * heart_spacing), 10)
+    
+    # Desenhar pontuação e vidas no centro
+    score_surface = render_text(f'Pontuação: {score} | Vidas: {lives}', 20)
+    score_rect = score_surface.get_rect()
+    score_rect.midtop = (WIDTH // 2, 10)
+    surface.blit(score_surface, score_rect)
+    
+    # Desenhar timer no lado direito
+    timer_surface = render_text(f'Tempo: {int(remaining_time)}s', 20)
+    timer_rect = timer_surface.get_rect()
+    timer_rect.topright = (WIDTH - 10, 10)
+    surface.blit(timer_surface, timer_rect)
+
+def build_background():
+    # Camada estática: fundo, bordas e faixa do HUD
+    background = pygame.Surface((WIDTH, HEIGHT))
+    if pygame.display.get_surface() is not None:
+        background = background.convert()
+    background.fill(BACKGROUND_COLOR)
+    # Desenhar bordas brancas para mostrar os limites
+    pygame.draw.rect(background, BORDER_COLOR, pygame.Rect(0, SAFE_ZONE_HEIGHT * GRID_SIZE, WIDTH, HEIGHT - SAFE_ZONE_HEIGHT * GRID_SIZE), 2)
+    # Desenhar fundo para todos os textos
+    pygame.draw.rect(background, HUD_COLOR, HUD_RECT)
+    pygame.draw.line(background, HUD_LINE_COLOR, (0, HUD_HEIGHT), (WIDTH, HUD_HEIGHT), 2)
+    return background
+
+def cell_rect(position):
+    return pygame.Rect(position[0] * GRID_SIZE, position[1] * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+
+class BoardRenderer:
+    # Desenha o tabuleiro de um Game. No modo com retângulos sujos guarda o
+    # que foi desenhado no quadro anterior (cobra, comida, caveiras, HUD) e
+    # só redesenha/atualiza as células que mudaram desde então.
+    def __init__(self, surface, dirty=DIRTY_RENDERING, present=True):
+        self.surface = surface
+        self.dirty = dirty
+        # False: só desenha na surface, sem atualizar a janela (captura
+        # sem tela, ver frame_capture.py)
+        self.present = present
+        self.background = build_background()
+        self.game = None
+        # Opcionais: profiler (tempo de desenho/atualização da tela) e overlay,
+        # uma função (surface) -> Rect desenhada por cima do tabuleiro
+        self.profiler = None
+        self.overlay = None
+        self.invalidate()
     
-    # Adicionar nova pontuação
-    ranking.append({'name': name, 'code': code, 'score': score})
+    def invalidate(self):
+        # Força um quadro completo (ex.: depois de outra tela cobrir o jogo)
+        self.needs_full_redraw = True
     
-    # Ordenar por pontuação (maior para menor)
-    ranking = sorted(ranking, key=lambda x: x['score'], reverse=True)
+    def draw(self, game, remaining_time, show_start_message=False):
+        if (not self.dirty or self.needs_full_redraw or game is not self.game
+                or show_start_message != self.start_message_shown):
+            self._draw_full(game, remaining_time, show_start_message)
+            if self.overlay is not None:
+                self.overlay(self.surface)
+            self._update_display(None)
+            return
+        
+        snake = game.snake
+        cells = set()
+        
+        # Cobra: novas cabeças entram pela frente, caudas saem por trás
+        if snake.lives != self.drawn_lives:
+            cells.update(self.drawn_snake)
+            cells.update(snake.positions)
+            self.drawn_snake = deque(snake.positions)
+        else:
+            cells.update(self._sync_snake(snake.positions))
+        
+        # Comida e caveiras: células que ganharam, perderam ou trocaram de entidade
+        entities = game.entities.items()
+        if entities != self.drawn_entities:
+            position = game.board.position
+            cells.update(position(cell) for cell, _ in set(entities).symmetric_difference(self.drawn_entities))
+            self.drawn_entities = entities
+        
+        rects = [self._redraw_cell(game, position) for position in cells]
+        
+        hud_state = (snake.lives, snake.score, int(remaining_time))
+        if hud_state != self.drawn_hud:
+            self.surface.blit(self.background, HUD_RECT, HUD_RECT)
+            draw_hud(self.surface, *hud_state)
+            rects.append(HUD_RECT)
+            self.drawn_hud = hud_state
+        self.drawn_lives = snake.lives
+        
+        if self.overlay is not None:
+            rects.append(self.overlay(self.surface))
+        
+        if rects:
+            self._update_display(rects)
     
-    # Manter apenas os top 10
-    ranking = ranking[:10]
+    def _update_display(self, rects):
+        if self.profiler is not None:
+            self.profiler.mark('draw')
+        # present=False (captura sem janela): desenha só na superfície
+        if self.present:
+            if rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(rects)
+        if self.profiler is not None:
+            self.profiler.mark('display')
     
-    # Salvar ranking atualizado em JSON
-    with open('ranking.json', 'w') as f:
-        json.dump(ranking, f)
+    def _sync_snake(self, positions):
+        # Descobre quantos passos a cobra deu desde o último quadro achando a
+        # cabeça antiga no corpo atual; o custo é proporcional ao que mudou.
+        drawn = self.drawn_snake
+        old_head = drawn[0]
+        steps = None
+        for i, position in enumerate(positions):
+            if position == old_head:
+                steps = i
+                break
+        if steps is None:
+            # Andou mais que o próprio tamanho: redesenhar a cobra inteira
+            changed = set(drawn)
+            changed.update(positions)
+            self.drawn_snake = deque(positions)
+            return changed
+        
+        changed = []
+        kept = len(positions) - steps
+        while len(drawn) > kept:
+            changed.append(drawn.pop())
+        for i in range(steps - 1, -1, -1):
+            drawn.appendleft(positions[i])
+            changed.append(positions[i])
+        if steps:
+            changed.append(old_head)  # A cabeça antiga vira corpo
+        return changed
     
-    # Salvar ranking em formato TXT para fácil visualização
-    with open('ranking.txt', 'w', encoding='utf-8') as f:
-        f.write('=== RANKING DO JOGO DA COBRINHA ===\n\n')
-        for i, entry in enumerate(ranking, 1):
-            f.write(f"{i}. {entry['name']} ({entry['code']}): {entry['score']} pontos\n")
+    def _redraw_cell(self, game, position):
+        # Restaurar o fundo e desenhar o que estiver na célula, na mesma
+        # ordem do quadro completo (comida, caveiras, cobra)
+        rect = cell_rect(position)
+        self.surface.blit(self.background, rect, rect)
+        slot = game.entities.at(position)
+        if slot != NO_SLOT:
+            self.surface.blit(entity_sprites()[game.entities.kinds[slot]], rect)
+        if game.snake.occupies(position):
+            draw_snake_segment(self.surface, position, position == game.snake.get_head_position())
+        return rect
     
-    return ranking
+    def _draw_full(self, game, remaining_time, show_start_message):
+        snake = game.snake
+        self.surface.blit(self.background, (0, 0))
+        draw_hud(self.surface, snake.lives, snake.score, remaining_time)
+        
+        # Desenhar a comida e as caveiras (um único blits)
+        sprites = entity_sprites()
+        width = game.board.width
+        entities = game.entities.items()
+        self.surface.blits([(sprites[kind], ((cell % width) * GRID_SIZE, (cell // width) * GRID_SIZE))
+                            for cell, kind in entities], False)
+        
+        # Desenhar a cobra
+        snake.draw(self.surface)
+        
+        # Desenhar mensagem de início se o jogo ainda não começou
+        if show_start_message:
+            draw_text(self.surface, START_MESSAGE, 30, WIDTH // 2, HEIGHT // 2)
+        
+        # Lembrar o que está na tela para o próximo quadro parcial
+        self.game = game
+        self.drawn_snake = deque(snake.positions)
+        self.drawn_lives = snake.lives
+        self.drawn_entities = entities
+        self.drawn_hud = (snake.lives, snake.score, int(remaining_time))
+        self.start_message_shown = show_start_message
+        self.needs_full_redraw = False
 
-def show_ranking(surface):
-    surface.fill(BACKGROUND_COLOR)
-    draw_text(surface, 'RANKING', 50, WIDTH // 2, 50)
-    
-    ranking = []
-    # Tentar ler do arquivo TXT primeiro
-    if os.path.exists('ranking.txt'):
-        try:
-            with open('ranking.txt', 'r') as f:
-                lines = f.readlines()
-                # Pular o cabeçalho
-                for line in lines[2:]:
-                    if line.strip():
-                        # Extrair nome, código e pontuação da linha
-                        parts = line.strip().split(': ')
-                        if len(parts) == 2:
-                            name_code = parts[0].split('. ')[1]
-                            if '(' in name_code and ')' in name_code:
-                                name = name_code.split(' (')[0]
-                                code = name_code.split('(')[1].split(')')[0]
-                            else:
-                                name = name_code
-                                code = '0000'  # Código padrão para rankings antigos
-                            score = int(parts[1].split(' ')[0])
-                            ranking.append({'name': name, 'code': code, 'score': score})
-        except:
-            # Se falhar, tentar ler do JSON
-            if os.path.exists('ranking.json'):
-                try:
-                    with open('ranking.json', 'r') as f:
-                        ranking = json.load(f)
-                        # Adicionar código padrão para entradas antigas
-                        for entry in ranking:
-                            if 'code' not in entry:
-                                entry['code'] = '0000'
-                except:
-                    ranking = []
-    
-    if not ranking:
-        draw_text(surface, 'Nenhuma pontuação registrada ainda', 30, WIDTH // 2, HEIGHT // 2)
-    else:
-        # Mostrar todos os rankings
-        for i, entry in enumerate(ranking):
-            draw_text(surface, f"{i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 25, WIDTH // 2, 120 + i * 40)
-    
-    draw_text(surface, 'Pressione ESC para voltar', 20, WIDTH // 2, HEIGHT - 50)
-    pygame.display.update()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    waiting = False
-
-def log_api_result(player_name, player_code, pontos, is_victory, status_code, response_text, sucesso):
-    from datetime import datetime
-    with open('api_log.txt', 'a', encoding='utf-8') as log_file:
-        data_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        status = 'SUCESSO' if sucesso else 'FALHA'
-        log_file.write(f"[{data_hora}] {status} | Jogador: {player_name} | Código: {player_code} | Pontos: {pontos} | Vitória: {is_victory} | Status HTTP: {status_code} | Resposta: {response_text}\n")
+# Modo tabuleiro grande: a grade lógica é maior que a janela e uma câmera
+# segue a cabeça. Cada quadro percorre só as células visíveis; a grade de
+# ocupação da cobra serve de índice espacial do corpo (uma busca por linha
+# visível), então o custo depende do tamanho da janela, não do tabuleiro
+# nem do comprimento da cobra.
+VIEW_RECT = pygame.Rect(0, HUD_HEIGHT, WIDTH, HEIGHT - HUD_HEIGHT)
+VIEW_COLUMNS = VIEW_RECT.width // GRID_SIZE
+VIEW_ROWS = VIEW_RECT.height // GRID_SIZE
 
-def send_score_to_api(player_name, player_code, score, is_victory):
-    # Função temporariamente desativada
-    print("Envio para API temporariamente desativado")
-    return
+def camera_origin(head, board):
+    # Célula mostrada no canto superior esquerdo da janela: a cabeça fica no
+    # centro, sem passar das bordas do tabuleiro
+    x = min(max(head[0] - VIEW_COLUMNS // 2, 0), max(board.width - VIEW_COLUMNS, 0))
+    y = min(max(head[1] - VIEW_ROWS // 2, SAFE_ZONE_HEIGHT),
+            max(board.height - VIEW_ROWS, SAFE_ZONE_HEIGHT))
+    return x, y
+
+class ViewportRenderer(BoardRenderer):
+    # A câmera anda a cada passo, então não há retângulos sujos: a janela é
+    # redesenhada inteira, mas só quando a simulação avançou ou o HUD mudou
+    def invalidate(self):
+        self.drawn_state = None
     
-    # Código comentado temporariamente
-    """
-    try:
-        # Preparar os dados para enviar à API
-        pontos = 10 if is_victory else 5
-        data = {
-            "jogador": player_name,
-            "jogo": "jogo da cobra",
-            "ponto": pontos,
-            "codigo": player_code
-        }
+    def draw(self, game, remaining_time, show_start_message=False):
+        snake = game.snake
+        hud_state = (snake.lives, snake.score, int(remaining_time))
+        state = (game, game.tick, hud_state, show_start_message)
+        if state == self.drawn_state and self.overlay is None:
+            return
+        self.drawn_state = state
         
-        # URL da API
-        api_url = "https://aula-h986.onrender.com/scores"
+        self._draw_view(game)
+        self.surface.fill(HUD_COLOR, HUD_RECT)
+        pygame.draw.line(self.surface, HUD_LINE_COLOR, (0, HUD_HEIGHT), (WIDTH, HUD_HEIGHT), 2)
+        draw_hud(self.surface, *hud_state)
+        if show_start_message:
+            draw_text(self.surface, START_MESSAGE, 30, WIDTH // 2, HEIGHT // 2)
+        if self.overlay is not None:
+            self.overlay(self.surface)
+        self._update_display(None)
+    
+    def _draw_view(self, game):
+        surface = self.surface
+        board = game.board
+        snake = game.snake
+        atlas = get_atlas()
+        origin_x, origin_y = camera_origin(snake.get_head_position(), board)
+        columns = min(VIEW_COLUMNS, board.width - origin_x)
+        rows = min(VIEW_ROWS, board.height - origin_y)
         
-        # Enviar requisição POST para a API
-        response = requests.post(api_url, json=data)
+        def screen_position(position):
+            return (VIEW_RECT.x + (position[0] - origin_x) * GRID_SIZE,
+                    VIEW_RECT.y + (position[1] - origin_y) * GRID_SIZE)
         
-        # Considerar sucesso se status for 200 ou 201
-        if response.status_code in (200, 201):
-            print("Pontuação enviada com sucesso para a API!")
-            print(f"Resposta da API: {response.text}")
-            log_api_result(player_name, player_code, pontos, is_victory, response.status_code, response.text, True)
+        def visible(position):
+            return 0 <= position[0] - origin_x < columns and 0 <= position[1] - origin_y < rows
+        
+        surface.fill(BACKGROUND_COLOR, VIEW_RECT)
+        # Bordas do tabuleiro, se estiverem na janela (o clip corta o resto)
+        border = pygame.Rect(screen_position((0, SAFE_ZONE_HEIGHT)),
+                             (board.width * GRID_SIZE, (board.height - SAFE_ZONE_HEIGHT) * GRID_SIZE))
+        surface.set_clip(VIEW_RECT)
+        pygame.draw.rect(surface, BORDER_COLOR, border, 2)
+        
+        # Comida e caveiras: só as que caem na janela
+        sprites = entity_sprites()
+        blits = []
+        for cell, kind in game.entities.items():
+            position = board.position(cell)
+            if visible(position):
+                blits.append((sprites[kind], screen_position(position)))
+        
+        # Corpo: uma busca por linha visível na grade de ocupação
+        body = atlas['body']
+        head = snake.get_head_position()
+        occupied = snake.occupied
+        for row in range(rows):
+            y = origin_y + row
+            start = y * board.width + origin_x
+            line = occupied[start:start + columns]
+            column = line.find(1)
+            while column >= 0:
+                if (origin_x + column, y) != head:
+                    blits.append((body, (VIEW_RECT.x + column * GRID_SIZE, VIEW_RECT.y + row * GRID_SIZE)))
+                column = line.find(1, column + 1)
+        blits.append((atlas['head'], screen_position(head)))
+        surface.blits(blits, False)
+        surface.set_clip(None)
+
+def make_renderer(surface, game, present=True):
+    # Tabuleiros com tamanho diferente da grade da janela usam a câmera
+    if (game.board.width, game.board.height) != (GRID_WIDTH, GRID_HEIGHT):
+        return ViewportRenderer(surface, present=present)
+    return BoardRenderer(surface, present=present)
+
+# Overlay do profiler (F3): tempo por quadro e por fase
+PROFILER_PANEL_RECT = pygame.Rect(WIDTH - 230, HEIGHT - 200, 220, 190)
+PROFILER_PANEL_COLOR = (20, 20, 20)
+PROFILER_TEXT_COLOR = (200, 255, 200)
+
+def draw_profiler_overlay(surface, profiler):
+    panel = PROFILER_PANEL_RECT
+    pygame.draw.rect(surface, PROFILER_PANEL_COLOR, panel)
+    stats = profiler.summary()
+    if stats is None:
+        return panel
+    lines = [
+        f"quadro {stats['frame'] * 1000:.2f} ms  {stats['fps']:.0f} fps",
+        f"p50 {stats['p50'] * 1000:.2f}  p99 {stats['p99'] * 1000:.2f} ms",
+        f"{stats['ticks_per_second']:.1f} passos/s"
+    ]
+    lines.extend(f"{phase:11s}{value * 1000:7.3f} ms" for phase, value in stats['phases'].items())
+    for i, line in enumerate(lines):
+        surface.blit(render_text(line, 16, PROFILER_TEXT_COLOR), (panel.x + 8, panel.y + 6 + i * 18))
+    return panel
+
+# Ranking em SQLite (ver leaderboard.py); aberto na primeira pontuação
+RANKING_PAGE_SIZE = 10
+EXPORT_RANKING_TXT = False  # True regrava ranking.txt (top 10) a cada partida
+
+_leaderboard = None
+
+def get_leaderboard():
+    global _leaderboard
+    if _leaderboard is None:
+        _leaderboard = Leaderboard()
+    return _leaderboard
+
+def save_score(name, code, score, replay_path=None):
+    # Registrar a partida e devolver a posição dela no ranking
+    leaderboard = get_leaderboard()
+    position = leaderboard.add_score(name, code, score, replay_path)
+    if EXPORT_RANKING_TXT:
+        leaderboard.export_txt()
+    return position
+
+class RankingScene(Scene):
+    def __init__(self):
+        super().__init__()
+        self.leaderboard = get_leaderboard()
+        self.page_count = max(1, -(-self.leaderboard.count() // RANKING_PAGE_SIZE))
+        self.page = 0
+    
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_ESCAPE:
+            self.close()
+        elif event.key in (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_PAGEDOWN) and self.page < self.page_count - 1:
+            self.page += 1
+            self.dirty = True
+        elif event.key in (pygame.K_LEFT, pygame.K_UP, pygame.K_PAGEUP) and self.page > 0:
+            self.page -= 1
+            self.dirty = True
+    
+    def draw(self, surface):
+        surface.fill(BACKGROUND_COLOR)
+        draw_text(surface, 'RANKING', 50, WIDTH // 2, 50)
+        
+        offset = self.page * RANKING_PAGE_SIZE
+        ranking = self.leaderboard.top(RANKING_PAGE_SIZE, offset)
+        if not ranking:
+            draw_text(surface, 'Nenhuma pontuação registrada ainda', 30, WIDTH // 2, HEIGHT // 2)
         else:
-            print(f"Erro ao enviar pontuação para a API. Status code: {response.status_code}")
-            print(f"Resposta da API: {response.text}")
-            log_api_result(player_name, player_code, pontos, is_victory, response.status_code, response.text, False)
-            
-    except Exception as e:
-        print(f"Erro ao conectar com a API: {e}")
-        log_api_result(player_name, player_code, 10 if is_victory else 5, is_victory, 'ERRO', str(e), False)
-    """
+            for i, entry in enumerate(ranking):
+                draw_text(surface, f"{offset+i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 25, WIDTH // 2, 120 + i * 40)
+        
+        if self.page_count > 1:
+            draw_text(surface, f'Página {self.page+1}/{self.page_count} (setas para navegar)', 20, WIDTH // 2, HEIGHT - 80)
+        draw_text(surface, 'Pressione ESC para voltar', 20, WIDTH // 2, HEIGHT - 50)
+
+def show_ranking(surface):
+    run_scene(surface, RankingScene())
+
+_score_submitter = None
+
+def get_score_submitter():
+    global _score_submitter
+    if _score_submitter is None:
+        _score_submitter = ScoreSubmitter().start()
+    return _score_submitter
+
+def send_score_to_api(player_name, player_code, score, is_victory):
+    # Só enfileira: o envio (com retry) acontece numa thread em segundo plano
+    # e o resultado vai para api_log.txt, sem travar a tela de fim de jogo
+    get_score_submitter().submit(player_name, player_code, score, is_victory)
 
 def test_api_connection():
     # Função temporariamente desativada
@@ -405,185 +629,203 @@ def test_api_connection():
     print("=== Fim do teste ===\n")
     """
 
-def game_over_screen(surface, score, player_name, player_code):
-    surface.fill(BACKGROUND_COLOR)
-    draw_text(surface, 'GAME OVER', 50, WIDTH // 2, HEIGHT // 4)
-    draw_text(surface, f'Pontuação: {score}', 30, WIDTH // 2, HEIGHT // 2 - 30)
+EXPORT_POLL_INTERVAL = 0.25  # Segundos entre consultas à exportação do clipe
+
+class ResultScene(Scene):
+    # Fim de partida (derrota ou vitória): registra a pontuação e mostra o top 4.
+    # G exporta um GIF da partida em outro processo (clip_export.py)
+    def __init__(self, score, player_name, player_code, victory, replay_path=None, on_close=None):
+        super().__init__()
+        self.score = score
+        self.victory = victory
+        self.on_close = on_close
+        self.replay_path = replay_path
+        self.export = None
+        self.export_status = None
+        
+        # Enviar pontuação para a API (derrota = 5 pontos, vitória = 10 pontos)
+        send_score_to_api(player_name, player_code, score, victory)
+        
+        # Salvar pontuação e mostrar ranking
+        self.position = save_score(player_name, player_code, score, replay_path)
+        self.best = get_leaderboard().best_for(player_name, player_code)
+        self.ranking = get_leaderboard().top(4)
     
-    # Enviar pontuação para a API (derrota = 5 pontos)
-    send_score_to_api(player_name, player_code, score, False)
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_ESCAPE:
+            if self.on_close is not None:
+                self.on_close()
+            else:
+                self.close()
+        elif event.key == pygame.K_r:
+            # O ranking abre por cima; ao voltar, esta tela é redesenhada
+            self.manager.push(RankingScene())
+        elif event.key == pygame.K_g and self.replay_path is not None and self.export is None:
+            from clip_export import start_export
+            self.export = start_export(self.replay_path)
+            self.export_status = 'Exportando GIF...'
+            self.dirty = True
     
-    # Salvar pontuação e mostrar ranking
-    ranking = save_score(player_name, player_code, score)
+    def timeout(self, now):
+        # Só acorda sozinha enquanto o clipe está sendo exportado
+        if self.export is not None and self.export.result is None:
+            return EXPORT_POLL_INTERVAL
+        return None
     
-    # Mostrar posição no ranking
-    for i, entry in enumerate(ranking):
-        if entry['name'] == player_name and entry['code'] == player_code and entry['score'] == score:
-            draw_text(surface, f'Sua posição no ranking: {i+1}', 25, WIDTH // 2, HEIGHT // 2 + 10)
-            break
+    def update(self, now):
+        if self.export is None or self.export.result is not None:
+            return
+        result = self.export.poll()
+        if result is not None:
+            self.export_status = (f'GIF salvo em {result[1]}' if result[0] == 'done'
+                                  else 'Não foi possível exportar o GIF')
+            if result[0] != 'done':
+                print(f"Erro ao exportar o clipe: {result[1]}")
+            self.dirty = True
     
-    draw_text(surface, 'Top 4 Ranking:', 20, WIDTH // 2, HEIGHT * 3 // 4 - 60)
-    # Mostrar apenas os top 4 do ranking
-    for i, entry in enumerate(ranking):
-        if i < 4:
+    def draw(self, surface):
+        surface.fill(BACKGROUND_COLOR)
+        if self.victory:
+            draw_text(surface, 'PARABÉNS!', 50, WIDTH // 2, HEIGHT // 4)
+            draw_text(surface, 'Você venceu!', 40, WIDTH // 2, HEIGHT // 4 + 60)
+        else:
+            draw_text(surface, 'GAME OVER', 50, WIDTH // 2, HEIGHT // 4)
+        draw_text(surface, f'Pontuação: {self.score}', 30, WIDTH // 2, HEIGHT // 2 - 30)
+        
+        # Mostrar posição no ranking
+        draw_text(surface, f'Sua posição no ranking: {self.position}', 25, WIDTH // 2, HEIGHT // 2 + 10)
+        draw_text(surface, f'Seu recorde: {self.best}', 20, WIDTH // 2, HEIGHT // 2 + 40)
+        
+        draw_text(surface, 'Top 4 Ranking:', 20, WIDTH // 2, HEIGHT * 3 // 4 - 60)
+        for i, entry in enumerate(self.ranking[:4]):
             draw_text(surface, f"{i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 20, WIDTH // 2, HEIGHT * 3 // 4 - 30 + i * 25)
+        
+        if self.export_status is not None:
+            draw_text(surface, self.export_status, 20, WIDTH // 2, HEIGHT - 20)
+        elif self.replay_path is not None:
+            draw_text(surface, 'Pressione G para exportar um GIF da partida', 20, WIDTH // 2, HEIGHT - 20)
+        draw_text(surface, 'Pressione R para ver ranking completo', 20, WIDTH // 2, HEIGHT - 80)
+        draw_text(surface, 'Pressione ESC para voltar ao menu', 20, WIDTH // 2, HEIGHT - 50)
+
+def game_over_screen(surface, score, player_name, player_code, replay_path=None):
+    run_scene(surface, ResultScene(score, player_name, player_code, False, replay_path))
+
+def victory_screen(surface, score, player_name, player_code, replay_path=None):
+    run_scene(surface, ResultScene(score, player_name, player_code, True, replay_path))
+
+CURSOR_BLINK = 0.5  # Segundos entre piscadas do cursor de texto
+
+class NameEntryScene(Scene):
+    # Formulário de nome e código. Só redesenha quando o texto, o foco, o
+    # destaque do botão ou o cursor mudam; entre uma piscada e outra dorme
+    def __init__(self, on_submit=None):
+        super().__init__()
+        self.on_submit = on_submit
+        
+        # Caixas de entrada para nome e código (ajustar espaçamento)
+        self.name_box = pygame.Rect(WIDTH // 4, HEIGHT // 2 - 20, WIDTH // 2, 50)
+        self.code_box = pygame.Rect(WIDTH // 4, HEIGHT // 2 + 70, WIDTH // 2, 50)
+        self.name_active = True
+        self.code_active = False
+        self.name_text = ''
+        self.code_text = ''
+        self.input_font_size = 32
+        
+        # Botão de iniciar
+        self.button = pygame.Rect(WIDTH // 3, HEIGHT * 3 // 4, WIDTH // 3, 50)
+        self.button_text = 'Iniciar Jogo'
+        self.hover = False
+        
+        self.blink_start = time.perf_counter()
+        self.cursor_visible = True
     
-    draw_text(surface, 'Pressione R para ver ranking completo', 20, WIDTH // 2, HEIGHT - 80)
-    draw_text(surface, 'Pressione ESC para voltar ao menu', 20, WIDTH // 2, HEIGHT - 50)
-    pygame.display.update()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    waiting = False
-                elif event.key == pygame.K_r:
-                    show_ranking(surface)
-                    # Redesenhar a tela de game over após voltar do ranking
-                    surface.fill(BACKGROUND_COLOR)
-                    draw_text(surface, 'GAME OVER', 50, WIDTH // 2, HEIGHT // 4)
-                    draw_text(surface, f'Pontuação: {score}', 30, WIDTH // 2, HEIGHT // 2 - 30)
-                    draw_text(surface, f'Sua posição no ranking: {i+1}', 25, WIDTH // 2, HEIGHT // 2 + 10)
-                    draw_text(surface, 'Top 4 Ranking:', 20, WIDTH // 2, HEIGHT * 3 // 4 - 60)
-                    for i, entry in enumerate(ranking):
-                        if i < 4:
-                            draw_text(surface, f"{i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 20, WIDTH // 2, HEIGHT * 3 // 4 - 30 + i * 25)
-                    draw_text(surface, 'Pressione R para ver ranking completo', 20, WIDTH // 2, HEIGHT - 80)
-                    draw_text(surface, 'Pressione ESC para voltar ao menu', 20, WIDTH // 2, HEIGHT - 50)
-                    pygame.display.update()
-
-def victory_screen(surface, score, player_name, player_code):
-    surface.fill(BACKGROUND_COLOR)
-    draw_text(surface, 'PARABÉNS!', 50, WIDTH // 2, HEIGHT // 4)
-    draw_text(surface, 'Você venceu!', 40, WIDTH // 2, HEIGHT // 4 + 60)
-    draw_text(surface, f'Pontuação: {score}', 30, WIDTH // 2, HEIGHT // 2 - 30)
-    
-    # Enviar pontuação para a API (vitória = 10 pontos)
-    send_score_to_api(player_name, player_code, score, True)
-    
-    # Salvar pontuação e mostrar ranking
-    ranking = save_score(player_name, player_code, score)
-    
-    # Mostrar posição no ranking
-    for i, entry in enumerate(ranking):
-        if entry['name'] == player_name and entry['code'] == player_code and entry['score'] == score:
-            draw_text(surface, f'Sua posição no ranking: {i+1}', 25, WIDTH // 2, HEIGHT // 2 + 10)
-            break
-    
-    draw_text(surface, 'Top 4 Ranking:', 20, WIDTH // 2, HEIGHT * 3 // 4 - 60)
-    # Mostrar apenas os top 4 do ranking
-    for i, entry in enumerate(ranking):
-        if i < 4:
-            draw_text(surface, f"{i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 20, WIDTH // 2, HEIGHT * 3 // 4 - 30 + i * 25)
+    def enter(self):
+        pygame.key.set_repeat(500, 50)  # Configurar repetição de teclas
+        self.hover = self.button.collidepoint(pygame.mouse.get_pos())
     
-    draw_text(surface, 'Pressione R para ver ranking completo', 20, WIDTH // 2, HEIGHT - 80)
-    draw_text(surface, 'Pressione ESC para voltar ao menu', 20, WIDTH // 2, HEIGHT - 50)
-    pygame.display.update()
-    
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    waiting = False
-                elif event.key == pygame.K_r:
-                    show_ranking(surface)
-                    # Redesenhar a tela de vitória após voltar do ranking
-                    surface.fill(BACKGROUND_COLOR)
-                    draw_text(surface, 'PARABÉNS!', 50, WIDTH // 2, HEIGHT // 4)
-                    draw_text(surface, 'Você venceu!', 40, WIDTH // 2, HEIGHT // 4 + 60)
-                    draw_text(surface, f'Pontuação: {score}', 30, WIDTH // 2, HEIGHT // 2 - 30)
-                    draw_text(surface, f'Sua posição no ranking: {i+1}', 25, WIDTH // 2, HEIGHT // 2 + 10)
-                    draw_text(surface, 'Top 4 Ranking:', 20, WIDTH // 2, HEIGHT * 3 // 4 - 60)
-                    for i, entry in enumerate(ranking):
-                        if i < 4:
-                            draw_text(surface, f"{i+1}. {entry['name']} ({entry['code']}): {entry['score']} pontos", 20, WIDTH // 2, HEIGHT * 3 // 4 - 30 + i * 25)
-                    draw_text(surface, 'Pressione R para ver ranking completo', 20, WIDTH // 2, HEIGHT - 80)
-                    draw_text(surface, 'Pressione ESC para voltar ao menu', 20, WIDTH // 2, HEIGHT - 50)
-                    pygame.display.update()
-
-def get_player_name(surface):
-    pygame.key.set_repeat(500, 50)  # Configurar repetição de teclas
-    
-    # Caixas de entrada para nome e código (ajustar espaçamento)
-    name_box = pygame.Rect(WIDTH // 4, HEIGHT // 2 - 20, WIDTH // 2, 50)
-    code_box = pygame.Rect(WIDTH // 4, HEIGHT // 2 + 70, WIDTH // 2, 50)
-    
-    color_inactive = INPUT_BOX_COLOR
-    color_active = (100, 100, 100)
-    name_color = color_inactive
-    code_color = color_inactive
-    name_active = True
-    code_active = False
-    name_text = ''
-    code_text = ''
-    font = pygame.font.SysFont('arial', 32)
-    
-    # Botão de iniciar
-    button = pygame.Rect(WIDTH // 3, HEIGHT * 3 // 4, WIDTH // 3, 50)
-    button_text = 'Iniciar Jogo'
-    
-    done = False
-    
-    while not done:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_TAB:
-                    # Alternar entre as caixas de entrada
-                    name_active = not name_active
-                    code_active = not code_active
-                    name_color = color_active if name_active else color_inactive
-                    code_color = color_active if code_active else color_inactive
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                # Se o usuário clicou no botão de iniciar
-                if button.collidepoint(event.pos) and name_text.strip() and code_text.strip():
-                    return name_text.strip(), code_text.strip()
-                # Se o usuário clicou em alguma das caixas de entrada
-                if name_box.collidepoint(event.pos):
-                    name_active = True
-                    code_active = False
-                elif code_box.collidepoint(event.pos):
-                    name_active = False
-                    code_active = True
-                else:
-                    name_active = False
-                    code_active = False
-                name_color = color_active if name_active else color_inactive
-                code_color = color_active if code_active else color_inactive
-            if event.type == pygame.KEYDOWN:
-                if name_active:
-                    if event.key == pygame.K_RETURN and name_text.strip():
-                        name_active = False
-                        code_active = True
-                        name_color = color_inactive
-                        code_color = color_active
-                    elif event.key == pygame.K_BACKSPACE:
-                        name_text = name_text[:-1]
-                    else:
-                        # Limitar o tamanho do nome
-                        if len(name_text) < 15 and event.unicode.isprintable():
-                            name_text += event.unicode
-                elif code_active:
-                    if event.key == pygame.K_RETURN and code_text.strip():
-                        if name_text.strip():
-                            return name_text.strip(), code_text.strip()
-                    elif event.key == pygame.K_BACKSPACE:
-                        code_text = code_text[:-1]
-                    else:
-                        # Limitar o tamanho do código
-                        if len(code_text) < 10 and event.unicode.isprintable():
-                            code_text += event.unicode
+    def submit(self):
+        name, code = self.name_text.strip(), self.code_text.strip()
+        if self.on_submit is not None:
+            self.on_submit(name, code)
+        else:
+            self.close((name, code))
+    
+    def focus(self, name_active, code_active):
+        self.name_active = name_active
+        self.code_active = code_active
+        self.dirty = True
+    
+    def handle(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            hover = self.button.collidepoint(event.pos)
+            if hover != self.hover:
+                self.hover = hover
+                self.dirty = True
+            return
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            # Se o usuário clicou no botão de iniciar
+            if self.button.collidepoint(event.pos) and self.name_text.strip() and self.code_text.strip():
+                self.submit()
+            # Se o usuário clicou em alguma das caixas de entrada
+            elif self.name_box.collidepoint(event.pos):
+                self.focus(True, False)
+            elif self.code_box.collidepoint(event.pos):
+                self.focus(False, True)
+            else:
+                self.focus(False, False)
+            return
+        if event.type != pygame.KEYDOWN:
+            return
         
+        # Digitar mantém o cursor aceso
+        self.blink_start = time.perf_counter()
+        self.cursor_visible = True
+        self.dirty = True
+        if event.key == pygame.K_TAB:
+            # Alternar entre as caixas de entrada
+            self.focus(not self.name_active, not self.code_active)
+        elif self.name_active:
+            if event.key == pygame.K_RETURN and self.name_text.strip():
+                self.focus(False, True)
+            elif event.key == pygame.K_BACKSPACE:
+                self.name_text = self.name_text[:-1]
+            elif len(self.name_text) < 15 and event.unicode.isprintable():
+                # Limitar o tamanho do nome
+                self.name_text += event.unicode
+        elif self.code_active:
+            if event.key == pygame.K_RETURN and self.code_text.strip():
+                if self.name_text.strip():
+                    self.submit()
+            elif event.key == pygame.K_BACKSPACE:
+                self.code_text = self.code_text[:-1]
+            elif len(self.code_text) < 10 and event.unicode.isprintable():
+                # Limitar o tamanho do código
+                self.code_text += event.unicode
+    
+    def timeout(self, now):
+        if not (self.name_active or self.code_active):
+            return None
+        return CURSOR_BLINK - (now - self.blink_start) % CURSOR_BLINK
+    
+    def update(self, now):
+        cursor_visible = int((now - self.blink_start) / CURSOR_BLINK) % 2 == 0
+        if cursor_visible != self.cursor_visible:
+            self.cursor_visible = cursor_visible
+            if self.name_active or self.code_active:
+                self.dirty = True
+    
+    def draw_input(self, surface, box, text, active):
+        pygame.draw.rect(surface, (100, 100, 100) if active else INPUT_BOX_COLOR, box, 2)
+        text_surface = render_text(text, self.input_font_size, INPUT_TEXT_COLOR)
+        box.w = max(box.w, text_surface.get_width() + 10)
+        surface.blit(text_surface, (box.x + 5, box.y + 10))
+        if active and self.cursor_visible:
+            cursor_x = box.x + 7 + text_surface.get_width()
+            pygame.draw.line(surface, INPUT_TEXT_COLOR, (cursor_x, box.y + 10), (cursor_x, box.bottom - 10), 2)
+    
+    def draw(self, surface):
         surface.fill(BACKGROUND_COLOR)
         
         # Título
@@ -591,331 +833,270 @@ def get_player_name(surface):
         
         # Instruções e campos
         draw_text(surface, 'Digite seu nome:', 30, WIDTH // 2, HEIGHT // 2 - 60)
-        pygame.draw.rect(surface, name_color, name_box, 2)
-        name_surface = font.render(name_text, True, INPUT_TEXT_COLOR)
-        width = max(name_box.w, name_surface.get_width() + 10)
-        name_box.w = width
-        surface.blit(name_surface, (name_box.x + 5, name_box.y + 10))
-        
+        self.draw_input(surface, self.name_box, self.name_text, self.name_active)
         draw_text(surface, 'Digite seu código:', 30, WIDTH // 2, HEIGHT // 2 + 30)
-        pygame.draw.rect(surface, code_color, code_box, 2)
-        code_surface = font.render(code_text, True, INPUT_TEXT_COLOR)
-        width = max(code_box.w, code_surface.get_width() + 10)
-        code_box.w = width
-        surface.blit(code_surface, (code_box.x + 5, code_box.y + 10))
+        self.draw_input(surface, self.code_box, self.code_text, self.code_active)
         
         # Renderizar o botão
-        mouse = pygame.mouse.get_pos()
-        if button.x <= mouse[0] <= button.x + button.w and button.y <= mouse[1] <= button.y + button.h:
-            pygame.draw.rect(surface, BUTTON_HOVER_COLOR, button)
-        else:
-            pygame.draw.rect(surface, BUTTON_COLOR, button)
-        
-        button_surf = font.render(button_text, True, TEXT_COLOR)
-        surface.blit(button_surf, (button.x + (button.w - button_surf.get_width()) // 2, 
-                                 button.y + (button.h - button_surf.get_height()) // 2))
-        
-        pygame.display.update()
-    
-    return 'Jogador', '0000'
+        pygame.draw.rect(surface, BUTTON_HOVER_COLOR if self.hover else BUTTON_COLOR, self.button)
+        button_surf = render_text(self.button_text, self.input_font_size)
+        surface.blit(button_surf, (self.button.x + (self.button.w - button_surf.get_width()) // 2, 
+                                   self.button.y + (self.button.h - button_surf.get_height()) // 2))
+
+def get_player_name(surface):
+    return run_scene(surface, NameEntryScene())
 
 # Carregar sons
-def load_sounds():
-    # Definir caminhos para os arquivos de som
-    sound_files = {
-        'move': 'move_sound.wav',
-        'eat': 'eat_sound.wav',
-        'special_eat': 'special_eat_sound.wav',
-        'lose_life': 'lose_life_sound.wav',
-        'death': 'death_sound.wav'
-    }
-    
-    # Dicionário para armazenar os sons
+SOUND_VOLUME = 0.3  # Volume baixo para não incomodar
+
+def load_sounds(cache_dir=SOUND_CACHE_DIR):
+    # Os efeitos são sintetizados (NumPy) só quando não há um WAV válido no
+    # cache para os parâmetros atuais; nas próximas execuções só carrega
+    try:
+        init_mixer()
+    except pygame.error as e:
+        print(f"Áudio indisponível: {e}")
+        return {}
+    mixer_matches = pygame.mixer.get_init() == (SAMPLE_RATE, -16, 1)
     sounds = {}
-    
-    # Tentar carregar os sons, se não existirem, criar arquivos vazios
-    for sound_name, file_path in sound_files.items():
+    for sound_name in SOUND_EFFECTS:
         try:
-            # Verificar se o arquivo existe antes de tentar carregá-lo
-            if os.path.exists(file_path):
-                print(f"Carregando som 8-bit: {file_path}")
-                sounds[sound_name] = pygame.mixer.Sound(file_path)
-                # Ajustar volume para sons 8-bit
-                sounds[sound_name].set_volume(0.4)
+            file_path, samples = ensure_sound(sound_name, cache_dir=cache_dir)
+            if samples is not None and mixer_matches:
+                # Mesmo formato do mixer: criar o som das amostras recém-sintetizadas,
+                # sem reler o WAV (o pygame copia o buffer para o Sound)
+                print(f"Criando som 8-bit: {file_path}")
+                sound_obj = pygame.mixer.Sound(buffer=samples)
             else:
-                raise FileNotFoundError(f"Arquivo {file_path} não encontrado")
-        except Exception as e:
-            # Se o arquivo não existir ou houver erro ao carregar, criar um som 8-bit
-            print(f"Erro ao carregar som {file_path}: {e}. Criando som 8-bit.")
-            # Criar um som 8-bit com onda senoidal suave
-            buffer = bytearray()
-            import math
-            for i in range(4410):  # 0.1 segundo de som a 44100Hz
-                # Criar uma onda senoidal suave para som mais agradável
-                if sound_name == 'move':
-                    # Som de movimento mais suave e curto
-                    value = int(32767 * math.sin(2 * math.pi * 440 * i / 44100) * math.exp(-i / 2000))
-                elif sound_name == 'eat':
-                    # Som de comida mais agudo
-                    value = int(32767 * math.sin(2 * math.pi * 880 * i / 44100) * math.exp(-i / 3000))
-                elif sound_name == 'special_eat':
-                    # Som de comida especial com frequência modulada
-                    freq = 660 + 220 * math.sin(2 * math.pi * 5 * i / 44100)
-                    value = int(32767 * math.sin(2 * math.pi * freq * i / 44100) * math.exp(-i / 4000))
-                elif sound_name == 'lose_life':
-                    # Som de perda de vida mais grave e longo
-                    value = int(32767 * math.sin(2 * math.pi * 220 * i / 44100) * math.exp(-i / 6000))
-                else:  # death
-                    # Som de morte com frequência descendente
-                    freq = 440 * math.exp(-i / 4000)
-                    value = int(32767 * math.sin(2 * math.pi * freq * i / 44100) * math.exp(-i / 8000))
-                buffer.extend([value & 0xFF, (value >> 8) & 0xFF])
-            
-            sound_obj = pygame.mixer.Sound(buffer=buffer)
-            sound_obj.set_volume(0.3)  # Volume baixo para não incomodar
+                print(f"Carregando som 8-bit: {file_path}")
+                sound_obj = pygame.mixer.Sound(file_path)
+            sound_obj.set_volume(SOUND_VOLUME)
             sounds[sound_name] = sound_obj
-            
-            # Salvar o som para uso futuro
-            with open(file_path, 'wb') as f:
-                f.write(buffer)
+        except Exception as e:
+            print(f"Erro ao carregar som {sound_name}: {e}")
     
     return sounds
 
-def main():
+class AssetLoader:
+    # Abre o mixer, carrega os sons e prepara os sprites numa thread, enquanto
+    # a tela de nome já responde ao teclado. get() espera o fim (normalmente
+    # já terminou quando o jogador acaba de digitar).
+    def __init__(self, cache_dir=SOUND_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.sounds = {}
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._load, name='asset-loader', daemon=True)
+    
+    def start(self):
+        self.thread.start()
+        return self
+    
+    def _load(self):
+        try:
+            self.sounds = load_sounds(self.cache_dir)
+            get_atlas()
+        except Exception as e:
+            print(f"Erro ao carregar sons: {e}")
+        finally:
+            self.done.set()
+    
+    def get(self, timeout=None):
+        self.done.wait(timeout)
+        return self.sounds
+
+def main(board_size=None, server=None, room='principal', spectate=False):
+    init_display()
     clock = pygame.time.Clock()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption('Jogo da Cobrinha')
     
+    # Sons e sprites carregam em segundo plano; a primeira tela aparece já
+    assets = AssetLoader().start()
+    
     # Testar conexão com a API antes de iniciar o jogo
     test_api_connection()
     
-    # Carregar sons
-    try:
-        sounds = load_sounds()
-    except Exception as e:
-        print(f"Erro ao carregar sons: {e}")
-        sounds = {}
+    if server is not None:
+        # Multijogador: o servidor simula, esta janela só desenha
+        import net_client
+        if spectate:
+            net_client.play(screen, *server, room, '', '', spectate=True)
+            pygame.quit()
+            return
+        while True:
+            player_name, player_code = get_player_name(screen)
+            net_client.play(screen, *server, room, player_name, player_code)
     
     # Iniciar o jogo
-    start_game(screen, clock, sounds)
-
-def start_game(screen, clock, sounds=None):
-    while True:
-        # Obter nome do jogador
-        player_name, player_code = get_player_name(screen)
-        
-        # Carregar sons se não foram fornecidos
-        if sounds is None:
-            try:
-                sounds = load_sounds()
-            except Exception as e:
-                print(f"Erro ao carregar sons: {e}")
-                sounds = {}
-        
-        snake = Snake()
-        food = Food()
-        danger_foods = [DangerFood() for _ in range(3)]  # Criar 3 caveiras
-        last_danger_spawn = time.time()
-        danger_spawn_delay = 1.0  # Spawn uma nova caveira a cada segundo
-        
-        # Variável para controlar quando tocar o som de movimento
-        last_move_sound_time = 0
-        move_sound_delay = 0.1  # Delay entre sons de movimento (em segundos)
-        
-        # Variáveis para controlar o início do jogo
-        game_started = False
-        start_time = None
-        game_duration = 45  # segundos
-        
-        running = True
-        while running:
-            # Calcular tempo restante apenas se o jogo já começou
-            current_time = time.time()
-            if game_started:
-                elapsed_time = current_time - start_time
-                remaining_time = max(0, game_duration - elapsed_time)
-            else:
-                remaining_time = game_duration
-            
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        snake.change_direction(UP)
-                        if not game_started:
-                            game_started = True
-                            start_time = time.time()
-                    elif event.key == pygame.K_DOWN:
-                        snake.change_direction(DOWN)
-                        if not game_started:
-                            game_started = True
-                            start_time = time.time()
-                    elif event.key == pygame.K_LEFT:
-                        snake.change_direction(LEFT)
-                        if not game_started:
-                            game_started = True
-                            start_time = time.time()
-                    elif event.key == pygame.K_RIGHT:
-                        snake.change_direction(RIGHT)
-                        if not game_started:
-                            game_started = True
-                            start_time = time.time()
-                    elif event.key == pygame.K_ESCAPE:
-                        running = False  # Volta para tela inicial
-                    elif event.key == pygame.K_F6:
-                        show_ranking(screen)
-            
-            # Guardar estado anterior para verificar se houve movimento
-            prev_head = snake.get_head_position() if snake.positions else None
-            prev_alive = snake.alive
-            prev_lives = snake.lives
-            
-            # Mover a cobra apenas se o jogo já começou
-            if game_started:
-                snake.move()
-            
-            # Tocar som de movimento se a cobra se moveu e está viva
-            if prev_head != snake.get_head_position() and snake.alive and current_time - last_move_sound_time > move_sound_delay:
-                if 'move' in sounds:
-                    sounds['move'].play()
-                last_move_sound_time = current_time
-            
-            # Verificar se perdeu vida ou morreu
-            if prev_alive and (not snake.alive):
-                # Cobra morreu
-                if 'death' in sounds:
-                    sounds['death'].play()
-            elif prev_lives > snake.lives:
-                # Perdeu uma vida mas não morreu
-                if 'lose_life' in sounds:
-                    sounds['lose_life'].play()
-            
-            # Verificar colisão com a comida apenas se o jogo já começou
-            if game_started and snake.get_head_position() == food.position:
-                if food.type == 'normal':
-                    snake.length += 1
-                    snake.score += 1
-                    # Aumentar velocidade em 2%
-                    snake.speed_multiplier *= 1.02
-                    # Tocar som de comida normal
-                    if 'eat' in sounds:
-                        sounds['eat'].play()
-                elif food.type == 'special':
-                    snake.length += 1
-                    snake.score += 50
-                    # Aumentar velocidade em 5%
-                    snake.speed_multiplier *= 1.05
-                    # Tocar som de comida especial
-                    if 'special_eat' in sounds:
-                        sounds['special_eat'].play()
-                
-                food.randomize_position(snake.positions)
-            
-            # Verificar colisão com as caveiras
-            for danger_food in danger_foods:
-                if danger_food.active and snake.get_head_position() == danger_food.position:
-                    snake.lives -= 1
-                    if snake.lives <= 0:
-                        snake.alive = False
-                        # Tocar som de morte
-                        if 'death' in sounds:
-                            sounds['death'].play()
-                    else:
-                        # Reposicionar a cobra no centro após perder uma vida
-                        snake.positions = [(GRID_WIDTH // 2, GRID_HEIGHT // 2 + SAFE_ZONE_HEIGHT)]
-                        # Tocar som de perda de vida
-                        if 'lose_life' in sounds:
-                            sounds['lose_life'].play()
-                    danger_food.active = False
-            
-            # Spawn de novas caveiras
-            if game_started and current_time - last_danger_spawn > danger_spawn_delay:
-                for danger_food in danger_foods:
-                    if not danger_food.active:
-                        danger_food.randomize_position(snake.positions)
-                        break
-                last_danger_spawn = current_time
-            
-            screen.fill(BACKGROUND_COLOR)
-            
-            # Desenhar bordas brancas para mostrar os limites
-            pygame.draw.rect(screen, BORDER_COLOR, pygame.Rect(0, SAFE_ZONE_HEIGHT * GRID_SIZE, WIDTH, HEIGHT - SAFE_ZONE_HEIGHT * GRID_SIZE), 2)
-            
-            # Desenhar a pontuação e informações no topo
-            font = pygame.font.SysFont('arial', 20)
-            
-            # Desenhar vidas como corações no lado esquerdo
-            heart_size = 20
-            heart_spacing = 25
-            for i in range(snake.lives):
-                # Desenhar coração
-                heart_x = 10 + (i * heart_spacing)
-                heart_y = 10
-                # Parte superior do coração (dois círculos)
-                pygame.draw.circle(screen, (255, 0, 0), (heart_x + heart_size//4, heart_y + heart_size//4), heart_size//4)
-                pygame.draw.circle(screen, (255, 0, 0), (heart_x + heart_size*3//4, heart_y + heart_size//4), heart_size//4)
-                # Parte inferior do coração (triângulo)
-                points = [
-                    (heart_x + heart_size//4 - heart_size//4, heart_y + heart_size//4),
-                    (heart_x + heart_size//2, heart_y + heart_size),
-                    (heart_x + heart_size*3//4 + heart_size//4, heart_y + heart_size//4)
-                ]
-                pygame.draw.polygon(screen, (255, 0, 0), points)
-                # Preenchimento adicional para um coração mais suave
-                pygame.draw.circle(screen, (255, 0, 0), (heart_x + heart_size//2, heart_y + heart_size//2), heart_size//3)
-            
-            # Desenhar pontuação e vidas no centro
-            score_text = f'Pontuação: {snake.score} | Vidas: {snake.lives}'
-            score_surface = font.render(score_text, True, TEXT_COLOR)
-            score_rect = score_surface.get_rect()
-            score_rect.midtop = (WIDTH // 2, 10)
-            
-            # Desenhar timer no lado direito
-            timer_text = f'Tempo: {int(remaining_time)}s'
-            timer_surface = font.render(timer_text, True, TEXT_COLOR)
-            timer_rect = timer_surface.get_rect()
-            timer_rect.topright = (WIDTH - 10, 10)
-            
-            # Desenhar fundo para todos os textos
-            bg_height = 40
-            pygame.draw.rect(screen, (50, 50, 50), pygame.Rect(0, 0, WIDTH, bg_height))
-            pygame.draw.line(screen, (100, 100, 100), (0, bg_height), (WIDTH, bg_height), 2)
-            
-            # Desenhar os textos
-            screen.blit(score_surface, score_rect)
-            screen.blit(timer_surface, timer_rect)
-            
-            # Desenhar a comida
-            food.draw(screen)
-            
-            # Desenhar as caveiras
-            for danger_food in danger_foods:
-                danger_food.draw(screen)
-            
-            # Desenhar a cobra
-            snake.draw(screen)
-            
-            # Desenhar mensagem de início se o jogo ainda não começou
-            if not game_started:
-                draw_text(screen, 'Pressione qualquer seta para começar', 30, WIDTH // 2, HEIGHT // 2)
-            
-            pygame.display.update()
-            
-            # Verificar se o jogo acabou
-            if not snake.alive:
-                game_over_screen(screen, snake.score, player_name, player_code)
-                running = False
-            elif game_started and remaining_time <= 0:
-                # Jogador venceu!
-                victory_screen(screen, snake.score, player_name, player_code)
-                running = False
-            
-            # Ajustar FPS com base no multiplicador de velocidade
-            base_fps = 10
-            adjusted_fps = base_fps * snake.speed_multiplier
-            clock.tick(adjusted_fps)  # FPS ajustado
+    start_game(screen, clock, assets, board_size)
+
+class PlayScene(Scene):
+    # Uma partida: entrada, passos fixos da simulação, sons e desenho.
+    # on_over(cena) é chamado quando a partida acaba ou o jogador sai (ESC)
+    realtime = True
+    frame_rate = DISPLAY_FPS
+    
+    def __init__(self, player_name, player_code, audio, board_size=None, profiler=None,
+                 show_profiler=False, on_over=None):
+        # audio: SoundEngine (canais, prioridades e limite de vozes dos efeitos)
+        super().__init__()
+        self.player_name = player_name
+        self.player_code = player_code
+        self.audio = audio
+        self.on_over = on_over
+        board_width, board_height = board_size or (GRID_WIDTH, GRID_HEIGHT)
+        self.game = Game(width=board_width, height=board_height)
+        # Semente e direções por passo bastam para reproduzir a partida
+        self.replay = replay_for(self.game, player_name, player_code)
+        self.renderer = None
+        
+        # Profiler de quadros (F3 mostra o overlay)
+        self.profiler = profiler or FrameProfiler()
+        self.show_profiler = show_profiler
+        
+        # A simulação anda em passos fixos de 1 / (BASE_FPS * multiplicador)
+        # segundos, independente da taxa de desenho; setas apertadas entre
+        # dois passos ficam na fila e são aplicadas uma por passo
+        self.timestep = FixedTimestep()
+        self.pending_directions = deque(maxlen=MAX_PENDING_DIRECTIONS)
+        
+        # O jogo só começa (e o relógio só anda) depois da primeira seta
+        self.game_started = False
+    
+    def enter(self):
+        self.renderer = make_renderer(self.manager.surface, self.game)
+        self.attach_profiler()
+    
+    def attach_profiler(self):
+        profiler = self.profiler
+        profiler.set_enabled(self.show_profiler or profiler.export_path is not None)
+        self.game.profiler = self.renderer.profiler = profiler if profiler.enabled else None
+        self.renderer.overlay = (lambda surface: draw_profiler_overlay(surface, profiler)) if self.show_profiler else None
+        self.renderer.invalidate()
+    
+    def resume(self):
+        super().resume()
+        self.renderer.invalidate()
+        # O tempo parado (ranking, janela minimizada ou sem foco) não conta para o jogo
+        self.timestep.reset(time.perf_counter())
+    
+    def finish(self):
+        if self.on_over is not None:
+            self.on_over(self)
+        else:
+            self.close(self)
+    
+    def begin_frame(self):
+        self.profiler.begin_frame()
+    
+    def handle(self, event):
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key in ARROW_DIRECTIONS:
+            self.pending_directions.append(ARROW_DIRECTIONS[event.key])
+            if not self.game_started:
+                self.game_started = True
+                self.timestep.reset(time.perf_counter())
+        elif event.key == pygame.K_ESCAPE:
+            self.finish()  # Volta para tela inicial
+        elif event.key == pygame.K_F6:
+            self.manager.push(RankingScene())
+        elif event.key == pygame.K_F3:
+            self.show_profiler = not self.show_profiler
+            self.attach_profiler()
+            self.profiler.begin_frame()
+    
+    def update(self, now):
+        game = self.game
+        profiler = self.profiler
+        profiler.mark('events')
+        
+        # Avançar a simulação apenas se o jogo já começou
+        events = []
+        if self.game_started:
+            self.timestep.advance(now)
+            ticks = 0
+            while not game.over and self.timestep.consume(game.tick_duration()):
+                direction = self.pending_directions.popleft() if self.pending_directions else None
+                events.extend(game.step(direction))
+                self.replay.record(direction)
+                ticks += 1
+            profiler.add_ticks(ticks)
+        
+        # Vários passos no mesmo quadro disparam o mesmo efeito no mesmo
+        # instante; o SoundEngine junta os repetidos e limita as vozes
+        for sound_name in events:
+            self.audio.play(sound_name, now)
+        
+        profiler.mark('audio')
+        
+        # Verificar se o jogo acabou
+        if game.over:
+            self.finish()
+    
+    def draw(self, surface):
+        # O renderer já atualiza a tela (só os retângulos que mudaram)
+        self.renderer.draw(self.game, self.game.remaining_time(), show_start_message=not self.game_started)
+        return []
+    
+    def end_frame(self):
+        # Limitar só a taxa de desenho; a velocidade do jogo vem do timestep
+        self.profiler.mark('wait')
+        self.profiler.end_frame()
+
+def start_game(screen, clock, sounds=None, board_size=None):
+    # sounds: dicionário de sons ou um AssetLoader ainda carregando
+    # board_size: (largura, altura) em células para o modo tabuleiro grande
+    # Fluxo: nome -> partida -> fim de jogo/vitória -> nome, numa só máquina de cenas
+    if sounds is None:
+        sounds = AssetLoader().start()
+    audio = None
+    
+    # Profiler de quadros: F3 mostra o overlay; SNAKE_PROFILE_EXPORT=arquivo.jsonl
+    # grava cada quadro em JSONL
+    profiler = FrameProfiler(export_path=os.environ.get('SNAKE_PROFILE_EXPORT'))
+    show_profiler = False
+    manager = SceneManager(screen, clock)
+    
+    def new_player():
+        return NameEntryScene(on_submit=start_play)
+    
+    def start_play(player_name, player_code):
+        nonlocal sounds, audio
+        # Sons carregados enquanto o nome era digitado; os canais são
+        # reservados uma vez só, para todas as partidas
+        if audio is None:
+            if isinstance(sounds, AssetLoader):
+                sounds = sounds.get()
+            audio = SoundEngine(sounds)
+        manager.replace(PlayScene(player_name, player_code, audio, board_size, profiler,
+                                  show_profiler, on_over=game_over))
+    
+    def game_over(play):
+        nonlocal show_profiler
+        show_profiler = play.show_profiler
+        profiler.flush()
+        game = play.game
+        if not game.over:
+            manager.replace(new_player())  # ESC durante a partida
+            return
+        manager.replace(ResultScene(game.snake.score, play.player_name, play.player_code,
+                                    game.result != 'death', save_replay(play.replay, game),
+                                    on_close=lambda: manager.replace(new_player())))
+    
+    manager.run(new_player())
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # python snake_game.py [--board 1000x1000] [--server host:porta --room sala [--spectate]]
+    parser = argparse.ArgumentParser(description='Jogo da Cobrinha')
+    parser.add_argument('--board', type=snake_core.parse_board_size, default=None,
+                        help='tabuleiro grande em células, seguido por uma câmera (ex.: 1000x1000)')
+    parser.add_argument('--server', default=None, metavar='HOST[:PORTA]',
+                        help='jogar no servidor multijogador (game_server.py)')
+    parser.add_argument('--room', default='principal', help='sala no servidor multijogador')
+    parser.add_argument('--spectate', action='store_true', help='só assistir a sala, sem jogar')
+    args = parser.parse_args()
+    if args.server is not None:
+        from net_client import parse_address
+        args.server = parse_address(args.server)
+    main(args.board, args.server, args.room, args.spectate)
\ No newline at end of file
@@ -0,0 +1,499 @@
+import json
+import random
+import sys
+import time
+
+from snake_core import DIRECTIONS
+
+# Snapshots binários do estado de uma sala, para clientes e espectadores.
+#
+# A cada passo quase nada muda: as cobras ganham uma cabeça e perdem a
+# cauda, e de vez em quando surge comida ou uma caveira. Então o servidor
+# manda um keyframe (estado completo) só de tempos em tempos ou quando o
+# cliente não tem base, e nos outros passos um delta contra o último quadro
+# que o cliente confirmou (ack). Quadros são numerados pelo codificador,
+# independente do passo do jogo (que recomeça a cada rodada).
+#
+# O estado é o dicionário de MultiGame.snapshot(): tick, remaining, food
+# (x, y, tipo) ou None, skulls [(x, y)], snakes [{id, name, lives, score,
+# alive, body [(x, y), ...]}]. O tempo restante viaja em décimos de segundo.
+#
+# Formato (little-endian, inteiros variáveis em varint):
+#   keyframe  u8 1, quadro, tick, restante, comida, caveiras, n, n x cobra
+#   delta     u8 2, quadro, quadro base, tick, restante, comida, caveiras,
+#             n, n x (id, u8 flags, campos conforme as flags)
+#   comida    u8 0 nenhuma (no delta: sem mudança), 1 normal, 2 especial,
+#             3 nenhuma (só no delta), seguido de u16 x, u16 y
+#   caveiras  quantidade + u16 x, u16 y cada; no delta vem antes um u8,
+#             0 = sem mudança (e nada mais), 1 = lista a seguir
+#   cobra     id, u8 vidas, pontuação, u8 viva, nome (u8 tamanho + UTF-8), corpo
+#   corpo     n, cabeça u16 x, u16 y, u8 modo; modo 0 = direções de 2 bits
+#             (4 por byte) da cabeça para a cauda, modo 1 = u16 x, u16 y por célula
+#   flags     NEW cobra completa, STATS vidas/pontos/viva, MOVED k novas
+#             células (direções de 2 bits a partir da cabeça anterior) e
+#             quantas saíram da cauda, BODY corpo completo
+
+KEYFRAME = 1
+DELTA = 2
+FOOD_TYPES = ('normal', 'special')
+FOOD_NONE, FOOD_REMOVED = 0, 3
+SKULLS_UNCHANGED, SKULLS_CHANGED = 0, 1
+BODY_PACKED, BODY_RAW = 0, 1
+NEW, STATS, MOVED, BODY = 1, 2, 4, 8
+REMAINING_SCALE = 10
+KEYFRAME_INTERVAL = 100  # Quadros entre keyframes obrigatórios (10 s a 10 passos/s)
+HISTORY_SIZE = 64  # Quadros guardados como possíveis bases de delta
+MAX_HEAD_SEARCH = HISTORY_SIZE + 1  # Células procuradas pela cabeça antiga
+
+DIRECTION_CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise SnapshotError('snapshot truncado')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_cell(out, cell):
+    out += cell[0].to_bytes(2, 'little')
+    out += cell[1].to_bytes(2, 'little')
+
+
+def _read_cell(data, pos):
+    if pos + 4 > len(data):
+        raise SnapshotError('snapshot truncado')
+    return (data[pos] | data[pos + 1] << 8, data[pos + 2] | data[pos + 3] << 8), pos + 4
+
+
+def _path_codes(cells):
+    # Direções entre células consecutivas, ou None se alguma não for vizinha
+    codes = []
+    for a, b in zip(cells, cells[1:]):
+        code = DIRECTION_CODES.get((b[0] - a[0], b[1] - a[1]))
+        if code is None:
+            return None
+        codes.append(code)
+    return codes
+
+
+def _pack_codes(out, codes):
+    for i in range(0, len(codes), 4):
+        chunk = codes[i:i + 4]
+        byte = 0
+        for j, code in enumerate(chunk):
+            byte |= code << (2 * j)
+        out.append(byte)
+
+
+def _unpack_path(data, pos, start, count):
+    # count células a partir de start seguindo direções de 2 bits
+    end = pos + (count + 3) // 4
+    if end > len(data):
+        raise SnapshotError('snapshot truncado')
+    cells = []
+    x, y = start
+    for i in range(count):
+        dx, dy = DIRECTIONS[(data[pos + i // 4] >> (2 * (i % 4))) & 3]
+        x += dx
+        y += dy
+        cells.append((x, y))
+    return cells, end
+
+
+def _write_body(out, body):
+    write_varint(out, len(body))
+    if not body:
+        return
+    _write_cell(out, body[0])
+    codes = _path_codes(body)
+    if codes is not None:
+        out.append(BODY_PACKED)
+        _pack_codes(out, codes)
+    else:
+        out.append(BODY_RAW)
+        for cell in body[1:]:
+            _write_cell(out, cell)
+
+
+def _read_body(data, pos):
+    count, pos = read_varint(data, pos)
+    if not count:
+        return [], pos
+    head, pos = _read_cell(data, pos)
+    if pos >= len(data):
+        raise SnapshotError('snapshot truncado')
+    mode = data[pos]
+    pos += 1
+    if mode == BODY_PACKED:
+        rest, pos = _unpack_path(data, pos, head, count - 1)
+    elif mode == BODY_RAW:
+        rest = []
+        for _ in range(count - 1):
+            cell, pos = _read_cell(data, pos)
+            rest.append(cell)
+    else:
+        raise SnapshotError(f'modo de corpo desconhecido: {mode}')
+    return [head] + rest, pos
+
+
+def _write_stats(out, snake):
+    out.append(snake['lives'])
+    write_varint(out, snake['score'])
+    out.append(1 if snake['alive'] else 0)
+
+
+def _read_stats(data, pos, snake):
+    if pos >= len(data):
+        raise SnapshotError('snapshot truncado')
+    snake['lives'] = data[pos]
+    snake['score'], pos = read_varint(data, pos + 1)
+    if pos >= len(data):
+        raise SnapshotError('snapshot truncado')
+    snake['alive'] = data[pos] == 1
+    return pos + 1
+
+
+def _write_snake(out, snake):
+    _write_stats(out, snake)
+    name = snake['name'].encode('utf-8')[:255]
+    out.append(len(name))
+    out += name
+    _write_body(out, snake['body'])
+
+
+def _read_snake(data, pos, snake_id):
+    snake = {'id': snake_id}
+    pos = _read_stats(data, pos, snake)
+    if pos >= len(data):
+        raise SnapshotError('snapshot truncado')
+    size = data[pos]
+    snake['name'] = bytes(data[pos + 1:pos + 1 + size]).decode('utf-8')
+    snake['body'], pos = _read_body(data, pos + 1 + size)
+    return snake, pos
+
+
+def _write_header(out, state):
+    write_varint(out, state['tick'])
+    write_varint(out, round(state['remaining'] * REMAINING_SCALE))
+
+
+def _write_food(out, food):
+    if food is None:
+        out.append(FOOD_NONE)
+    else:
+        out.append(FOOD_TYPES.index(food[2]) + 1)
+        _write_cell(out, food)
+
+
+def _read_food(data, pos):
+    if pos >= len(data):
+        raise SnapshotError('snapshot truncado')
+    code = data[pos]
+    pos += 1
+    if code in (1, 2):
+        cell, pos = _read_cell(data, pos)
+        return (cell[0], cell[1], FOOD_TYPES[code - 1]), pos
+    return code, pos
+
+
+def _write_skulls(out, skulls):
+    write_varint(out, len(skulls))
+    for cell in skulls:
+        _write_cell(out, cell)
+
+
+def _read_skulls(data, pos):
+    count, pos = read_varint(data, pos)
+    skulls = []
+    for _ in range(count):
+        cell, pos = _read_cell(data, pos)
+        skulls.append(cell)
+    return skulls, pos
+
+
+def encode_keyframe(state, frame):
+    out = bytearray([KEYFRAME])
+    write_varint(out, frame)
+    _write_header(out, state)
+    _write_food(out, state['food'])
+    _write_skulls(out, state['skulls'])
+    write_varint(out, len(state['snakes']))
+    for snake in state['snakes']:
+        write_varint(out, snake['id'])
+        _write_snake(out, snake)
+    return bytes(out)
+
+
+def _body_delta(body, base_body):
+    # (novas células, células removidas da cauda) ou None se for preciso
+    # mandar o corpo inteiro (renasceu, andou demais)
+    if not base_body or not body:
+        return None
+    old_head = base_body[0]
+    for steps in range(min(len(body), MAX_HEAD_SEARCH)):
+        if body[steps] == old_head:
+            break
+    else:
+        return None
+    kept = len(body) - steps
+    removed = len(base_body) - kept
+    # O resto do corpo precisa ser o começo do corpo antigo, célula a célula
+    # (mesmas pontas não bastam: o meio pode ter mudado)
+    if removed < 0 or body[steps:] != base_body[:kept]:
+        return None
+    codes = _path_codes(body[steps::-1])
+    if codes is None:
+        return None
+    return codes, removed
+
+
+def encode_delta(state, frame, base, base_frame):
+    out = bytearray([DELTA])
+    write_varint(out, frame)
+    write_varint(out, base_frame)
+    _write_header(out, state)
+    if state['food'] == base['food']:
+        out.append(FOOD_NONE)
+    elif state['food'] is None:
+        out.append(FOOD_REMOVED)
+    else:
+        _write_food(out, state['food'])
+    if state['skulls'] == base['skulls']:
+        out.append(SKULLS_UNCHANGED)
+    else:
+        out.append(SKULLS_CHANGED)
+        _write_skulls(out, state['skulls'])
+
+    base_snakes = {snake['id']: snake for snake in base['snakes']}
+    write_varint(out, len(state['snakes']))
+    for snake in state['snakes']:
+        write_varint(out, snake['id'])
+        base_snake = base_snakes.get(snake['id'])
+        if base_snake is None:
+            out.append(NEW)
+            _write_snake(out, snake)
+            continue
+        flags = 0
+        if (snake['lives'], snake['score'], snake['alive']) != (base_snake['lives'], base_snake['score'], base_snake['alive']):
+            flags |= STATS
+        body, base_body = snake['body'], base_snake['body']
+        unchanged = body == base_body
+        # Perdeu vida ou morreu: renasceu em outro lugar, corpo inteiro
+        respawned = (snake['lives'], snake['alive']) != (base_snake['lives'], base_snake['alive'])
+        delta = None if unchanged or respawned else _body_delta(body, base_body)
+        if not unchanged:
+            flags |= MOVED if delta is not None else BODY
+        out.append(flags)
+        if flags & STATS:
+            _write_stats(out, snake)
+        if flags & MOVED:
+            codes, removed = delta
+            write_varint(out, len(codes))
+            _pack_codes(out, codes)
+            write_varint(out, removed)
+        elif flags & BODY:
+            _write_body(out, body)
+    return bytes(out)
+
+
+def peek_frame(data):
+    # Número do quadro sem decodificar o resto (para acks baratos)
+    if not data or data[0] not in (KEYFRAME, DELTA):
+        raise SnapshotError('não é um snapshot')
+    return read_varint(data, 1)[0]
+
+
+def decode(data, history):
+    # Devolve (quadro, estado). history: quadro -> estado já decodificado,
+    # de onde saem as bases dos deltas
+    if not data:
+        raise SnapshotError('snapshot vazio')
+    kind = data[0]
+    frame, pos = read_varint(data, 1)
+    if kind == KEYFRAME:
+        base = None
+    elif kind == DELTA:
+        base_frame, pos = read_varint(data, pos)
+        base = history.get(base_frame)
+        if base is None:
+            raise SnapshotError(f'base {base_frame} não está no histórico')
+    else:
+        raise SnapshotError(f'tipo de snapshot desconhecido: {kind}')
+
+    tick, pos = read_varint(data, pos)
+    remaining, pos = read_varint(data, pos)
+    state = {'tick': tick, 'remaining': remaining / REMAINING_SCALE}
+    food, pos = _read_food(data, pos)
+    if food == FOOD_NONE:
+        food = base['food'] if base is not None else None
+    elif food == FOOD_REMOVED:
+        food = None
+    state['food'] = food
+    if base is not None:
+        if pos >= len(data):
+            raise SnapshotError('snapshot truncado')
+        pos += 1
+        if data[pos - 1] == SKULLS_UNCHANGED:
+            state['skulls'] = base['skulls']
+        else:
+            state['skulls'], pos = _read_skulls(data, pos)
+    else:
+        state['skulls'], pos = _read_skulls(data, pos)
+
+    count, pos = read_varint(data, pos)
+    base_snakes = {snake['id']: snake for snake in base['snakes']} if base is not None else {}
+    snakes = []
+    for _ in range(count):
+        snake_id, pos = read_varint(data, pos)
+        if base is None:
+            snake, pos = _read_snake(data, pos, snake_id)
+            snakes.append(snake)
+            continue
+        if pos >= len(data):
+            raise SnapshotError('snapshot truncado')
+        flags = data[pos]
+        pos += 1
+        if flags & NEW:
+            snake, pos = _read_snake(data, pos, snake_id)
+            snakes.append(snake)
+            continue
+        base_snake = base_snakes.get(snake_id)
+        if base_snake is None:
+            raise SnapshotError(f'cobra {snake_id} não existe na base')
+        snake = dict(base_snake)
+        if flags & STATS:
+            pos = _read_stats(data, pos, snake)
+        if flags & MOVED:
+            steps, pos = read_varint(data, pos)
+            base_body = base_snake['body']
+            new_cells, pos = _unpack_path(data, pos, base_body[0], steps)
+            removed, pos = read_varint(data, pos)
+            new_cells.reverse()
+            snake['body'] = new_cells + base_body[:len(base_body) - removed]
+        elif flags & BODY:
+            snake['body'], pos = _read_body(data, pos)
+        snakes.append(snake)
+    state['snakes'] = snakes
+    if pos != len(data):
+        raise SnapshotError('bytes sobrando no snapshot')
+    return frame, state
+
+
+class SnapshotEncoder:
+    # Lado do servidor: numera os quadros, guarda os últimos como bases e
+    # codifica cada quadro uma vez por base pedida (jogadores da mesma sala
+    # costumam confirmar o mesmo quadro, então quase sempre é uma só)
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL, history_size=HISTORY_SIZE):
+        self.keyframe_interval = keyframe_interval
+        self.history_size = history_size
+        self.history = {}
+        self.frame = 0
+        self.state = None
+        self.cache = {}
+
+    def push(self, state):
+        self.frame += 1
+        self.state = state
+        self.history[self.frame] = state
+        self.history.pop(self.frame - self.history_size, None)
+        self.cache.clear()
+        return self.frame
+
+    def encode_for(self, acked_frame):
+        # Delta contra o quadro confirmado, ou keyframe se não houver base
+        # utilizável ou se for a vez do keyframe periódico
+        if (acked_frame is None or acked_frame not in self.history or acked_frame >= self.frame
+                or self.frame % self.keyframe_interval == 0):
+            acked_frame = None
+        data = self.cache.get(acked_frame)
+        if data is None:
+            if acked_frame is None:
+                data = encode_keyframe(self.state, self.frame)
+            else:
+                data = encode_delta(self.state, self.frame, self.history[acked_frame], acked_frame)
+            self.cache[acked_frame] = data
+        return data
+
+
+class SnapshotDecoder:
+    # Lado do cliente: aplica keyframes e deltas e guarda as bases recentes
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.history_size = history_size
+        self.history = {}
+        self.frame = None
+        self.state = None
+
+    def decode(self, data):
+        frame, state = decode(data, self.history)
+        self.history[frame] = state
+        for old in [f for f in self.history if f <= frame - self.history_size]:
+            del self.history[old]
+        self.frame = frame
+        self.state = state
+        return state
+
+
+def quantized(state):
+    # Estado como o decodificador o vê (tempo restante em décimos)
+    return dict(state, remaining=round(state['remaining'] * REMAINING_SCALE) / REMAINING_SCALE)
+
+
+def verify(games=20, players=4, ack_lag=3, seed=0):
+    # Confere a ida e volta em partidas aleatórias: keyframes, deltas com ack
+    # atrasado e renascimentos. Devolve (quadros, bytes binários, bytes JSON)
+    from multiplayer import MultiGame
+    rng = random.Random(seed)
+    frames = binary_bytes = json_bytes = 0
+    for game_index in range(games):
+        game = MultiGame(seed=rng.getrandbits(32), duration=30)
+        for player in range(players):
+            game.add_player(player + 1, f'jogador{player}')
+        encoder = SnapshotEncoder()
+        decoder = SnapshotDecoder()
+        acks = []
+        while not game.over:
+            game.step({player + 1: rng.choice(DIRECTIONS) for player in range(players) if rng.random() < 0.2})
+            state = game.snapshot()
+            encoder.push(state)
+            # O cliente confirma com alguns quadros de atraso
+            data = encoder.encode_for(acks[-ack_lag] if len(acks) >= ack_lag else None)
+            decoded = decoder.decode(data)
+            if decoded != quantized(state):
+                raise SnapshotError(f'divergência no jogo {game_index}, quadro {encoder.frame}')
+            acks.append(decoder.frame)
+            frames += 1
+            binary_bytes += len(data)
+            json_bytes += len(json.dumps(state, separators=(',', ':')))
+    return frames, binary_bytes, json_bytes
+
+
+if __name__ == '__main__':
+    # python snapshot_codec.py -> confere ida e volta e compara com JSON
+    start = time.perf_counter()
+    try:
+        frames, binary_bytes, json_bytes = verify()
+    except SnapshotError as e:
+        print(f'ERRO: {e}')
+        sys.exit(1)
+    duration = time.perf_counter() - start
+    print(f"{frames} quadros conferidos em {duration:.2f} s")
+    print(f"Binário: {binary_bytes / frames:.1f} bytes/quadro | JSON: {json_bytes / frames:.1f} bytes/quadro "
+          f"({json_bytes / binary_bytes:.1f}x maior)")
@@ -0,0 +1,149 @@
+import math
+
+import pygame
+
+from sound_synth import SAMPLE_COUNT, SAMPLE_RATE
+
+# Gerência dos canais do mixer para os efeitos da partida.
+#
+# Cada categoria de som tem seus próprios canais reservados (Sound.play()
+# solto nunca os pega), então o passo a cada tick não tira o canal da
+# comida nem o da morte. Cada efeito tem uma prioridade, um limite de vozes
+# tocando ao mesmo tempo e uma janela de coalescência: disparos repetidos
+# dentro da janela (vários passos num só quadro, com o multiplicador de
+# velocidade alto) viram um só. Quando a categoria está cheia, o som novo
+# toma o canal da voz de menor prioridade (a mais antiga, no empate), se
+# ela não for maior que a dele; se for, o som novo é descartado.
+#
+# Sem mixer (sem áudio, ou rodando sem janela) o SilentBackend faz as
+# mesmas contas sem tocar nada.
+
+# Canais reservados por categoria
+SOUND_CATEGORIES = {
+    'move': 1,
+    'food': 2,
+    'alert': 2,
+}
+
+# Efeito: (categoria, prioridade, vozes ao mesmo tempo, janela de coalescência em segundos)
+SOUND_RULES = {
+    'move': ('move', 0, 1, 0.1),
+    'eat': ('food', 1, 2, 0.03),
+    'special_eat': ('food', 2, 1, 0.03),
+    'lose_life': ('alert', 3, 1, 0.1),
+    'death': ('alert', 4, 1, 0.0),
+}
+
+SOUND_LENGTH = SAMPLE_COUNT / SAMPLE_RATE  # Duração dos efeitos sintetizados
+
+
+class MixerBackend:
+    def __init__(self, sounds, channel_count):
+        self.sounds = sounds
+        # Os primeiros canais do mixer ficam reservados para o SoundEngine
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channel_count))
+        pygame.mixer.set_reserved(channel_count)
+        self.channels = [pygame.mixer.Channel(i) for i in range(channel_count)]
+
+    def has(self, name):
+        return name in self.sounds
+
+    def length(self, name):
+        return self.sounds[name].get_length()
+
+    def play(self, channel, name):
+        # Tocar num canal ocupado interrompe a voz anterior
+        self.channels[channel].play(self.sounds[name])
+
+
+class SilentBackend:
+    # Sem áudio: todos os efeitos "tocam" pelo tempo de um efeito sintetizado
+    def has(self, name):
+        return True
+
+    def length(self, name):
+        return SOUND_LENGTH
+
+    def play(self, channel, name):
+        pass
+
+
+class Voice:
+    __slots__ = ('channel', 'name', 'priority', 'start', 'end')
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.name = None
+        self.priority = -1
+        self.start = 0.0
+        self.end = 0.0  # Até quando o canal está tocando
+
+
+class SoundEngine:
+    def __init__(self, sounds, rules=SOUND_RULES, categories=SOUND_CATEGORIES, backend=None):
+        # sounds: dicionário de load_sounds (vazio se não há áudio)
+        self.rules = rules
+        if backend is None:
+            if sounds and pygame.mixer.get_init():
+                backend = MixerBackend(sounds, sum(categories.values()))
+            else:
+                backend = SilentBackend()
+        self.backend = backend
+        self.silent = isinstance(backend, SilentBackend)
+        # Canais de cada categoria, numerados em sequência
+        self.voices = {}
+        channel = 0
+        for category, count in categories.items():
+            self.voices[category] = [Voice(channel + i) for i in range(count)]
+            channel += count
+        self.lengths = {}
+        self.last_trigger = {name: -math.inf for name in rules}
+        self.played = self.coalesced = self.stolen = self.dropped = 0
+
+    def play(self, name, now):
+        # Devolve True se o efeito começou a tocar agora
+        rule = self.rules.get(name)
+        if rule is None or not self.backend.has(name):
+            return False
+        category, priority, max_voices, window = rule
+        if now - self.last_trigger[name] < window:
+            self.coalesced += 1
+            return False
+
+        free = oldest_same = victim = None
+        same = 0
+        for voice in self.voices[category]:
+            if voice.end <= now:
+                if free is None:
+                    free = voice
+                continue
+            if voice.name == name:
+                same += 1
+                if oldest_same is None or voice.start < oldest_same.start:
+                    oldest_same = voice
+            if victim is None or (voice.priority, voice.start) < (victim.priority, victim.start):
+                victim = voice
+
+        if same >= max_voices:
+            # No limite de vozes, o disparo novo recomeça a voz mais antiga do mesmo efeito
+            voice = oldest_same
+        elif free is not None:
+            voice = free
+        elif victim.priority <= priority:
+            voice = victim
+            self.stolen += 1
+        else:
+            self.dropped += 1
+            return False
+
+        length = self.lengths.get(name)
+        if length is None:
+            length = self.lengths[name] = self.backend.length(name)
+        self.backend.play(voice.channel, name)
+        voice.name = name
+        voice.priority = priority
+        voice.start = now
+        voice.end = now + length
+        self.last_trigger[name] = now
+        self.played += 1
+        return True
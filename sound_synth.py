@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import wave
+
+import numpy as np
+
+# Síntese dos efeitos sonoros 8-bit com NumPy e cache em arquivos WAV.
+# Cada efeito é descrito só por parâmetros; o nome do arquivo leva um hash
+# desses parâmetros, então mudar um som gera um arquivo novo e os antigos
+# continuam válidos enquanto os parâmetros não mudarem.
+
+SAMPLE_RATE = 44100
+SAMPLE_COUNT = 4410  # 0.1 segundo de som
+CACHE_DIR = 'sound_cache'
+SYNTH_VERSION = 1  # Incrementar quando a fórmula de síntese mudar
+
+SOUND_EFFECTS = {
+    # Som de movimento mais suave e curto
+    'move': {'frequency': 440, 'decay': 2000},
+    # Som de comida mais agudo
+    'eat': {'frequency': 880, 'decay': 3000},
+    # Som de comida especial com frequência modulada
+    'special_eat': {'frequency': 660, 'vibrato_depth': 220, 'vibrato_rate': 5, 'decay': 4000},
+    # Som de perda de vida mais grave e longo
+    'lose_life': {'frequency': 220, 'decay': 6000},
+    # Som de morte com frequência descendente
+    'death': {'frequency': 440, 'sweep': 4000, 'decay': 8000},
+}
+
+
+def synthesize(params, sample_count=SAMPLE_COUNT, sample_rate=SAMPLE_RATE):
+    # Onda senoidal com envelope exponencial, calculada de uma vez para todas
+    # as amostras (int16 mono)
+    i = np.arange(sample_count, dtype=np.float64)
+    freq = np.full(sample_count, float(params['frequency']))
+    if 'vibrato_depth' in params:
+        freq += params['vibrato_depth'] * np.sin(2 * np.pi * params['vibrato_rate'] * i / sample_rate)
+    if 'sweep' in params:
+        freq *= np.exp(-i / params['sweep'])
+    wave_data = 32767 * np.sin(2 * np.pi * freq * i / sample_rate) * np.exp(-i / params['decay'])
+    return wave_data.astype(np.int16)
+
+
+def params_hash(name, params, sample_count=SAMPLE_COUNT, sample_rate=SAMPLE_RATE):
+    key = json.dumps([SYNTH_VERSION, name, params, sample_count, sample_rate], sort_keys=True)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+
+
+def cache_path(name, params, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{name}-{params_hash(name, params)}.wav')
+
+
+def is_valid_wav(path, sample_count=SAMPLE_COUNT, sample_rate=SAMPLE_RATE):
+    try:
+        with wave.open(path, 'rb') as f:
+            return (f.getnchannels() == 1 and f.getsampwidth() == 2
+                    and f.getframerate() == sample_rate and f.getnframes() == sample_count)
+    except (OSError, EOFError, wave.Error):
+        return False
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    # Escreve num temporário e troca, para outra instância nunca ler um WAV pela metade
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with wave.open(temp_path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.astype('<i2', copy=False).tobytes())
+    os.replace(temp_path, path)
+
+
+def ensure_sound(name, params=None, cache_dir=CACHE_DIR):
+    # Devolve (caminho do WAV, amostras recém-sintetizadas ou None se veio do cache)
+    params = SOUND_EFFECTS[name] if params is None else params
+    path = cache_path(name, params, cache_dir)
+    if is_valid_wav(path):
+        return path, None
+    samples = synthesize(params)
+    write_wav(path, samples)
+    return path, samples
@@ -0,0 +1,94 @@
+import json
+import sys
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Servidor local que imita a API de pontuações (POST /scores), para testar o
+# envio em segundo plano sem rede. Também atende POST /scores/batch, com uma
+# lista de {id, data} (o id faz o papel do Idempotency-Key de cada entrada):
+#
+#     python stub_api.py 8000
+#     SNAKE_API_URL=http://127.0.0.1:8000/scores python snake_game.py
+#     SNAKE_API_BATCH_URL=http://127.0.0.1:8000/scores/batch python snake_game.py
+#
+# fail_next faz as próximas N requisições responderem 503 (teste de retry).
+
+
+class StubApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address=('127.0.0.1', 0), fail_next=0):
+        super().__init__(address, StubApiHandler)
+        self.lock = threading.Lock()
+        self.scores = []
+        self.seen_keys = set()
+        self.fail_next = fail_next
+        self.request_count = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}/scores'
+
+    @property
+    def batch_url(self):
+        return self.url + '/batch'
+
+    def store(self, key, data):
+        # Guarda a pontuação, a não ser que a chave já tenha sido vista
+        if key is None or key not in self.seen_keys:
+            self.seen_keys.add(key)
+            data['_id'] = uuid.uuid4().hex
+            self.scores.append(data)
+        return data
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return self
+
+
+class StubApiHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Mantém a conexão aberta entre envios
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with server.lock:
+            server.request_count += 1
+            if server.fail_next > 0:
+                server.fail_next -= 1
+                return self._reply(503, {'erro': 'indisponível'})
+            if self.path not in ('/scores', '/scores/batch'):
+                return self._reply(404, {'erro': 'não encontrado'})
+            try:
+                data = json.loads(body)
+            except ValueError:
+                return self._reply(400, {'erro': 'json inválido'})
+            if self.path == '/scores':
+                data = server.store(self.headers.get('Idempotency-Key'), data)
+            elif isinstance(data, list) and all(isinstance(item, dict) and 'id' in item and 'data' in item
+                                                for item in data):
+                data = [server.store(item['id'], item['data']) for item in data]
+            else:
+                return self._reply(400, {'erro': 'lote inválido'})
+        self._reply(201, data)
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    server = StubApiServer(('127.0.0.1', port))
+    print(f"API de teste ouvindo em {server.url}")
+    server.serve_forever()
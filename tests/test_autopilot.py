@@ -0,0 +1,86 @@
+from autopilot import DEFAULT_CELL_BUDGET, Autopilot
+from snake_core import DOWN, RIGHT, UP, Game
+
+
+def place(game, slot, position, lifetime=1e9):
+    # Põe a entidade do slot numa célula escolhida (spawn sorteia a célula)
+    entities = game.entities
+    board = game.board
+    entities.remove(slot)
+    cell = board.index(position)
+    board.occupy_cell(cell)
+    entities.slot_at[cell] = slot
+    entities.cells[slot] = cell
+    entities.spawn_times[slot] = game.elapsed
+    entities.lifetimes[slot] = lifetime
+    entities.active[slot] = 1
+
+
+def set_board(game, body, direction, food, skulls=()):
+    # Corpo (cabeça primeiro), comida e caveiras em células fixas
+    entities = game.entities
+    for slot in (game.food.slot, *game.skull_slots):
+        entities.remove(slot)
+    snake = game.snake
+    snake.clear()
+    for position in body:
+        snake.positions.append(position)
+        snake.occupied[game.board.index(position)] = 1
+        game.board.occupy(position)
+    snake.length = len(body)
+    snake.direction = direction
+    place(game, game.food.slot, food)
+    for slot, position in zip(game.skull_slots, skulls):
+        place(game, slot, position)
+        game.schedule_expiry(slot)
+
+
+def ticks_to_eat(game, pilot, limit=200):
+    for tick in range(1, limit + 1):
+        events = game.step(pilot.choose_direction())
+        assert 'lose_life' not in events and 'death' not in events
+        if 'eat' in events or 'special_eat' in events:
+            return tick
+    return None
+
+
+def pocket(x, y):
+    # Bolsão de caveiras aberto para a esquerda, com o fundo na coluna x + 5
+    return ([(x + 5, y + dy) for dy in range(-5, 6)]
+            + [(x + dx, y - 5) for dx in range(1, 5)] + [(x + dx, y + 5) for dx in range(1, 5)])
+
+
+def test_goes_around_skulls():
+    # Bolsão aberto para a cabeça, com a comida do outro lado: seguir a
+    # distância Manhattan entra no bolsão
+    skulls = pocket(10, 10)
+    game = Game(seed=1, skulls=len(skulls))
+    set_board(game, [(10, 10)], RIGHT, (20, 10), skulls)
+    pilot = Autopilot(game, cell_budget=DEFAULT_CELL_BUDGET)
+    assert pilot.choose_direction() in (UP, DOWN)
+    # Contornando por cima ou por baixo: 6 + 6 + 6 + 4 passos
+    assert ticks_to_eat(game, pilot) == 22
+
+
+def test_goes_around_own_body():
+    # O corpo forma uma caixa à direita da cabeça, aberta só para cima dela
+    body = ([(10, y) for y in range(10, 17)] + [(x, 16) for x in range(11, 17)]
+            + [(16, y) for y in range(15, 3, -1)] + [(x, 4) for x in range(15, 10, -1)])
+    game = Game(seed=1, skulls=0)
+    set_board(game, body, UP, (20, 10))
+    pilot = Autopilot(game, cell_budget=DEFAULT_CELL_BUDGET)
+    assert pilot.choose_direction() == UP
+    assert ticks_to_eat(game, pilot) is not None
+
+
+def test_field_follows_skull_changes():
+    # O campo montado com as caveiras longe não vale mais quando elas formam
+    # o bolsão entre a cabeça e a comida
+    skulls = pocket(10, 10)
+    game = Game(seed=1, skulls=len(skulls))
+    set_board(game, [(10, 10)], RIGHT, (20, 10), [(x, 25) for x in range(len(skulls))])
+    pilot = Autopilot(game, cell_budget=DEFAULT_CELL_BUDGET)
+    assert pilot.choose_direction() == RIGHT
+    for slot, position in zip(game.skull_slots, skulls):
+        place(game, slot, position)
+    assert pilot.choose_direction() in (UP, DOWN)
@@ -0,0 +1,99 @@
+import random
+
+import numpy as np
+import pytest
+
+from batch_sim import DEATH, RUNNING, START_CELL, VICTORY, BatchGame, random_policy
+from snake_core import DIRECTIONS, GRID_WIDTH, SAFE_ZONE_HEIGHT, SKULL, Game
+
+RESULTS = {RUNNING: None, DEATH: 'death', VICTORY: 'victory'}
+
+
+def sync_items(batch, game):
+    # Copia comida e caveiras do Game para o tabuleiro 0 do lote: os sorteios
+    # dos dois motores são diferentes, as regras de cada passo não
+    entities = game.entities
+    batch.items[0] = False
+    food = game.food.position
+    batch.food[0] = food[1] * GRID_WIDTH + food[0] if food is not None else -1
+    batch.food_special[0] = game.food.type == 'special'
+    for i, slot in enumerate(game.skull_slots):
+        batch.danger[0, i] = entities.cells[slot]
+        batch.danger_active[0, i] = entities.active[slot] != 0
+        batch.danger_spawn_time[0, i] = entities.spawn_times[slot]
+    for cell, _ in entities.items():
+        batch.items[0, cell] = True
+
+
+def batch_body(batch):
+    indices = (batch.head[0] - np.arange(batch.body_length[0])) % batch.body.shape[1]
+    return [(int(cell) % GRID_WIDTH, int(cell) // GRID_WIDTH) for cell in batch.body[0, indices]]
+
+
+def greedy_direction(game, rng):
+    # Vai atrás da comida sem bater na parede, com viradas aleatórias para
+    # esbarrar no próprio corpo e em caveiras
+    snake = game.snake
+    x, y = snake.get_head_position()
+    reverse = (-snake.direction[0], -snake.direction[1])
+    moves = [(dx, dy) for dx, dy in DIRECTIONS if (dx, dy) != reverse
+             and 0 <= x + dx < game.board.width and SAFE_ZONE_HEIGHT <= y + dy < game.board.height]
+    food = game.food.position
+    if rng.random() < 0.15 or food is None:
+        return rng.choice(moves)
+    return min(moves, key=lambda move: abs(x + move[0] - food[0]) + abs(y + move[1] - food[1]))
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_parity_with_core_game(seed):
+    game = Game(duration=20, seed=seed)
+    batch = BatchGame(1, seed=seed, duration=20)
+    batch.direction[0] = DIRECTIONS.index(game.snake.direction)
+    sync_items(batch, game)
+    rng = random.Random(seed)
+    while not game.over:
+        direction = greedy_direction(game, rng)
+        game.step(direction)
+        batch.step(np.array([DIRECTIONS.index(direction) if direction is not None else -1], dtype=np.int8))
+        snake = game.snake
+        assert (int(batch.score[0]), int(batch.lives[0]), bool(batch.alive[0]), int(batch.length[0])) == \
+            (snake.score, snake.lives, snake.alive, snake.length), game.tick
+        assert RESULTS[int(batch.result[0])] == game.result, game.tick
+        assert batch_body(batch) == list(snake.positions), game.tick
+        # Caveiras nascem e expiram nos mesmos passos
+        assert int(batch.danger_active[0].sum()) == len(game.entities.cells_of(SKULL)), game.tick
+        assert batch.elapsed[0] == pytest.approx(game.elapsed)
+        sync_items(batch, game)
+
+
+def test_respawn_onto_skull_costs_one_life():
+    # Bater na caveira ao lado renasce no centro; outra caveira no centro não
+    # pode tirar uma segunda vida no mesmo passo
+    batch = BatchGame(1, seed=0)
+    batch.items[0] = False
+    batch.danger_active[0] = False
+    batch.food[0] = START_CELL + 5 * GRID_WIDTH
+    batch.items[0, batch.food[0]] = True
+    batch.direction[0] = DIRECTIONS.index((1, 0))
+    batch.step()  # Sai do centro
+    head = int(batch.head_cells()[0])
+    for slot, cell in enumerate((head + 1, START_CELL)):
+        batch.danger[0, slot] = cell
+        batch.danger_active[0, slot] = True
+        batch.items[0, cell] = True
+    batch.step()
+    assert int(batch.lives[0]) == 1 and batch.alive[0]
+    assert int(batch.head_cells()[0]) == START_CELL
+    assert batch.danger_active[0].sum() == 1
+
+
+def test_items_never_share_cells():
+    batch = BatchGame(200, seed=1)
+    for _ in range(300):
+        batch.step(random_policy(batch))
+        for board in range(batch.count):
+            cells = list(batch.danger[board][batch.danger_active[board]])
+            if batch.food[board] >= 0:
+                cells.append(batch.food[board])
+            assert len(cells) == len(set(cells))
+            assert int(batch.items[board].sum()) == len(cells)
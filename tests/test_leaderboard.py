@@ -0,0 +1,105 @@
+import json
+import random
+import sqlite3
+
+from leaderboard import SCORE_BITS, Leaderboard
+
+# Banco de antes da árvore de contagens: uma linha por pontuação em score_counts
+OLD_SCHEMA = '''
+CREATE TABLE scores (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    code TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX scores_by_score ON scores (score DESC, id);
+CREATE INDEX scores_by_player ON scores (name, code, score DESC);
+CREATE TABLE score_counts (
+    score INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TRIGGER scores_count_insert AFTER INSERT ON scores
+BEGIN
+    INSERT INTO score_counts (score, count) VALUES (NEW.score, 1)
+    ON CONFLICT (score) DO UPDATE SET count = count + 1;
+END;
+'''
+
+
+def brute_position(scores, score):
+    return sum(1 for other in scores if other >= score)
+
+
+def test_position_matches_brute_force(tmp_path):
+    leaderboard = Leaderboard(str(tmp_path / 'ranking.db'), None)
+    rng = random.Random(8)
+    top = 2 ** SCORE_BITS - 1
+    scores = []
+    for _ in range(2000):
+        score = rng.choice([0, 1, 2, top, rng.randint(0, 300), rng.randint(0, top)])
+        scores.append(score)
+        assert leaderboard.add_score('a', '1', score) == brute_position(scores, score)
+    probes = [0, 1, 2, 3, 150, 2 ** 31, top - 1, top] + rng.sample(scores, 50)
+    for score in probes:
+        assert leaderboard.position_of(score) == brute_position(scores, score)
+
+    # Apagar partidas desconta da árvore
+    leaderboard.connection.execute('DELETE FROM scores WHERE id % 3 = 0')
+    scores = [row[0] for row in leaderboard.connection.execute('SELECT score FROM scores')]
+    for score in probes:
+        assert leaderboard.position_of(score) == brute_position(scores, score)
+    leaderboard.close()
+
+
+def test_best_for(tmp_path):
+    leaderboard = Leaderboard(str(tmp_path / 'ranking.db'), None)
+    for name, code, score in [('ana', '1234', 10), ('ana', '1234', 42), ('ana', '9999', 99),
+                              ('bia', '1234', 7), ('ana', '1234', 3)]:
+        leaderboard.add_score(name, code, score)
+    assert leaderboard.best_for('ana', '1234') == 42
+    assert leaderboard.best_for('ana', '9999') == 99
+    assert leaderboard.best_for('bia', '1234') == 7
+    assert leaderboard.best_for('bia', '9999') is None
+    leaderboard.close()
+
+
+def test_imports_legacy_json_once(tmp_path):
+    json_path = tmp_path / 'ranking.json'
+    json_path.write_text(json.dumps([
+        {'name': 'ana', 'code': '1234', 'score': 30},
+        {'name': 'bia', 'score': 50},  # Rankings antigos sem código
+        {'name': 'ana', 'code': '1234', 'score': 10},
+    ]))
+    db_path = str(tmp_path / 'ranking.db')
+    leaderboard = Leaderboard(db_path, str(json_path))
+    assert [(entry['name'], entry['code'], entry['score']) for entry in leaderboard.top()] == \
+        [('bia', '0000', 50), ('ana', '1234', 30), ('ana', '1234', 10)]
+    assert leaderboard.position_of(30) == 2
+    assert leaderboard.best_for('ana', '1234') == 30
+    leaderboard.close()
+
+    # Abrir de novo não importa outra vez
+    leaderboard = Leaderboard(db_path, str(json_path))
+    assert leaderboard.count() == 3
+    leaderboard.close()
+
+
+def test_migrates_score_counts_database(tmp_path):
+    db_path = str(tmp_path / 'ranking.db')
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.executescript(OLD_SCHEMA)
+    scores = [3, 3, 10, 50, 0, 7]
+    connection.executemany('INSERT INTO scores (name, code, score, created_at) VALUES (?, ?, ?, 0)',
+                           [('ana', '1234', score) for score in scores])
+    connection.close()
+
+    leaderboard = Leaderboard(db_path, None)
+    names = {row[0] for row in leaderboard.connection.execute('SELECT name FROM sqlite_master')}
+    assert 'score_counts' not in names and 'scores_by_player' in names
+    for score in (0, 3, 4, 10, 51):
+        assert leaderboard.position_of(score) == brute_position(scores, score)
+    assert leaderboard.best_for('ana', '1234') == 50
+    assert leaderboard.add_score('bia', '1', 8, 'replays/x.rpl') == 3
+    assert leaderboard.top(1, 2)[0]['replay'] == 'replays/x.rpl'
+    leaderboard.close()
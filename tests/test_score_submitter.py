@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+pytest.importorskip('requests')
+
+import score_submitter
+from score_submitter import RETRY_BASE_DELAY, RETRY_MAX_DELAY, ScoreSubmitter, retry_delay
+from stub_api import StubApiServer
+
+
+class Log:
+    # Substitui log_api_result: guarda (jogador, status HTTP, sucesso)
+    def __init__(self):
+        self.entries = []
+
+    def __call__(self, player_name, player_code, pontos, is_victory, status_code, response_text, sucesso):
+        self.entries.append((player_name, status_code, sucesso))
+
+
+@pytest.fixture
+def server():
+    server = StubApiServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(score_submitter, 'RETRY_BASE_DELAY', 0.01)
+
+
+def outbox_ids(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['id'] for line in f]
+
+
+def test_batch_route_sends_pending_entries_in_one_post(server, tmp_path):
+    log = Log()
+    submitter = ScoreSubmitter(server.url, str(tmp_path / 'outbox.jsonl'), log, batch_url=server.batch_url)
+    for i in range(5):
+        submitter.submit(f'jogador{i}', '1234', i, i % 2 == 0)
+    submitter.start()
+    assert submitter.flush(5)
+    submitter.stop(5)
+    assert server.request_count == 1
+    assert [score['jogador'] for score in server.scores] == [f'jogador{i}' for i in range(5)]
+    assert [score['ponto'] for score in server.scores] == [10, 5, 10, 5, 10]
+    assert log.entries == [(f'jogador{i}', 201, True) for i in range(5)]
+    assert outbox_ids(tmp_path / 'outbox.jsonl') == []
+
+
+def test_retries_with_backoff_after_server_errors(server, tmp_path, fast_retries):
+    server.fail_next = 2
+    log = Log()
+    submitter = ScoreSubmitter(server.url, str(tmp_path / 'outbox.jsonl'), log, batch_url=None).start()
+    submitter.submit('ana', '1234', 30, True)
+    assert submitter.flush(5)
+    submitter.stop(5)
+    assert server.request_count == 3
+    assert len(server.scores) == 1
+    assert log.entries == [('ana', 503, False), ('ana', 503, False), ('ana', 201, True)]
+
+
+def test_client_error_is_not_retried(server, tmp_path, fast_retries):
+    log = Log()
+    submitter = ScoreSubmitter(server.url + '/inexistente', str(tmp_path / 'outbox.jsonl'), log,
+                               batch_url=None).start()
+    submitter.submit('ana', '1234', 30, True)
+    assert submitter.flush(5)
+    submitter.stop(5)
+    assert server.request_count == 1
+    assert log.entries == [('ana', 404, False)]
+
+
+def test_retry_delay_doubles_up_to_the_limit():
+    for attempts in range(1, 15):
+        delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempts - 1))
+        assert delay / 2 <= retry_delay(attempts) <= delay
+
+
+@pytest.mark.parametrize('batch', [False, True])
+def test_outbox_replay_is_sent_once(server, tmp_path, batch):
+    # Entradas gravadas por uma execução que não chegou a enviar saem na
+    # próxima; reenviar o mesmo outbox não duplica as pontuações na API
+    outbox_path = str(tmp_path / 'outbox.jsonl')
+    batch_url = server.batch_url if batch else None
+    offline = ScoreSubmitter(server.url, outbox_path, Log(), batch_url=batch_url)
+    ids = [offline.submit('ana', '1234', score, False) for score in (3, 4)]
+    with open(outbox_path, encoding='utf-8') as f:
+        saved = f.read()
+    assert outbox_ids(outbox_path) == ids
+
+    for _ in range(2):
+        submitter = ScoreSubmitter(server.url, outbox_path, Log(), batch_url=batch_url).start()
+        assert submitter.flush(5)
+        submitter.stop(5)
+        assert outbox_ids(outbox_path) == []
+        # Como se o processo tivesse caído antes de regravar o outbox
+        with open(outbox_path, 'w', encoding='utf-8') as f:
+            f.write(saved)
+    assert len(server.scores) == 2
+    assert server.request_count == (2 if batch else 4)
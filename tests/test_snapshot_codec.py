@@ -0,0 +1,178 @@
+import pytest
+
+from snapshot_codec import (BODY, MOVED, SKULLS_UNCHANGED, SnapshotDecoder, SnapshotEncoder, SnapshotError,
+                            decode, encode_delta, encode_keyframe, quantized, read_varint, verify)
+
+
+def snake(snake_id, body, lives=3, score=0, alive=True, name=''):
+    return {'id': snake_id, 'name': name or f'jogador{snake_id}', 'lives': lives, 'score': score,
+            'alive': alive, 'body': list(body)}
+
+
+def state(snakes, tick=0, remaining=120.0, food=(5, 5, 'normal'), skulls=()):
+    return {'tick': tick, 'remaining': remaining, 'food': food, 'skulls': list(skulls), 'snakes': snakes}
+
+
+def line(x, y, length):
+    # Corpo horizontal com a cabeça em (x, y), a cauda para a esquerda
+    return [(x - i, y) for i in range(length)]
+
+
+def roundtrip(new, base):
+    # Codifica new como delta contra base (quadro 1) e devolve o decodificado
+    history = {1: decode(encode_keyframe(base, 1), {})[1]}
+    return decode(encode_delta(new, 2, base, 1), history)[1]
+
+
+def first_snake_flags(data):
+    # Flags da primeira cobra de um delta
+    pos = 1
+    for _ in range(4):  # quadro, base, tick, restante
+        pos = read_varint(data, pos)[1]
+    pos += 1 if data[pos] in (0, 3) else 5
+    if data[pos] == SKULLS_UNCHANGED:
+        pos += 1
+    else:
+        count, pos = read_varint(data, pos + 1)
+        pos += 4 * count
+    pos = read_varint(data, pos)[1]  # quantidade de cobras
+    pos = read_varint(data, pos)[1]  # id
+    return data[pos]
+
+
+def test_keyframe_roundtrip():
+    original = state([snake(1, line(10, 8, 4), score=7), snake(2, [(3, 4)], lives=1, name='ção')],
+                     tick=42, remaining=12.34, skulls=[(1, 2), (30, 20)])
+    frame, decoded = decode(encode_keyframe(original, 9), {})
+    assert frame == 9
+    assert decoded == quantized(original)
+
+
+def test_keyframe_raw_body_and_empty_body():
+    # Corpo com células não vizinhas (modo cru) e cobra fora do tabuleiro
+    original = state([snake(1, [(10, 8), (12, 8), (12, 9)]), snake(2, [], lives=0, alive=False)], food=None)
+    assert decode(encode_keyframe(original, 1), {})[1] == quantized(original)
+
+
+def test_delta_move_and_grow():
+    base = state([snake(1, line(10, 8, 4))])
+    moved = state([snake(1, line(11, 8, 4))], tick=1)
+    grown = state([snake(1, line(12, 8, 5), score=1)], tick=2)
+    assert first_snake_flags(encode_delta(moved, 2, base, 1)) & MOVED
+    assert roundtrip(moved, base) == quantized(moved)
+    assert roundtrip(grown, base) == quantized(grown)
+
+
+def test_delta_turn():
+    base = state([snake(1, line(10, 8, 4))])
+    turned = state([snake(1, [(10, 6), (10, 7)] + line(10, 8, 2))], tick=2)
+    assert roundtrip(turned, base) == quantized(turned)
+
+
+def test_delta_unchanged_snake():
+    base = state([snake(1, line(10, 8, 4))])
+    same = state([snake(1, line(10, 8, 4))], tick=1, remaining=119.9)
+    assert roundtrip(same, base) == quantized(same)
+
+
+def test_respawn_sends_full_body():
+    # Renasceu com o mesmo tamanho; a cabeça antiga caiu na segunda célula do
+    # corpo novo e a cauda nova é uma célula do corpo antigo, mas o meio é outro
+    base = state([snake(1, [(10, 8), (10, 9), (11, 9), (12, 9)])])
+    respawned = state([snake(1, [(9, 8), (10, 8), (11, 8), (11, 9)], lives=2)], tick=1)
+    assert first_snake_flags(encode_delta(respawned, 2, base, 1)) & BODY
+    assert roundtrip(respawned, base) == quantized(respawned)
+
+
+def test_same_endpoints_different_middle():
+    # Mesmo tamanho, mesma cabeça e mesma cauda, meio diferente: não pode
+    # ser tratado como "não mudou" nem virar um delta de movimento
+    base = state([snake(1, [(10, 8), (10, 9), (11, 9), (11, 8), (12, 8)])])
+    changed = state([snake(1, [(10, 8), (10, 7), (11, 7), (11, 8), (12, 8)])], tick=1)
+    assert roundtrip(changed, base) == quantized(changed)
+
+
+def test_head_in_body_but_segment_differs():
+    # A cabeça antiga aparece no corpo novo e a cauda coincide, mas o trecho
+    # entre elas não é o começo do corpo antigo
+    base = state([snake(1, [(10, 8), (10, 9), (10, 10), (11, 10)])])
+    other = state([snake(1, [(9, 8), (10, 8), (11, 8), (11, 9), (11, 10)], score=1)], tick=1)
+    assert roundtrip(other, base) == quantized(other)
+
+
+@pytest.mark.parametrize('lives, alive', [(2, True), (0, False)])
+def test_lost_life_forces_body_record(lives, alive):
+    base = state([snake(1, line(10, 8, 3))])
+    # Andou um passo de verdade, mas perdeu vida no mesmo quadro: vai o corpo inteiro
+    after = state([snake(1, line(11, 8, 3) if alive else [], lives=lives, alive=alive)], tick=1)
+    flags = first_snake_flags(encode_delta(after, 2, base, 1))
+    assert flags & BODY and not flags & MOVED
+    assert roundtrip(after, base) == quantized(after)
+
+
+def test_food_and_skull_churn():
+    snakes = [snake(1, line(10, 8, 3))]
+    frames = [
+        state(snakes, food=(5, 5, 'normal'), skulls=[]),
+        state(snakes, tick=1, food=(6, 5, 'special'), skulls=[(1, 9)]),
+        state(snakes, tick=2, food=None, skulls=[(1, 9), (2, 9)]),
+        state(snakes, tick=3, food=None, skulls=[(2, 9)]),
+        state(snakes, tick=4, food=(7, 7, 'normal'), skulls=[]),
+    ]
+    for base in frames:
+        for new in frames:
+            assert roundtrip(new, base) == quantized(new)
+
+
+@pytest.mark.parametrize('count', [254, 255, 256, 1000])
+def test_many_skulls(count):
+    # A quantidade é varint e "sem mudança" é um byte à parte: 255 caveiras
+    # não se confundem com ele e mais que isso não estoura um u8
+    snakes = [snake(1, line(10, 8, 3))]
+    skulls = [(i % 200, 2 + i // 200) for i in range(count)]
+    base = state(snakes, skulls=skulls[:-1])
+    new = state(snakes, tick=1, skulls=skulls)
+    assert decode(encode_keyframe(new, 1), {})[1] == quantized(new)
+    assert roundtrip(new, base) == quantized(new)
+    # Sem mudança: só o byte de flag, sem a lista
+    assert roundtrip(new, new) == quantized(new)
+    assert len(encode_delta(new, 2, new, 1)) < 4 * count
+
+
+def test_players_join_and_leave():
+    base = state([snake(1, line(10, 8, 3)), snake(2, line(10, 12, 3))])
+    new = state([snake(2, line(11, 12, 3)), snake(3, line(5, 15, 2))], tick=1)
+    assert roundtrip(new, base) == quantized(new)
+
+
+def test_encoder_decoder_with_lagging_acks():
+    encoder = SnapshotEncoder(keyframe_interval=5)
+    decoder = SnapshotDecoder()
+    body = line(10, 8, 3)
+    acked = None
+    for tick in range(20):
+        body = [(body[0][0] + 1, body[0][1])] + body[:-1]
+        current = state([snake(1, body, score=tick)], tick=tick, remaining=120 - tick / 10,
+                        skulls=[(tick % 7, 20)] if tick % 3 else [])
+        encoder.push(current)
+        decoded = decoder.decode(encoder.encode_for(acked))
+        assert decoded == quantized(current)
+        acked = decoder.frame - 2 if decoder.frame > 2 else None
+
+
+def test_delta_without_base_fails():
+    base = state([snake(1, line(10, 8, 3))])
+    with pytest.raises(SnapshotError):
+        decode(encode_delta(base, 2, base, 1), {})
+
+
+def test_truncated_snapshot_fails():
+    data = encode_keyframe(state([snake(1, line(10, 8, 3))]), 1)
+    with pytest.raises(SnapshotError):
+        decode(data[:-1], {})
+
+
+def test_random_games_roundtrip():
+    # Partidas do MultiGame com renascimentos, comida e caveiras de verdade
+    frames, binary_bytes, json_bytes = verify(games=5, players=4)
+    assert frames > 0 and binary_bytes < json_bytes
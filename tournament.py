@@ -0,0 +1,357 @@
+import argparse
+import csv
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+import traceback
+
+from snake_core import DIRECTIONS, GAME_DURATION, FOOD_POINTS, FOOD_SPEEDUP, Game
+from autopilot import Autopilot, DEFAULT_CELL_BUDGET
+
+# Torneio sem janela: milhões de partidas com sementes fixas, divididas entre
+# todos os núcleos, para calibrar os valores dos itens (pontos da comida
+# especial, aceleração de cada comida) e a duração da partida.
+#
+#     python tournament.py --games 1000000 --checkpoint torneio.json
+#     python tournament.py --games 1000000 --checkpoint torneio.json   # retoma
+#     python tournament.py --games 100000 --special-points 30 --duration 60
+#
+# As partidas são agrupadas em blocos de índices consecutivos; cada processo
+# pega um bloco por vez, joga com o piloto automático (com uma chance de
+# erro por passo, para haver mortes) e manda o resultado de cada partida de
+# volta por uma fila limitada (se o principal atrasar, os processos esperam
+# em vez de acumular memória). O processo principal soma tudo num Summary
+# incremental e, a cada bloco concluído, grava o checkpoint: configuração,
+# blocos prontos e o resumo. Retomar pula os blocos prontos; um bloco
+# interrompido no meio é jogado de novo do começo (a semente de cada partida
+# só depende da semente do torneio e do índice da partida).
+
+CHUNK_SIZE = 200  # Partidas por bloco (unidade de trabalho e de checkpoint)
+RESULT_BATCH = 25  # Partidas por mensagem na fila de resultados
+RESULT_QUEUE_SIZE = 256  # Mensagens pendentes antes de os processos esperarem
+PROGRESS_INTERVAL = 5.0
+DEFAULT_NOISE = 0.01  # Chance por passo de trocar a escolha do piloto por uma direção aleatória
+RESULT_FIELDS = ('game', 'seed', 'result', 'score', 'lives_lost', 'cause', 'ticks')
+
+
+def game_seed(seed, index):
+    # Semente da partida index, estável entre execuções e processos
+    return random.Random(f'{seed}:{index}').getrandbits(63)
+
+
+def apply_config(config):
+    # Valores dos itens em teste; cada processo altera a própria cópia das regras
+    FOOD_POINTS['special'] = config['special_points']
+    FOOD_SPEEDUP['normal'] = config['normal_speedup']
+    FOOD_SPEEDUP['special'] = config['special_speedup']
+
+
+def play_game(index, config):
+    seed = game_seed(config['seed'], index)
+    game = Game(duration=config['duration'], seed=seed)
+    # Orçamento em células, não em tempo: a partida só depende da semente
+    pilot = Autopilot(game, cell_budget=config['cell_budget'])
+    rng = random.Random(seed ^ 0x5EED)
+    noise = config['noise']
+    initial_lives = game.snake.lives
+    cause = None
+    while not game.over:
+        if rng.random() < noise:
+            direction = rng.choice(DIRECTIONS)
+        else:
+            direction = pilot.choose_direction()
+        events = game.step(direction)
+        if 'death' in events:
+            cause = game.snake.last_cause
+    return (index, seed, game.result, game.snake.score, initial_lives - game.snake.lives, cause, game.tick)
+
+
+def worker(tasks, results, config):
+    apply_config(config)
+    try:
+        while True:
+            chunk = tasks.get()
+            if chunk is None:
+                break
+            batch = []
+            for index in range(chunk * config['chunk_size'], min((chunk + 1) * config['chunk_size'], config['games'])):
+                batch.append(play_game(index, config))
+                if len(batch) >= RESULT_BATCH:
+                    results.put(('games', chunk, batch))
+                    batch = []
+            results.put(('games', chunk, batch))
+            results.put(('done', chunk, None))
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        results.put(('error', None, traceback.format_exc()))
+
+
+class Running:
+    # Média e variância incrementais (Welford), que também se juntam (Chan)
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        if not other.count:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def stdev(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, data):
+        running = cls()
+        running.__dict__.update(data)
+        return running
+
+
+def _merge_counts(target, source):
+    for key, count in source.items():
+        target[key] = target.get(key, 0) + count
+
+
+class Summary:
+    # Estatísticas do torneio, atualizadas partida a partida
+    def __init__(self):
+        self.games = 0
+        self.results = {}
+        self.causes = {}  # Causa da morte (só partidas que terminaram em morte)
+        self.lives_lost = {}
+        self.score = Running()
+        self.ticks = Running()
+        self.score_histogram = {}  # Pontuação -> partidas, para os percentis
+
+    def add(self, row):
+        _, _, result, score, lives_lost, cause, ticks = row
+        self.games += 1
+        self.results[result] = self.results.get(result, 0) + 1
+        if cause is not None:
+            self.causes[cause] = self.causes.get(cause, 0) + 1
+        self.lives_lost[lives_lost] = self.lives_lost.get(lives_lost, 0) + 1
+        self.score.add(score)
+        self.ticks.add(ticks)
+        self.score_histogram[score] = self.score_histogram.get(score, 0) + 1
+
+    def merge(self, other):
+        self.games += other.games
+        _merge_counts(self.results, other.results)
+        _merge_counts(self.causes, other.causes)
+        _merge_counts(self.lives_lost, other.lives_lost)
+        self.score.merge(other.score)
+        self.ticks.merge(other.ticks)
+        _merge_counts(self.score_histogram, other.score_histogram)
+
+    def score_percentile(self, fraction):
+        target = fraction * self.games
+        seen = 0
+        for score in sorted(self.score_histogram):
+            seen += self.score_histogram[score]
+            if seen >= target:
+                return score
+        return None
+
+    def to_dict(self):
+        # Chaves numéricas viram texto no JSON
+        return {'games': self.games, 'results': self.results, 'causes': self.causes,
+                'lives_lost': {str(k): v for k, v in self.lives_lost.items()},
+                'score': self.score.to_dict(), 'ticks': self.ticks.to_dict(),
+                'score_histogram': {str(k): v for k, v in self.score_histogram.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        summary = cls()
+        summary.games = data['games']
+        summary.results = data['results']
+        summary.causes = data['causes']
+        summary.lives_lost = {int(k): v for k, v in data['lives_lost'].items()}
+        summary.score = Running.from_dict(data['score'])
+        summary.ticks = Running.from_dict(data['ticks'])
+        summary.score_histogram = {int(k): v for k, v in data['score_histogram'].items()}
+        return summary
+
+
+def print_summary(summary):
+    games = summary.games
+    if not games:
+        print("Nenhuma partida concluída")
+        return
+    print(f"Partidas: {games}")
+    print("Resultados: " + ', '.join(f"{name} {count / games:.1%}" for name, count in sorted(summary.results.items())))
+    deaths = sum(summary.causes.values())
+    if deaths:
+        print("Causa da morte: " + ', '.join(f"{name} {count / deaths:.1%}"
+                                             for name, count in sorted(summary.causes.items())))
+    print("Vidas perdidas: " + ', '.join(f"{lives}: {count / games:.1%}"
+                                         for lives, count in sorted(summary.lives_lost.items())))
+    print(f"Pontuação: média {summary.score.mean:.2f} ± {summary.score.stdev():.2f} | "
+          f"p10 {summary.score_percentile(0.1)} | p50 {summary.score_percentile(0.5)} | "
+          f"p90 {summary.score_percentile(0.9)} | máx {summary.score.max}")
+    print(f"Passos sobrevividos: média {summary.ticks.mean:.1f} ± {summary.ticks.stdev():.1f} | "
+          f"mín {summary.ticks.min} | máx {summary.ticks.max}")
+
+
+def load_checkpoint(path, config):
+    if path is None or not os.path.exists(path):
+        return set(), Summary(), 0
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data['config'] != config:
+        changed = sorted(key for key in config if data['config'].get(key) != config[key])
+        raise ValueError(f"checkpoint {path} é de outra configuração (difere em: {', '.join(changed)})")
+    return set(data['completed']), Summary.from_dict(data['summary']), data.get('results_size', 0)
+
+
+def save_checkpoint(path, config, completed, summary, results_size):
+    # Escreve ao lado e troca de uma vez: um checkpoint nunca fica pela metade
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump({'config': config, 'completed': sorted(completed), 'summary': summary.to_dict(),
+                   'results_size': results_size}, f)
+    os.replace(temp_path, path)
+
+
+def run_tournament(config, workers=None, checkpoint=None, results_path=None):
+    chunks = math.ceil(config['games'] / config['chunk_size'])
+    completed, summary, results_size = load_checkpoint(checkpoint, config)
+    todo = [chunk for chunk in range(chunks) if chunk not in completed]
+    if completed:
+        print(f"Retomando: {len(completed)} de {chunks} blocos prontos ({summary.games} partidas)")
+    if not todo:
+        return summary
+
+    results_file = writer = None
+    if results_path is not None:
+        # Linhas além do último checkpoint são de blocos que serão jogados de novo
+        results_file = open(results_path, 'a+', newline='', encoding='utf-8')
+        results_file.truncate(results_size)
+        results_file.seek(results_size)
+        writer = csv.writer(results_file)
+        if results_size == 0:
+            writer.writerow(RESULT_FIELDS)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    tasks = multiprocessing.Queue()
+    for chunk in todo:
+        tasks.put(chunk)
+    for _ in range(workers):
+        tasks.put(None)
+    results = multiprocessing.Queue(RESULT_QUEUE_SIZE)
+    processes = [multiprocessing.Process(target=worker, args=(tasks, results, config), daemon=True)
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+
+    pending = {}  # Bloco -> (Summary parcial, linhas) até o bloco terminar
+    remaining = len(todo)
+    start = last_report = time.perf_counter()
+    played = 0
+    try:
+        while remaining:
+            try:
+                kind, chunk, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    raise RuntimeError('os processos do torneio terminaram antes do fim')
+                continue
+            if kind == 'error':
+                raise RuntimeError(f'erro num processo do torneio:\n{payload}')
+            chunk_summary, rows = pending.setdefault(chunk, (Summary(), []))
+            if kind == 'games':
+                for row in payload:
+                    chunk_summary.add(row)
+                if writer is not None:
+                    rows.extend(payload)
+                played += len(payload)
+                continue
+
+            # Bloco concluído: entra no resumo, nas linhas gravadas e no checkpoint
+            del pending[chunk]
+            summary.merge(chunk_summary)
+            completed.add(chunk)
+            remaining -= 1
+            if writer is not None:
+                writer.writerows(rows)
+                results_file.flush()
+                results_size = results_file.tell()
+            if checkpoint is not None:
+                save_checkpoint(checkpoint, config, completed, summary, results_size)
+
+            now = time.perf_counter()
+            if now - last_report >= PROGRESS_INTERVAL:
+                rate = played / (now - start)
+                left = config['games'] - summary.games
+                print(f"{summary.games}/{config['games']} partidas | {rate:.0f} partidas/s | "
+                      f"faltam ~{left / rate if rate else 0:.0f} s", flush=True)
+                last_report = now
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        if results_file is not None:
+            results_file.close()
+    elapsed = time.perf_counter() - start
+    print(f"{played} partidas em {elapsed:.1f} s com {workers} processos ({played / elapsed:.0f} partidas/s)")
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Torneio de partidas sem janela em todos os núcleos')
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0, help='semente do torneio (cada partida deriva dela)')
+    parser.add_argument('--workers', type=int, default=None, help='processos (padrão: um por núcleo)')
+    parser.add_argument('--checkpoint', default=None, help='arquivo JSON para retomar o torneio')
+    parser.add_argument('--results', default=None, help='CSV com o resultado de cada partida')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--noise', type=float, default=DEFAULT_NOISE,
+                        help='chance por passo de uma direção aleatória no lugar do piloto (1 = só aleatório)')
+    parser.add_argument('--cell-budget', type=int, default=DEFAULT_CELL_BUDGET,
+                        help='orçamento do piloto por passo, em células visitadas')
+    parser.add_argument('--duration', type=float, default=GAME_DURATION, help='duração da partida em segundos de jogo')
+    parser.add_argument('--special-points', type=int, default=FOOD_POINTS['special'])
+    parser.add_argument('--normal-speedup', type=float, default=FOOD_SPEEDUP['normal'],
+                        help='multiplicador de velocidade da comida normal (1.02 = +2%%)')
+    parser.add_argument('--special-speedup', type=float, default=FOOD_SPEEDUP['special'])
+    args = parser.parse_args()
+
+    config = {'games': args.games, 'seed': args.seed, 'chunk_size': args.chunk_size, 'noise': args.noise,
+              'cell_budget': args.cell_budget, 'duration': args.duration, 'special_points': args.special_points,
+              'normal_speedup': args.normal_speedup, 'special_speedup': args.special_speedup}
+    try:
+        summary = run_tournament(config, args.workers, args.checkpoint, args.results)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\nInterrompido" + (f"; retome com --checkpoint {args.checkpoint}" if args.checkpoint else ''))
+        sys.exit(130)
+    print_summary(summary)